@@ -4,4 +4,12 @@ from .sprites import *
 from .ai_interface import openai
 from . import entities
 from .entities import *
-from .sim import AntSim
+
+
+def __getattr__(name: str):
+    # AntSim needs tkinter, so it is only imported when first requested.
+    if name == "AntSim":
+        from .sim import AntSim
+
+        return AntSim
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,195 @@
+"""Minimal asyncio HTTP/1.1 client for OpenAI-compatible chat endpoints."""
+
+import asyncio
+import json
+import ssl
+import urllib.parse
+
+
+class HTTPError(Exception):
+    """Raised when the server sends a malformed or unexpected response."""
+
+
+class _Unanswered(ConnectionError):
+    """The connection failed before any byte of a response arrived.
+
+    On a pooled connection this is the server having closed it while idle,
+    so the request was never handled and may be sent again.
+    """
+
+
+class AsyncChatClient:
+    """Pooled keep-alive client running natively on an asyncio loop.
+
+    Connections are reused across requests instead of being opened per call
+    and the number of requests in flight is bounded by a semaphore rather
+    than by a thread pool.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str = "",
+        max_concurrency: int = 16,
+        timeout: float = 30.0,
+    ) -> None:
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.path_prefix = parts.path.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def chat(
+        self, messages: list[dict], model: str, max_tokens: int
+    ) -> str | None:
+        """Return the completion text or ``None`` if the request failed."""
+        body = json.dumps(
+            {"model": model, "messages": messages, "max_tokens": max_tokens}
+        ).encode()
+        async with self._semaphore:
+            try:
+                status, payload = await asyncio.wait_for(
+                    self._request("POST", "/chat/completions", body), self.timeout
+                )
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, HTTPError):
+                return None
+        if status != 200:
+            return None
+        try:
+            data = json.loads(payload)
+            return data["choices"][0]["message"]["content"].strip()
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
+
+    async def aclose(self) -> None:
+        while self._idle:
+            _reader, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        context = ssl.create_default_context() if self.scheme == "https" else None
+        conn = await asyncio.open_connection(self.host, self.port, ssl=context)
+        self.connections_opened += 1
+        return conn
+
+    def _take_idle(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    async def _request(self, method: str, path: str, body: bytes) -> tuple[int, bytes]:
+        conn = self._take_idle()
+        reused = conn is not None
+        if conn is None:
+            conn = await self._connect()
+        try:
+            return await self._attempt(conn, method, path, body)
+        except _Unanswered:
+            if not reused:
+                raise
+        # The pooled connection had been closed by the server while idle.
+        # Any other failure may come after the server acted on the request,
+        # so it is not resent.
+        return await self._attempt(await self._connect(), method, path, body)
+
+    async def _attempt(
+        self,
+        conn: tuple[asyncio.StreamReader, asyncio.StreamWriter],
+        method: str,
+        path: str,
+        body: bytes,
+    ) -> tuple[int, bytes]:
+        """Send on ``conn``, closing it on any failure, cancellation included.
+
+        A connection is never half used: it is either back in the pool or
+        closed once this returns.
+        """
+        try:
+            return await self._send(conn, method, path, body)
+        except BaseException:
+            conn[1].close()
+            raise
+
+    async def _send(
+        self,
+        conn: tuple[asyncio.StreamReader, asyncio.StreamWriter],
+        method: str,
+        path: str,
+        body: bytes,
+    ) -> tuple[int, bytes]:
+        reader, writer = conn
+        head = [
+            f"{method} {self.path_prefix}{path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+        ]
+        if self.api_key:
+            head.append(f"Authorization: Bearer {self.api_key}")
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+            await writer.drain()
+        except OSError as exc:
+            raise _Unanswered(str(exc)) from exc
+        self.requests_sent += 1
+        status, headers, payload = await self._read_response(reader)
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, payload
+
+    async def _read_response(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[int, dict[str, str], bytes]:
+        try:
+            status_line = await reader.readline()
+        except OSError as exc:
+            raise _Unanswered(str(exc)) from exc
+        if not status_line:
+            raise _Unanswered("connection closed before the response")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise HTTPError(f"bad status line: {status_line!r}")
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                line = await reader.readline()
+                try:
+                    size = int(line.split(b";")[0], 16)
+                except ValueError:
+                    raise HTTPError(f"bad chunk size: {line!r}")
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            return status, headers, b"".join(chunks)
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(f"bad content length: {headers['content-length']!r}")
+        return status, headers, await reader.readexactly(length)
@@ -1,69 +1,374 @@
+from __future__ import annotations
+
 import os
-import concurrent.futures
-import asyncio
+import collections
 import threading
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    import asyncio
+    import concurrent.futures
+
+    from .ai_http import AsyncChatClient
+
+
+class _DummyChat:
+    @staticmethod
+    def create(*_args, **_kwargs):
+        raise ModuleNotFoundError("openai is required for this feature")
+
+
+class _DummyOpenAI:
+    api_key = ""
+    ChatCompletion = _DummyChat
+
+
+class _LazyOpenAI:
+    """Stand-in for the ``openai`` module that imports it on first use."""
+
+    def _load(self):
+        module = self.__dict__.get("_module")
+        if module is None:
+            try:
+                import openai as module
+            except Exception:  # pragma: no cover - optional dependency
+                module = _DummyOpenAI()
+            module.api_key = os.getenv("OPENAI_API_KEY", "")
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+
+openai = _LazyOpenAI()
+
+
+# Request priorities, served lowest value first.
+PRIORITY_CRITICAL = 0  # gameplay decisions such as Queen.decide_spawn
+PRIORITY_NORMAL = 1  # per-ant movement
+PRIORITY_LOW = 2  # cosmetic output such as Queen.thought
 
-try:
-    import openai
-except Exception:  # pragma: no cover - optional dependency
-    class _DummyChat:
-        @staticmethod
-        def create(*_args, **_kwargs):
-            raise ModuleNotFoundError("openai is required for this feature")
+# Maximum requests of each class in flight at once.
+CONCURRENCY_LIMITS = {PRIORITY_CRITICAL: 2, PRIORITY_NORMAL: 2, PRIORITY_LOW: 1}
+# Maximum queued requests per class; ``None`` means the class is never shed.
+QUEUE_LIMITS = {PRIORITY_CRITICAL: None, PRIORITY_NORMAL: 32, PRIORITY_LOW: 4}
 
-    class _DummyOpenAI:
-        api_key = ""
-        ChatCompletion = _DummyChat
 
-    openai = _DummyOpenAI()
+class TokenBucket:
+    """Rate limiter holding up to ``capacity`` tokens refilled at ``rate``/s."""
 
-openai.api_key = os.getenv("OPENAI_API_KEY", "")
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._stamp = clock()
 
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
 
-_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
 
-# Event loop running in a background thread for async tasks
-_loop = asyncio.new_event_loop()
+    def delay(self, amount: float = 1.0) -> float:
+        """Return the number of seconds until ``amount`` tokens are available."""
+        self._refill()
+        if self.tokens >= amount or self.rate <= 0:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class RequestScheduler:
+    """Priority queue for LLM requests with admission control.
+
+    Queued jobs are dispatched in priority order, each class may only have
+    ``limits[priority]`` jobs in flight and every dispatch spends one token from
+    ``bucket``.  When a class's queue is full the new request is shed: its
+    future resolves to ``None`` so the caller falls back to its built-in
+    default instead of waiting.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        limits: dict[int, int] | None = None,
+        queue_limits: dict[int, int | None] | None = None,
+        bucket: TokenBucket | None = None,
+    ) -> None:
+        self._loop = loop
+        self.limits = dict(limits or CONCURRENCY_LIMITS)
+        self.queue_limits = dict(queue_limits or QUEUE_LIMITS)
+        self.bucket = bucket
+        self._queues: dict[int, collections.deque] = {
+            p: collections.deque() for p in self.limits
+        }
+        self.active = {p: 0 for p in self.limits}
+        self.completed = {p: 0 for p in self.limits}
+        self.shed = {p: 0 for p in self.limits}
+        # Futures submitted but not yet resolved, used to drain on shutdown.
+        # Callers add to it and the loop thread removes, so it is locked.
+        self.pending: set[concurrent.futures.Future] = set()
+        self._pending_lock = threading.Lock()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    def submit(
+        self, priority: int, job: Callable[[], Awaitable[str | None]]
+    ) -> concurrent.futures.Future:
+        """Queue ``job`` from any thread and return a future for its result."""
+        import concurrent.futures
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._pending_lock:
+            self.pending.add(future)
+        future.add_done_callback(self._resolved)
+        self._loop.call_soon_threadsafe(self._enqueue, priority, job, future)
+        return future
+
+    def in_flight(self) -> list[concurrent.futures.Future]:
+        """Futures not yet resolved, copied safely from any thread."""
+        with self._pending_lock:
+            return list(self.pending)
+
+    def _resolved(self, future: concurrent.futures.Future) -> None:
+        with self._pending_lock:
+            self.pending.discard(future)
+
+    def queued(self, priority: int) -> int:
+        return len(self._queues[priority])
+
+    def _enqueue(
+        self,
+        priority: int,
+        job: Callable[[], Awaitable[str | None]],
+        future: concurrent.futures.Future,
+    ) -> None:
+        queue = self._queues[priority]
+        limit = self.queue_limits.get(priority)
+        if limit is not None and len(queue) >= limit:
+            self.shed[priority] += 1
+            future.set_result(None)
+            return
+        queue.append((job, future))
+        self._pump()
+
+    def _pump(self) -> None:
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            while queue and self.active[priority] < self.limits[priority]:
+                if self.bucket is not None and not self.bucket.try_acquire():
+                    self._schedule_wakeup(self.bucket.delay())
+                    return
+                job, future = queue.popleft()
+                self.active[priority] += 1
+                task = self._loop.create_task(job())
+                task.add_done_callback(
+                    lambda t, p=priority, f=future: self._finished(p, f, t)
+                )
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            return
+
+        def wake() -> None:
+            self._wakeup = None
+            self._pump()
+
+        self._wakeup = self._loop.call_later(delay, wake)
+
+    def _finished(
+        self, priority: int, future: concurrent.futures.Future, task: asyncio.Task
+    ) -> None:
+        self.active[priority] -= 1
+        self.completed[priority] += 1
+        try:
+            result = task.result()
+        except Exception:
+            result = None
+        future.set_result(result)
+        self._pump()
 
-def _run_loop() -> None:  # pragma: no cover - thread bootstrap
-    asyncio.set_event_loop(_loop)
-    _loop.run_forever()
 
-_thread = threading.Thread(target=_run_loop, daemon=True)
-_thread.start()
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
 
+# "sdk" runs the blocking openai package in a thread pool; "http" talks to the
+# endpoint directly from the event loop through one pooled keep-alive client.
+backend = os.getenv("OPENAI_BACKEND", "sdk")
+_base_url = os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+_max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
 
-async def _chat_task_async(
-    messages: list[dict], model: str, max_tokens: int
-) -> str | None:
-    loop = asyncio.get_running_loop()
-    try:
-        resp = await loop.run_in_executor(
-            _executor,
-            lambda: openai.ChatCompletion.create(
-                model=model,
-                messages=messages,
-                max_tokens=max_tokens,
+
+class _Runtime:
+    """Background event loop, scheduler and clients behind ``chat_completion``."""
+
+    def __init__(self) -> None:
+        import asyncio
+
+        self.loop = asyncio.new_event_loop()
+        self.scheduler = RequestScheduler(
+            self.loop,
+            bucket=TokenBucket(
+                rate=float(os.getenv("OPENAI_RATE_LIMIT", "5")),
+                capacity=float(os.getenv("OPENAI_RATE_BURST", "10")),
             ),
         )
-        return resp.choices[0].message["content"].strip()
-    except Exception:
-        return None
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._http_client: AsyncChatClient | None = None
+        self.thread = threading.Thread(
+            target=self._run_loop, name="ant-hive-ai", daemon=True
+        )
+        self.thread.start()
 
+    def _run_loop(self) -> None:  # pragma: no cover - thread bootstrap
+        import asyncio
 
-def chat_completion(
-    messages: list[dict], model: str, max_tokens: int = 20
-) -> concurrent.futures.Future:
-    """Return a future that resolves with the completion text."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
 
-    future: concurrent.futures.Future = concurrent.futures.Future()
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            import concurrent.futures
 
-    async def runner() -> None:
-        result = await _chat_task_async(messages, model, max_tokens)
-        future.set_result(result)
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=sum(CONCURRENCY_LIMITS.values()),
+                thread_name_prefix="ant-hive-ai",
+            )
+        return self._executor
+
+    def http_client(self) -> AsyncChatClient:
+        if self._http_client is None:
+            from .ai_http import AsyncChatClient
+
+            self._http_client = AsyncChatClient(
+                _base_url,
+                api_key=os.getenv("OPENAI_API_KEY", ""),
+                max_concurrency=_max_concurrency,
+            )
+        return self._http_client
+
+    def reset_http_client(self) -> None:
+        import asyncio
+
+        client, self._http_client = self._http_client, None
+        if client is not None:
+            closing = asyncio.run_coroutine_threadsafe(client.aclose(), self.loop)
+            try:
+                closing.result(5.0)
+            except Exception:
+                pass
+
+    async def chat(
+        self, messages: list[dict], model: str, max_tokens: int
+    ) -> str | None:
+        if backend == "http":
+            return await self.http_client().chat(messages, model, max_tokens)
+        try:
+            resp = await self.loop.run_in_executor(
+                self.executor(),
+                lambda: openai.ChatCompletion.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                ),
+            )
+            return resp.choices[0].message["content"].strip()
+        except Exception:
+            return None
+
+    def close(self, timeout: float | None) -> None:
+        import asyncio
+        import concurrent.futures
+
+        concurrent.futures.wait(self.scheduler.in_flight(), timeout=timeout)
+        if self._http_client is not None:
+            closing = asyncio.run_coroutine_threadsafe(
+                self._http_client.aclose(), self.loop
+            )
+            try:
+                closing.result(timeout)
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            self.loop.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+_runtime: _Runtime | None = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> _Runtime:
+    """Return the AI runtime, starting its thread and event loop on first use."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = _Runtime()
+        return _runtime
+
+
+def is_running() -> bool:
+    return _runtime is not None
+
+
+def shutdown(timeout: float | None = None) -> None:
+    """Wait for in-flight requests, then stop the runtime's loop and threads.
+
+    The runtime starts again on the next :func:`chat_completion` call.
+    """
+    global _runtime
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    if runtime is not None:
+        runtime.close(timeout)
+
+
+def configure_backend(
+    name: str, base_url: str | None = None, max_concurrency: int | None = None
+) -> None:
+    """Select the ``"sdk"`` or ``"http"`` backend for later requests."""
+    global backend, _base_url, _max_concurrency
+    backend = name
+    if base_url is not None:
+        _base_url = base_url
+    if max_concurrency is not None:
+        _max_concurrency = max_concurrency
+    if _runtime is not None:
+        _runtime.reset_http_client()
+
+
+def get_http_client() -> AsyncChatClient:
+    """Return the shared HTTP client, creating it on first use."""
+    return get_runtime().http_client()
+
+
+def chat_completion(
+    messages: list[dict],
+    model: str,
+    max_tokens: int = 20,
+    priority: int = PRIORITY_NORMAL,
+) -> concurrent.futures.Future:
+    """Return a future that resolves with the completion text.
 
-    def schedule() -> None:  # pragma: no cover - thread handoff
-        asyncio.create_task(runner())
+    The future resolves to ``None`` if the request fails or is shed because
+    the queue for ``priority`` is saturated.
+    """
 
-    _loop.call_soon_threadsafe(schedule)
-    return future
+    runtime = get_runtime()
+    return runtime.scheduler.submit(
+        priority, lambda: runtime.chat(messages, model, max_tokens)
+    )
@@ -0,0 +1,116 @@
+"""Latency budgets and local fallback policies for AI decision points."""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Hashable
+
+if TYPE_CHECKING:  # pragma: no cover
+    import concurrent.futures
+
+
+class DecisionTable:
+    """Lookup table distilled from recorded LLM answers.
+
+    Every answer is counted against the quantized state it was asked for and
+    :meth:`lookup` returns the most common answer for that state.
+    """
+
+    def __init__(self) -> None:
+        self.counts: dict[Hashable, Counter] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def record(self, key: Hashable, answer: Any) -> None:
+        self.counts.setdefault(key, Counter())[answer] += 1
+
+    def lookup(self, key: Hashable) -> Any | None:
+        counter = self.counts.get(key)
+        if not counter:
+            return None
+        return counter.most_common(1)[0][0]
+
+    def save(self, path: str) -> None:
+        rows = [
+            [list(key), list(answer) if isinstance(answer, tuple) else answer, n]
+            for key, counter in self.counts.items()
+            for answer, n in counter.items()
+        ]
+        with open(path, "w") as fh:
+            json.dump(rows, fh)
+
+    @classmethod
+    def load(cls, path: str) -> "DecisionTable":
+        table = cls()
+        with open(path) as fh:
+            for key, answer, n in json.load(fh):
+                if isinstance(answer, list):
+                    answer = tuple(answer)
+                table.counts.setdefault(tuple(key), Counter())[answer] += n
+        return table
+
+
+class BudgetedDecision:
+    """Remote decision that falls back to a local policy after ``budget`` ticks.
+
+    :meth:`poll` is called once per tick.  It returns ``None`` while the remote
+    answer is still within its latency budget, the remote answer when it
+    arrives in time, and otherwise the fallback answer: the learned
+    :class:`DecisionTable` entry if there is one, else ``fallback()``.  A late
+    remote answer still trains the table before the next request is sent.
+    """
+
+    def __init__(self, budget: int, table: DecisionTable | None = None) -> None:
+        self.budget = budget
+        self.table = table
+        self.future: concurrent.futures.Future | None = None
+        self.waited = 0
+        self.expired = False
+        self.remote_answers = 0
+        self.fallback_answers = 0
+        self.late_answers = 0
+        self._key: Hashable = None
+
+    def poll(
+        self,
+        key: Hashable,
+        request: Callable[[], concurrent.futures.Future],
+        parse: Callable[[str | None], Any | None],
+        fallback: Callable[[], Any],
+    ) -> Any | None:
+        if self.future is not None and self.future.done():
+            expired = self.expired
+            answer = self._settle(parse)
+            if not expired:
+                if answer is not None:
+                    self.remote_answers += 1
+                    return answer
+                return self._fallback(key, fallback)
+            self.late_answers += 1
+        if self.future is None:
+            self.future = request()
+            self._key = key
+            self.waited = 0
+            self.expired = False
+        if not self.expired and self.waited < self.budget:
+            self.waited += 1
+            return None
+        self.expired = True
+        return self._fallback(key, fallback)
+
+    def _settle(self, parse: Callable[[str | None], Any | None]) -> Any | None:
+        answer = parse(self.future.result())
+        self.future = None
+        if answer is not None and self.table is not None:
+            self.table.record(self._key, answer)
+        return answer
+
+    def _fallback(self, key: Hashable, fallback: Callable[[], Any]) -> Any:
+        self.fallback_answers += 1
+        if self.table is not None:
+            answer = self.table.lookup(key)
+            if answer is not None:
+                return answer
+        return fallback()
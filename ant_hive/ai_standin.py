@@ -0,0 +1,104 @@
+"""Local stand-in for an OpenAI-compatible chat completion server.
+
+Used by tests and benchmarks to exercise the HTTP backend without network
+access or API keys.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+
+def echo_responder(payload: dict) -> str:
+    """Reply with the last user message."""
+    return payload["messages"][-1]["content"]
+
+
+class StandInServer:
+    """Serve ``/chat/completions`` on localhost using ``responder``.
+
+    ``responder`` receives the decoded request body and returns the reply
+    text.  ``delay`` adds artificial latency per request.  The server keeps
+    connections alive and counts connections, requests and the peak number
+    of requests handled concurrently.
+    """
+
+    def __init__(
+        self,
+        responder: Callable[[dict], str] = echo_responder,
+        delay: float = 0.0,
+    ) -> None:
+        self.responder = responder
+        self.delay = delay
+        self.connections = 0
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *_args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", "0"))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests.append(payload)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    text = server.responder(payload)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+                body = json.dumps(
+                    {"choices": [{"message": {"role": "assistant", "content": text}}]}
+                ).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up waiting, as a timing-out one does.
+                    self.close_connection = True
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *_exc) -> None:
+        self.stop()
@@ -0,0 +1,277 @@
+"""Precomputed terrain tile variants cached on disk.
+
+Drawing a tile used to mean decoding its texture, blending a depth shade
+and stacking separate shading and fog rectangles on top.  The atlas bakes
+every combination up front: each textured state at ``DEPTH_LEVELS`` depths,
+with any of the 16 edge masks (tunnels only), fogged or not.  Each variant
+is a raw RGB tile.  The result is written once to a versioned file under
+the cache directory and memory-mapped on later runs.  That file is named
+after a digest of the textures and colours, so editing either rebuilds it.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Mapping, Sequence
+
+from .utils import blend_color
+
+ATLAS_VERSION = 1
+DEPTH_LEVELS = 8
+# Deepest rows are blended this far toward black.
+MAX_DEPTH_SHADE = 0.5
+EDGE_SHADE = 0.5
+EDGE_WIDTH = 3
+FOG_SHADE = 0.75
+# Edge mask bits: a side is darkened when the neighbour there is no tunnel.
+EDGE_LEFT, EDGE_RIGHT, EDGE_UP, EDGE_DOWN = 1, 2, 4, 8
+EDGE_SIDES = ((-1, 0, EDGE_LEFT), (1, 0, EDGE_RIGHT), (0, -1, EDGE_UP), (0, 1, EDGE_DOWN))
+
+_MAGIC = b"ANTATLAS"
+_HEADER = struct.Struct(">8sII")
+
+Variant = tuple[str, int, int, bool]
+
+# Atlases already loaded by this process, keyed by source digest.
+_loaded: dict[str, "TextureAtlas"] = {}
+
+
+def default_cache_dir() -> str:
+    return os.getenv("ANT_HIVE_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "ant_hive"
+    )
+
+
+def depth_level(y: int, height: int) -> int:
+    """Quantized depth of row ``y`` in a map ``height`` tiles tall."""
+    if height <= 1:
+        return 0
+    return round(min(1.0, y / (height - 1)) * (DEPTH_LEVELS - 1))
+
+
+def _shade_table(amount: float) -> bytes:
+    return bytes(int(v * (1.0 - amount)) for v in range(256))
+
+
+def _decode_png(data: bytes) -> tuple[int, int, bytes]:
+    """Decode an 8-bit, non-interlaced RGB or RGBA PNG into RGBA bytes."""
+    width, height, depth, color_type, _, _, interlace = struct.unpack(
+        ">IIBBBBB", data[16:29]
+    )
+    if depth != 8 or color_type not in (2, 6) or interlace:
+        raise ValueError("unsupported PNG format")
+    channels = 4 if color_type == 6 else 3
+    idat = b""
+    pos = 8
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos:pos + 4])
+        if data[pos + 4:pos + 8] == b"IDAT":
+            idat += data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+    raw = zlib.decompress(idat)
+    stride = width * channels
+    prev = bytearray(stride)
+    out = bytearray()
+    for row in range(height):
+        start = row * (stride + 1)
+        kind = raw[start]
+        line = bytearray(raw[start + 1:start + 1 + stride])
+        for i in range(stride):
+            left = line[i - channels] if i >= channels else 0
+            up = prev[i]
+            corner = prev[i - channels] if i >= channels else 0
+            if kind == 1:
+                line[i] = (line[i] + left) & 0xFF
+            elif kind == 2:
+                line[i] = (line[i] + up) & 0xFF
+            elif kind == 3:
+                line[i] = (line[i] + (left + up) // 2) & 0xFF
+            elif kind == 4:
+                p = left + up - corner
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - corner)
+                pred = left if pa <= pb and pa <= pc else up if pb <= pc else corner
+                line[i] = (line[i] + pred) & 0xFF
+        prev = line
+        if channels == 3:
+            for i in range(0, stride, 3):
+                out += line[i:i + 3] + b"\xff"
+        else:
+            out += line
+    return width, height, bytes(out)
+
+
+def _flatten(rgba: bytes, background: str) -> bytes:
+    """Composite RGBA pixels over a solid ``background`` colour."""
+    bg = [int(background[i:i + 2], 16) for i in (1, 3, 5)]
+    out = bytearray()
+    for i in range(0, len(rgba), 4):
+        a = rgba[i + 3]
+        for c in range(3):
+            out.append((rgba[i + c] * a + bg[c] * (255 - a)) // 255)
+    return bytes(out)
+
+
+def _source_digest(textures: Mapping[str, Sequence[str]], colors: Mapping[str, str]) -> str:
+    blob = json.dumps(
+        [ATLAS_VERSION, DEPTH_LEVELS, sorted(textures.items()), sorted(colors.items())]
+    )
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class TextureAtlas:
+    """Lookup of baked tile pixels and depth-shaded fill colours."""
+
+    def __init__(
+        self,
+        digest: str,
+        tile: int,
+        colors: dict[str, list[str]],
+        offsets: dict[Variant, int],
+        pixels,
+    ) -> None:
+        self.digest = digest
+        self.tile = tile
+        self.colors = colors
+        self.offsets = offsets
+        self.pixels = pixels
+        self.states = {state for state, _, _, _ in offsets}
+
+    def color(self, state: str, level: int) -> str:
+        return self.colors[state][level]
+
+    def rgb(self, variant: Variant) -> bytes:
+        start = self.offsets[variant]
+        return bytes(self.pixels[start:start + self.tile * self.tile * 3])
+
+    def ppm(self, variant: Variant) -> bytes:
+        """Binary PPM of one variant, ready for ``tk.PhotoImage(data=...)``."""
+        return b"P6\n%d %d\n255\n" % (self.tile, self.tile) + self.rgb(variant)
+
+    # -- building ----------------------------------------------------------
+
+    @classmethod
+    def build(cls, textures: Mapping[str, Sequence[str]], colors: Mapping[str, str]) -> "TextureAtlas":
+        shades = {}
+        for state, color in colors.items():
+            shades[state] = [
+                blend_color(None, "black", color, MAX_DEPTH_SHADE * level / (DEPTH_LEVELS - 1))
+                for level in range(DEPTH_LEVELS)
+            ]
+        depth_tables = [
+            _shade_table(MAX_DEPTH_SHADE * level / (DEPTH_LEVELS - 1))
+            for level in range(DEPTH_LEVELS)
+        ]
+        edge_table = _shade_table(EDGE_SHADE)
+        fog_table = _shade_table(FOG_SHADE)
+        offsets: dict[Variant, int] = {}
+        blob = bytearray()
+        tile = 0
+        for state in sorted(textures):
+            width, height, rgba = _decode_png(base64.b64decode("".join(textures[state])))
+            tile = width
+            base = _flatten(rgba, colors[state])
+            masks = range(16) if state == "tunnel" else (0,)
+            for level, table in enumerate(depth_tables):
+                shaded = base.translate(table)
+                for mask in masks:
+                    edged = _edge_shade(shaded, width, height, mask, edge_table)
+                    for fogged in (False, True):
+                        offsets[(state, level, mask, fogged)] = len(blob)
+                        blob += edged.translate(fog_table) if fogged else edged
+        digest = _source_digest(textures, colors)
+        return cls(digest, tile, shades, offsets, bytes(blob))
+
+    # -- cache file --------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write the atlas to ``path`` atomically."""
+        header = json.dumps(
+            {
+                "digest": self.digest,
+                "tile": self.tile,
+                "colors": self.colors,
+                "variants": [[*key, offset] for key, offset in self.offsets.items()],
+            }
+        ).encode()
+        folder = os.path.dirname(path) or "."
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(_HEADER.pack(_MAGIC, ATLAS_VERSION, len(header)))
+                fh.write(header)
+                fh.write(self.pixels)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "TextureAtlas":
+        """Memory-map an atlas written by :meth:`save`."""
+        with open(path, "rb") as fh:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != ATLAS_VERSION:
+            raise ValueError(f"not a version {ATLAS_VERSION} atlas: {path}")
+        start = _HEADER.size + size
+        header = json.loads(data[_HEADER.size:start])
+        offsets = {
+            (state, level, mask, bool(fogged)): start + offset
+            for state, level, mask, fogged, offset in header["variants"]
+        }
+        return cls(header["digest"], header["tile"], header["colors"], offsets, data)
+
+
+def _edge_shade(pixels: bytes, width: int, height: int, mask: int, table: bytes) -> bytes:
+    if not mask:
+        return pixels
+    out = bytearray(pixels)
+    for y in range(height):
+        for x in range(width):
+            if (
+                (mask & EDGE_LEFT and x < EDGE_WIDTH)
+                or (mask & EDGE_RIGHT and x >= width - EDGE_WIDTH)
+                or (mask & EDGE_UP and y < EDGE_WIDTH)
+                or (mask & EDGE_DOWN and y >= height - EDGE_WIDTH)
+            ):
+                i = (y * width + x) * 3
+                out[i:i + 3] = out[i:i + 3].translate(table)
+    return bytes(out)
+
+
+def load_atlas(
+    textures: Mapping[str, Sequence[str]],
+    colors: Mapping[str, str],
+    cache_dir: str | None = None,
+) -> TextureAtlas:
+    """Return the atlas for ``textures`` and ``colors``.
+
+    Loaded from the cache file when one matches, otherwise built and saved.
+    An unwritable cache directory only costs the rebuild.
+    """
+    digest = _source_digest(textures, colors)
+    atlas = _loaded.get(digest)
+    if atlas is not None:
+        return atlas
+    path = os.path.join(
+        cache_dir or default_cache_dir(), f"terrain-atlas-v{ATLAS_VERSION}-{digest[:16]}.bin"
+    )
+    try:
+        atlas = TextureAtlas.load(path)
+    except (OSError, ValueError):
+        atlas = TextureAtlas.build(textures, colors)
+        try:
+            atlas.save(path)
+        except OSError:
+            pass
+    _loaded[digest] = atlas
+    return atlas
@@ -0,0 +1,51 @@
+"""Tick-driven simulation clock.
+
+Day and night used to follow the wall clock, so a colony day always took
+60 real seconds.  :class:`SimClock` counts simulation ticks instead: a day
+is ``DAY_SECONDS`` of simulated time whether the ticks run at the normal
+pace, fast-forwarded or headless.
+"""
+
+from __future__ import annotations
+
+from .constants import TICK_MS
+from .utils import brightness_at
+
+DAY_SECONDS = 60.0
+NIGHT_START = 30.0
+
+
+class SimClock:
+    """Simulated time, advanced one tick of ``tick_ms`` at a time."""
+
+    def __init__(self, tick_ms: int = TICK_MS) -> None:
+        self.tick_ms = tick_ms
+        self.ticks = 0
+
+    def advance(self, ticks: int = 1) -> None:
+        self.ticks += ticks
+
+    @property
+    def seconds(self) -> float:
+        return self.ticks * self.tick_ms / 1000
+
+    @property
+    def ticks_per_day(self) -> int:
+        return round(DAY_SECONDS * 1000 / self.tick_ms)
+
+    @property
+    def day(self) -> int:
+        return int(self.seconds // DAY_SECONDS) + 1
+
+    @property
+    def phase(self) -> float:
+        """Fraction of the current day elapsed, from 0.0 up to 1.0."""
+        return (self.seconds % DAY_SECONDS) / DAY_SECONDS
+
+    @property
+    def is_night(self) -> bool:
+        return self.seconds % DAY_SECONDS >= NIGHT_START
+
+    @property
+    def brightness(self) -> float:
+        return brightness_at(self.seconds)
@@ -0,0 +1,177 @@
+"""Connected-component index over terrain tiles.
+
+:class:`TileComponents` groups tiles matching a predicate (tunnel tiles, or
+all walkable ground) into 8-connected components with a union-find.  The
+index follows the terrain's chunks rather than its bounds.  A chunk's tiles
+are read in only when a query lands on a component that reaches it, so the
+cost of a query follows the size of the components asked about, not the
+map.  A tile joining the set merges its neighbours' components in
+near-constant time.  A tile leaving the set, such as a tunnel collapsing,
+relabels only the component it belonged to.  Diagonal neighbours count as
+connected even when both corner tiles are blocked, so components may be
+slightly larger than what ants can actually walk.  A "different component"
+answer is therefore always safe to use for pruning goals.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from .navigation import NEIGHBOURS
+from .terrain import TILE_TUNNEL
+from .world import CHUNK_SHIFT, CHUNK_SIZE, Chunk, chunks_in
+
+Tile = tuple[int, int]
+
+
+def is_tunnel(state: str) -> bool:
+    return state == TILE_TUNNEL
+
+
+class TileComponents:
+    """Union-find over the tiles of ``terrain`` whose state passes ``member``.
+
+    Every query settles the components it looks at: chunks they reach are
+    read in until each one is bounded by blocked tiles or the map edge.
+    """
+
+    def __init__(self, terrain, member: Callable[[str], bool] = is_tunnel) -> None:
+        self.terrain = terrain
+        self.member = member
+        self.parent: dict[Tile, Tile] = {}
+        self.sizes: dict[Tile, int] = {}
+        self.members: dict[Tile, list[Tile]] = {}
+        # Chunks read in so far, and per component the unread chunks its
+        # tiles border on.
+        self.indexed: set[Chunk] = set()
+        self.frontier: dict[Tile, set[Chunk]] = {}
+        self.relabels = 0
+        self.width = terrain.width
+        self.height = terrain.height
+        terrain.add_listener(self._on_terrain_change)
+
+    def _check_bounds(self) -> bool:
+        """Start over if the map was resized; edge chunks may have grown.
+
+        Return whether it was.
+        """
+        w, h = self.terrain.width, self.terrain.height
+        if (w, h) == (self.width, self.height):
+            return False
+        self.width, self.height = w, h
+        self.parent.clear()
+        self.sizes.clear()
+        self.members.clear()
+        self.indexed.clear()
+        self.frontier.clear()
+        return True
+
+    def _index(self, key: Chunk) -> None:
+        """Read in the member tiles of chunk ``key``."""
+        self.indexed.add(key)
+        x0, y0 = key[0] << CHUNK_SHIFT, key[1] << CHUNK_SHIFT
+        get_cell, member = self.terrain.get_cell, self.member
+        for x in range(x0, min(x0 + CHUNK_SIZE, self.width)):
+            for y in range(y0, min(y0 + CHUNK_SIZE, self.height)):
+                if member(get_cell(x, y)):
+                    self._add((x, y))
+
+    def _settle(self, tile: Tile) -> Tile | None:
+        """Read in every chunk ``tile``'s component reaches; return its root."""
+        x, y = tile
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        if key not in self.indexed:
+            self._index(key)
+        if tile not in self.parent:
+            return None
+        root = self._find(tile)
+        frontier = self.frontier[root]
+        while frontier:
+            key = frontier.pop()
+            if key not in self.indexed:
+                self._index(key)
+                root = self._find(tile)
+                frontier = self.frontier[root]
+        return root
+
+    def __len__(self) -> int:
+        """Number of components on the whole map; reads in every chunk."""
+        self._check_bounds()
+        for key in chunks_in(0, 0, self.width, self.height):
+            if key not in self.indexed:
+                self._index(key)
+        return len(self.sizes)
+
+    def component_of(self, tile: Tile) -> Tile | None:
+        """Return the representative tile of ``tile``'s component."""
+        self._check_bounds()
+        return self._settle(tile)
+
+    def component_size(self, tile: Tile) -> int:
+        root = self.component_of(tile)
+        return 0 if root is None else self.sizes[root]
+
+    def same_component(self, a: Tile, b: Tile) -> bool:
+        root = self.component_of(a)
+        return root is not None and root == self.component_of(b)
+
+    def _find(self, tile: Tile) -> Tile:
+        parent = self.parent
+        while parent[tile] != tile:
+            parent[tile] = parent[parent[tile]]
+            tile = parent[tile]
+        return tile
+
+    def _union(self, a: Tile, b: Tile) -> None:
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return
+        if self.sizes[ra] < self.sizes[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.sizes[ra] += self.sizes.pop(rb)
+        self.members[ra].extend(self.members.pop(rb))
+        self.frontier[ra] |= self.frontier.pop(rb)
+
+    def _add(self, tile: Tile) -> None:
+        self.parent[tile] = tile
+        self.sizes[tile] = 1
+        self.members[tile] = [tile]
+        frontier = self.frontier[tile] = set()
+        x, y = tile
+        for dx, dy in NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if (nx, ny) in self.parent:
+                self._union(tile, (nx, ny))
+            elif 0 <= nx < self.width and 0 <= ny < self.height:
+                key = (nx >> CHUNK_SHIFT, ny >> CHUNK_SHIFT)
+                if key not in self.indexed:
+                    frontier.add(key)
+
+    def _remove(self, tile: Tile) -> None:
+        root = self._find(tile)
+        group = self.members.pop(root)
+        del self.sizes[root]
+        del self.frontier[root]
+        for member in group:
+            del self.parent[member]
+        # Only the component that lost the tile can split; relabel it alone.
+        for member in group:
+            if member != tile:
+                self._add(member)
+        self.relabels += 1
+
+    def _on_terrain_change(self, x: int, y: int, old: str, new: str) -> None:
+        if self._check_bounds() or not (0 <= x < self.width and 0 <= y < self.height):
+            return
+        if (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT) not in self.indexed:
+            # Read as it is when a query first reaches the chunk.
+            return
+        was_member = self.member(old)
+        is_member = self.member(new)
+        if is_member and not was_member:
+            self._add((x, y))
+        elif was_member and not is_member:
+            self._remove((x, y))
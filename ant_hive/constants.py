@@ -31,3 +31,24 @@ ENERGY_DECAY = 0.05
 
 # Distance in pixels to trigger the predator proximity alert
 PREDATOR_ALERT_RANGE = 120
+
+# Ticks an AI decision may wait for the model before a local policy answers
+AI_MOVE_BUDGET_TICKS = 2
+AI_SPAWN_BUDGET_TICKS = 10
+
+# Ticks between sweeps that hide and compress terrain chunks nobody touched
+TERRAIN_EVICT_TICKS = 100
+
+# Ticks between updates for an entity in each activity state; see
+# ant_hive/scheduler.py.  Foragers and anything unclassified run every tick.
+UPDATE_CADENCE = {
+    "active": 1,
+    "idle": 3,
+    "resting": 5,
+    "sleeping": 5,
+}
+
+# Target interval between simulation ticks, and the longest stretch of entity
+# updates run before yielding to Tk so input and redraws get a turn.
+TICK_MS = 100
+SLICE_BUDGET_MS = 25
@@ -3,8 +3,6 @@ import os
 import random
 from typing import Tuple
 
-import tkinter as tk
-
 from ..constants import (
     ANT_SIZE,
     ENERGY_MAX,
@@ -15,8 +13,13 @@ from ..constants import (
     WINDOW_WIDTH,
     WINDOW_HEIGHT,
     PALETTE,
+    AI_MOVE_BUDGET_TICKS,
 )
-from ..sprites import ANT_SPRITES
+from ..ai_policy import BudgetedDecision, DecisionTable
+from ..prompt_encoding import MOVE, build_messages, relative_tiles
+from ..sprites import ANT_SPRITES, load_ant_sprites
+from ..utils import is_tk_canvas
+from .. import rng
 from ..terrain import (
     Terrain,
     TILE_SIZE,
@@ -25,15 +28,25 @@ from ..terrain import (
     TILE_ROCK,
     TILE_COLLAPSED,
 )
-from ..ai_interface import chat_completion
+from ..ai_interface import chat_completion, PRIORITY_NORMAL
+from ..navigation import DistanceField
+
+
+# Offsets a random step picks from on each axis.
+STEPS = (-MOVE_STEP, 0, MOVE_STEP)
 
 
 class BaseAnt:
+    # Ticks since the previous update; set by the sim's UpdateScheduler.
+    tick_span = 1
+
     def __init__(
         self, sim: "AntSim", x: int, y: int, color: str = "black", energy: int = 100
     ) -> None:
         self.sim = sim
         self.color = color
+        if is_tk_canvas(sim.canvas):
+            load_ant_sprites()
         self.item: int = sim.canvas.create_rectangle(
             x,
             y,
@@ -74,6 +87,9 @@ class BaseAnt:
         self.role: str = self.__class__.__name__
         self.ant_id: int = self.item
         self.terrain: Terrain | None = getattr(sim, "terrain", None)
+        self.rng = rng.spawn(sim, "ant")
+        # Random steps drawn in blocks; None falls back to rng.choice.
+        self.steps = None if self.rng is random else rng.Draws(self.rng, STEPS)
 
     def attempt_move(self, dx: int, dy: int) -> None:
         if self.energy <= 0:
@@ -114,23 +130,66 @@ class BaseAnt:
         self.sim.canvas.move(self.item, dx_move, dy_move)
         self.sim.canvas.move(self.image_id, dx_move, dy_move)
 
+    def random_step(self) -> Tuple[int, int]:
+        steps = self.steps
+        if steps is None:
+            return self.rng.choice(STEPS), self.rng.choice(STEPS)
+        return steps(), steps()
+
     def move_random(self) -> None:
-        dx = random.choice([-MOVE_STEP, 0, MOVE_STEP])
-        dy = random.choice([-MOVE_STEP, 0, MOVE_STEP])
-        self.attempt_move(dx, dy)
+        self.attempt_move(*self.random_step())
 
     def move_towards(self, target: int) -> None:
         x1, y1, _, _ = self.sim.canvas.coords(self.item)
-        tx1, ty1, _, _ = self.sim.canvas.coords(target)
+        tx1, ty1, tx2, ty2 = self.sim.canvas.coords(target)
+        paths = getattr(self.sim, "paths", None)
+        if paths is not None:
+            goal = (int(((tx1 + tx2) / 2) // TILE_SIZE), int(((ty1 + ty2) / 2) // TILE_SIZE))
+            step = paths.next_step(self.current_tile(), goal)
+            if step is not None:
+                self.attempt_move(step[0] * MOVE_STEP, step[1] * MOVE_STEP)
+                return
         dx = MOVE_STEP if x1 < tx1 else -MOVE_STEP if x1 > tx1 else 0
         dy = MOVE_STEP if y1 < ty1 else -MOVE_STEP if y1 > ty1 else 0
         self.attempt_move(dx, dy)
 
+    def current_tile(self) -> tuple[int, int]:
+        x1, y1, x2, y2 = self.sim.canvas.coords(self.item)
+        return int(((x1 + x2) / 2) // TILE_SIZE), int(((y1 + y2) / 2) // TILE_SIZE)
+
+    def follow_field(self, field: "DistanceField | None") -> bool:
+        """Take one step down ``field``; return ``False`` if it has none."""
+        if field is None:
+            return False
+        step = field.step(*self.current_tile())
+        if step is None:
+            return False
+        self.attempt_move(step[0] * MOVE_STEP, step[1] * MOVE_STEP)
+        return True
+
+    def move_home(self) -> None:
+        """Head for the queen along the colony's shared home field."""
+        if not self.follow_field(getattr(self.sim, "home_field", None)):
+            self.move_towards(self.sim.queen.item)
+
+    def at_home(self) -> bool:
+        field = getattr(self.sim, "home_field", None)
+        if field is None:
+            return False
+        distance = field.distance(*self.current_tile())
+        return distance is not None and distance <= 1
+
+    def activity(self) -> str:
+        """Activity state used to pick this ant's update cadence."""
+        if getattr(self.sim, "is_night", False) and not self.carrying_food and self.at_home():
+            return "sleeping"
+        return "active"
+
     def consume_energy(self, amount: int) -> None:
         self.energy = max(0, self.energy - amount)
 
     def rest(self) -> None:
-        self.energy = min(ENERGY_MAX, self.energy + REST_ENERGY_GAIN)
+        self.energy = min(ENERGY_MAX, self.energy + REST_ENERGY_GAIN * self.tick_span)
 
     def dig(self) -> None:
         self.consume_energy(DIG_ENERGY_COST)
@@ -205,7 +264,7 @@ class BaseAnt:
             self.die()
             return
         if getattr(self.sim, "is_night", False) and hasattr(self.sim, "queen"):
-            self.move_towards(self.sim.queen.item)
+            self.move_home()
         else:
             self.move_random()
         coords = self.sim.canvas.coords(self.item)
@@ -216,7 +275,7 @@ class BaseAnt:
         )
         from ..constants import ENERGY_DECAY
 
-        self.energy = max(0, self.energy - ENERGY_DECAY)
+        self.energy = max(0, self.energy - ENERGY_DECAY * self.tick_span)
         if self.energy <= 0:
             self.die()
         self.update_visibility()
@@ -225,6 +284,9 @@ class BaseAnt:
 class AIBaseAnt(BaseAnt):
     """Ant that decides movement using the OpenAI API."""
 
+    # Answers recorded from the model, shared by all AI ants as a fallback.
+    move_table = DecisionTable()
+
     def __init__(
         self,
         sim: "AntSim",
@@ -232,17 +294,38 @@ class AIBaseAnt(BaseAnt):
         y: int,
         color: str = "black",
         model: str | None = None,
+        budget: int = AI_MOVE_BUDGET_TICKS,
     ) -> None:
         super().__init__(sim, x, y, color)
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-        self._future = None
+        self._decision = BudgetedDecision(budget, self.move_table)
+
+    @property
+    def _future(self):
+        return self._decision.future
+
+    def _random_move(self) -> Tuple[int, int]:
+        return self.random_step()
+
+    @staticmethod
+    def _move_key(ant: list[float], food: list[float], queen: list[float]):
+        """Quantize the relative food and queen positions into tile offsets."""
+        return relative_tiles(ant, food, 3) + relative_tiles(ant, queen, 3)
+
+    @staticmethod
+    def _parse_move(result: str | None) -> Tuple[int, int] | None:
+        if not result:
+            return None
+        try:
+            data = json.loads(result)
+            return int(data.get("dx", 0)), int(data.get("dy", 0))
+        except Exception:
+            return None
 
     def get_ai_move(self) -> Tuple[int, int]:
         key = os.getenv("OPENAI_API_KEY")
         if not key:
-            return random.choice([-MOVE_STEP, 0, MOVE_STEP]), random.choice(
-                [-MOVE_STEP, 0, MOVE_STEP]
-            )
+            return self._random_move()
         food_item = getattr(self.sim, "food", None)
         food_coords = (
             self.sim.canvas.coords(food_item) if food_item is not None else [0, 0, 0, 0]
@@ -252,26 +335,15 @@ class AIBaseAnt(BaseAnt):
             "food": food_coords,
             "queen": self.sim.canvas.coords(self.sim.queen.item),
         }
-        messages = [
-            {
-                "role": "system",
-                "content": 'You control an ant in a grid. Respond with JSON like {"dx":5,"dy":0}.',
-            },
-            {"role": "user", "content": json.dumps(state)},
-        ]
-        if self._future is None:
-            self._future = chat_completion(messages, self.model, 10)
-            return 0, 0
-        if self._future.done():
-            result = self._future.result()
-            self._future = None
-            if result:
-                try:
-                    data = json.loads(result)
-                    return int(data.get("dx", 0)), int(data.get("dy", 0))
-                except Exception:
-                    pass
-        return 0, 0
+        move = self._decision.poll(
+            self._move_key(state["ant"], state["food"], state["queen"]),
+            lambda: chat_completion(
+                build_messages(MOVE, state), self.model, 10, priority=PRIORITY_NORMAL
+            ),
+            self._parse_move,
+            self._random_move,
+        )
+        return move if move is not None else (0, 0)
 
     def update(self) -> None:
         if not self.alive:
@@ -280,7 +352,7 @@ class AIBaseAnt(BaseAnt):
             self.die()
             return
         if getattr(self.sim, "is_night", False) and hasattr(self.sim, "queen"):
-            self.move_towards(self.sim.queen.item)
+            self.move_home()
         else:
             dx, dy = self.get_ai_move()
             self.attempt_move(dx, dy)
@@ -288,7 +360,7 @@ class AIBaseAnt(BaseAnt):
         self.last_pos = (coords[0], coords[1])
         from ..constants import ENERGY_DECAY
 
-        self.energy = max(0, self.energy - ENERGY_DECAY)
+        self.energy = max(0, self.energy - ENERGY_DECAY * self.tick_span)
         if self.energy <= 0:
             self.die()
         self.update_visibility()
@@ -18,7 +18,7 @@ class DroneAnt(BaseAnt):
         if self.cooldown > 0:
             self.cooldown -= 1
         if getattr(self.sim, "is_night", False):
-            self.move_towards(self.sim.queen.item)
+            self.move_home()
         else:
             self.move_random()
         qx1, qy1, qx2, qy2 = self.sim.canvas.coords(self.sim.queen.item)
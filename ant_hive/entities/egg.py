@@ -1,6 +1,5 @@
-import random
-
 from ..constants import ANT_SIZE
+from .. import rng
 from .worker import WorkerAnt
 from .scout import ScoutAnt
 from .soldier import SoldierAnt
@@ -8,23 +7,33 @@ from .nurse import NurseAnt
 from .drone import DroneAnt
 
 
+# Ant class and colour hatched for each role, and the odds of each role.
+HATCH_ROLES = {
+    "worker": (WorkerAnt, "blue"),
+    "scout": (ScoutAnt, "black"),
+    "soldier": (SoldierAnt, "orange"),
+    "nurse": (NurseAnt, "pink"),
+    "drone": (DroneAnt, "purple"),
+}
+HATCH_WEIGHTS = {"worker": 0.4, "scout": 0.2, "soldier": 0.2, "nurse": 0.15, "drone": 0.05}
+
+
 def hatch_random_ant(sim: "AntSim", x: int, y: int):
     """Return a new ant instance using weighted role probabilities."""
-    r = random.random()
-    if r < 0.4:
-        return WorkerAnt(sim, x, y, "blue")
-    if r < 0.6:
-        return ScoutAnt(sim, x, y, "black")
-    if r < 0.8:
-        return SoldierAnt(sim, x, y, "orange")
-    if r < 0.95:
-        return NurseAnt(sim, x, y, "pink")
-    return DroneAnt(sim, x, y, "purple")
+    r = rng.stream(sim, "hatch").random() * sum(HATCH_WEIGHTS.values())
+    for role, weight in HATCH_WEIGHTS.items():
+        r -= weight
+        if r < 0:
+            break
+    cls, color = HATCH_ROLES[role]
+    return cls(sim, x, y, color)
 
 
 class Egg:
     """Represents an egg that hatches into a random ant role."""
 
+    tick_span = 1
+
     def __init__(self, sim: "AntSim", x: int, y: int, hatch_time: int = 200) -> None:
         self.sim = sim
         self.hatch_time = hatch_time
@@ -32,8 +41,11 @@ class Egg:
             x, y, x + ANT_SIZE, y + ANT_SIZE, fill="white"
         )
 
+    def activity(self) -> str:
+        return "idle"
+
     def update(self) -> None:
-        self.hatch_time -= 1
+        self.hatch_time -= self.tick_span
         if self.hatch_time <= 0:
             x1, y1, _, _ = self.sim.canvas.coords(self.item)
             self.sim.canvas.delete(self.item)
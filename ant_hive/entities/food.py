@@ -1,5 +1,6 @@
-from ..constants import FOOD_SIZE
+from ..constants import FOOD_SIZE, TILE_SIZE
 from ..sprites import create_glowing_icon
+from ..utils import is_tk_canvas
 
 
 class FoodDrop:
@@ -22,7 +23,7 @@ class FoodDrop:
         self.image_item = None
         self.tooltip = None
 
-        if hasattr(sim.canvas, "create_image"):
+        if is_tk_canvas(sim.canvas):
             self.icon = create_glowing_icon(FOOD_SIZE)
             self.flash_icon = create_glowing_icon(FOOD_SIZE, inner="#ffffff", outer="#ffcc00")
             self.image_item = sim.canvas.create_image(x, y, image=self.icon, anchor="nw")
@@ -38,6 +39,10 @@ class FoodDrop:
             sim.canvas.tag_bind(self.image_item, "<Leave>", self._hide_tooltip)
             sim.canvas.tag_bind(self.image_item, "<Button-1>", self._on_click)
 
+    def tile(self) -> tuple[int, int]:
+        x1, y1, x2, y2 = self.sim.canvas.coords(self.item)
+        return int(((x1 + x2) / 2) // TILE_SIZE), int(((y1 + y2) / 2) // TILE_SIZE)
+
     def _show_tooltip(self, _event=None) -> None:
         if self.tooltip is not None:
             self.sim.canvas.itemconfigure(self.tooltip, state="normal")
@@ -65,6 +70,9 @@ class FoodDrop:
         if self.tooltip is not None:
             self.sim.canvas.itemconfigure(self.tooltip, text=f"{self.charges} left")
         if self.charges <= 0:
+            field = getattr(self.sim, "food_field", None)
+            if field is not None:
+                field.remove_source(self)
             self.sim.canvas.delete(self.item)
             if self.image_item:
                 self.sim.canvas.delete(self.image_item)
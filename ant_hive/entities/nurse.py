@@ -1,5 +1,3 @@
-import random
-
 from ..constants import ANT_SIZE
 from .base_ant import BaseAnt
 
@@ -7,9 +5,14 @@ from .base_ant import BaseAnt
 class NurseAnt(BaseAnt):
     """Ant that tends to the queen, feeding her when nearby."""
 
+    def activity(self) -> str:
+        if self.energy <= 0:
+            return "resting"
+        return super().activity()
+
     def update(self) -> None:
         if getattr(self.sim, "is_night", False):
-            self.move_towards(self.sim.queen.item)
+            self.move_home()
             coords = self.sim.canvas.coords(self.item)
             self.last_pos = (coords[0], coords[1])
             return
@@ -22,7 +25,7 @@ class NurseAnt(BaseAnt):
                 if hasattr(self.sim, "queen_fed"):
                     self.sim.queen.fed += 1
                     self.sim.queen_fed += 1
-                if random.random() < 0.3:
+                if self.rng.random() < 0.3:
                     qx1, qy1, _, _ = self.sim.canvas.coords(self.sim.queen.item)
                     self.sim.queen.lay_egg(int(qx1 + 20), int(qy1))
         coords = self.sim.canvas.coords(self.item)
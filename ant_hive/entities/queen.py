@@ -1,8 +1,5 @@
-import json
 import os
-import random
 import time
-import tkinter as tk
 
 from ..constants import (
     ANT_SIZE,
@@ -11,9 +8,14 @@ from ..constants import (
     PALETTE,
     MOVE_STEP,
     TILE_SIZE,
+    AI_SPAWN_BUDGET_TICKS,
 )
+from ..ai_policy import BudgetedDecision, DecisionTable
+from ..prompt_encoding import SPAWN, THOUGHT, build_messages
 from ..terrain import TILE_TUNNEL
-from ..ai_interface import chat_completion
+from ..utils import is_tk_canvas
+from .. import rng
+from ..ai_interface import chat_completion, PRIORITY_CRITICAL, PRIORITY_LOW
 from .egg import Egg, hatch_random_ant
 from .worker import WorkerAnt
 from .base_ant import BaseAnt
@@ -22,6 +24,9 @@ from .base_ant import BaseAnt
 class Queen:
     """Represents the colony's queen. Uses OpenAI for spawn decisions."""
 
+    # Spawn answers recorded from the model, used when it is too slow.
+    spawn_table = DecisionTable()
+
     def __init__(self, sim: "AntSim", x: int, y: int, model: str | None = None) -> None:
         self.sim = sim
         self.item: int = sim.canvas.create_oval(
@@ -53,9 +58,10 @@ class Queen:
         self.expression_item = None
         self.thinking_item = None
         self._thought_future = None
-        self._spawn_future = None
+        self._spawn_decision = BudgetedDecision(AI_SPAWN_BUDGET_TICKS, self.spawn_table)
         self.mood = "content"
-        if isinstance(sim.canvas, tk.Canvas):
+        self.rng = rng.spawn(sim, "queen")
+        if is_tk_canvas(sim.canvas):
             self.glow_item = sim.canvas.create_oval(
                 x - 5,
                 y - 10,
@@ -138,33 +144,39 @@ class Queen:
             self.thought_timer -= 1
             return self.current_thought
         if not key:
-            new_thought = random.choice(default)
+            new_thought = self.rng.choice(default)
             self.current_thought = new_thought
             self.thought_timer = 5
             return new_thought
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a curious ant queen. "
-                    "Speak in eight words or fewer about current observations."
-                ),
-            },
-            {"role": "user", "content": json.dumps(prompt)},
-        ]
         if self._thought_future is None:
-            self._thought_future = chat_completion(messages, self.model, 20)
+            self._thought_future = chat_completion(
+                build_messages(THOUGHT, prompt), self.model, 20, priority=PRIORITY_LOW
+            )
             return self.current_thought
         if self._thought_future.done():
             resp = self._thought_future.result()
             self._thought_future = None
-            new_thought = resp or random.choice(default)
+            new_thought = resp or self.rng.choice(default)
             new_thought = " ".join(new_thought.split()[:8])
             self.current_thought = new_thought
             self.thought_timer = 5
             return new_thought
         return self.current_thought
 
+    @property
+    def _spawn_future(self):
+        return self._spawn_decision.future
+
+    def _spawn_heuristic(self, counts: dict[str, int]) -> bool:
+        worker_count = counts.get("WorkerAnt", 0)
+        return self.sim.food_collected > worker_count and self.hunger > 30
+
+    @staticmethod
+    def _parse_spawn(resp: str | None) -> bool | None:
+        if not resp:
+            return None
+        return resp.strip().lower().startswith("y")
+
     def decide_spawn(self) -> bool | None:
         key = os.getenv("OPENAI_API_KEY")
         counts: dict[str, int] = {}
@@ -172,29 +184,26 @@ class Queen:
             role = getattr(ant, "role", ant.__class__.__name__)
             counts[role] = counts.get(role, 0) + 1
         if not key:
-            worker_count = counts.get("WorkerAnt", 0)
-            return self.sim.food_collected > worker_count and self.hunger > 30
+            return self._spawn_heuristic(counts)
         prompt = {
             "hunger": self.hunger,
             "ants": len(self.sim.ants),
             "food": self.sim.food_collected,
             "population": counts,
         }
-        messages = [
-            {
-                "role": "system",
-                "content": "Respond with yes or no if the queen should spawn a new worker.",
-            },
-            {"role": "user", "content": json.dumps(prompt)},
-        ]
-        if self._spawn_future is None:
-            self._spawn_future = chat_completion(messages, self.model, 1)
-            return None
-        if self._spawn_future.done():
-            resp = self._spawn_future.result()
-            self._spawn_future = None
-            return resp is None or resp.strip().lower().startswith("y")
-        return None
+        state_key = (
+            int(self.hunger) // 20,
+            min(len(self.sim.ants), 50) // 5,
+            min(self.sim.food_collected, 50) // 5,
+        )
+        return self._spawn_decision.poll(
+            state_key,
+            lambda: chat_completion(
+                build_messages(SPAWN, prompt), self.model, 1, priority=PRIORITY_CRITICAL
+            ),
+            self._parse_spawn,
+            lambda: self._spawn_heuristic(counts),
+        )
 
     def rescue_stuck_ants(self) -> None:
         for ant in self.sim.ants:
@@ -203,8 +212,8 @@ class Queen:
             if last is not None and coords[:2] == list(last):
                 self.sim.canvas.move(
                     ant.item,
-                    random.choice([-MOVE_STEP, MOVE_STEP]),
-                    random.choice([-MOVE_STEP, MOVE_STEP]),
+                    self.rng.choice([-MOVE_STEP, MOVE_STEP]),
+                    self.rng.choice([-MOVE_STEP, MOVE_STEP]),
                 )
                 coords = self.sim.canvas.coords(ant.item)
             self.ant_positions[ant.item] = (coords[0], coords[1])
@@ -307,11 +316,20 @@ class Queen:
                 except Exception:
                     pass
 
+    def sync_home_field(self) -> None:
+        """Re-root the shared home field if the queen changed tile."""
+        field = getattr(self.sim, "home_field", None)
+        if field is None:
+            return
+        x1, y1, x2, y2 = self.sim.canvas.coords(self.item)
+        tile = (int(((x1 + x2) / 2) // TILE_SIZE), int(((y1 + y2) / 2) // TILE_SIZE))
+        field.move_source("queen", tile)
+
     def update(self) -> None:
         # Avoid blocking the Tkinter event loop with a long sleep.
         # The previous implementation paused for four seconds,
         # freezing the UI each update cycle.
-        if isinstance(self.sim.canvas, tk.Canvas):
+        if is_tk_canvas(self.sim.canvas):
             time.sleep(0)
         self.hunger -= 0.1
         if self.egg_lay_cooldown > 0:
@@ -323,12 +341,13 @@ class Queen:
         self.spawn_timer -= 1
         self.move_counter += 1
         if self.move_counter % 20 == 0:
-            dx = random.choice([-1, 0, 1])
-            dy = random.choice([-1, 0, 1])
+            dx = self.rng.choice([-1, 0, 1])
+            dy = self.rng.choice([-1, 0, 1])
             x1, y1, _, _ = self.sim.canvas.coords(self.item)
             new_x1 = max(0, min(WINDOW_WIDTH - 40, x1 + dx))
             new_y1 = max(0, min(WINDOW_HEIGHT - 20, y1 + dy))
             self.sim.canvas.move(self.item, new_x1 - x1, new_y1 - y1)
+            self.sync_home_field()
         if self.hunger < 50:
             self.sim.canvas.itemconfigure(self.item, fill=PALETTE["bar_red"])
             self.mad = True
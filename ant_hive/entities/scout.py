@@ -1,5 +1,3 @@
-import random
-
 from ..constants import ANT_SIZE, MOVE_STEP, WINDOW_WIDTH, WINDOW_HEIGHT, SCOUT_PHEROMONE_AMOUNT
 from .base_ant import BaseAnt
 
@@ -13,7 +11,7 @@ class ScoutAnt(BaseAnt):
 
     def update(self) -> None:
         if getattr(self.sim, "is_night", False):
-            self.move_towards(self.sim.queen.item)
+            self.move_home()
             coords = self.sim.canvas.coords(self.item)
             self.last_pos = (coords[0], coords[1])
             self.visited.add(self.last_pos)
@@ -29,7 +27,7 @@ class ScoutAnt(BaseAnt):
                 if (new_x1, new_y1) not in self.visited:
                     moves.append((dx, dy, new_x1, new_y1))
         if moves:
-            dx, dy, new_x1, new_y1 = random.choice(moves)
+            dx, dy, new_x1, new_y1 = self.rng.choice(moves)
             self.sim.canvas.move(self.item, new_x1 - x1, new_y1 - y1)
         else:
             self.move_random()
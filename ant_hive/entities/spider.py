@@ -16,6 +16,8 @@ from .base_ant import BaseAnt
 
 BASE_SPEED = MOVE_STEP
 BASE_CONSUMPTION = 1.0
+# Size multiplier applied each time a spider sleeps.
+GROWTH_RATE = 1.20
 
 
 class SpiderBrain:
@@ -40,8 +42,14 @@ class Den:
     def __init__(self, sim: "AntSim", x: int, y: int, count: int = 3) -> None:
         self.sim = sim
         self.item = sim.canvas.create_oval(x, y, x + ANT_SIZE, y + ANT_SIZE, fill="gray")
+        dens = getattr(sim, "dens", None)
+        if dens is not None:
+            dens.append(self)
         for _ in range(count):
             spiderling = Spider(sim, x, y, energy=20, health=10, size=0.5)
+            # Spiderlings hatch at the lair; left fertile they would lay
+            # there at once and the brood would double every tick.
+            spiderling.has_laid_eggs = True
             sim.predators.append(spiderling)
 
 
@@ -65,11 +73,7 @@ class Spider:
         self.visible = True
 
         self.visible = True
-        self.size = size
-        self.speed = BASE_SPEED * self.size
-        self.food_consumption = BASE_CONSUMPTION * self.size
-        self.attack_radius = 20 * self.size
-        self.fear_radius = 60 * self.size
+        self.set_size(size)
         self.lair = (x, y)
         self.has_laid_eggs = False
         self.alive = True
@@ -131,9 +135,13 @@ class Spider:
 
     def _maybe_show_sense_label(self, cx: float, cy: float) -> None:
         """Display or move the 'Sensing...' label when hunting at night."""
-        import time
+        clock = getattr(self.sim, "clock", None)
+        if clock is not None:
+            brightness = clock.brightness
+        else:
+            import time
 
-        brightness = brightness_at(time.time() - getattr(self.sim, "start_time", 0))
+            brightness = brightness_at(time.time() - getattr(self.sim, "start_time", 0))
         is_night = brightness < 0.8
 
         if is_night and self.sim.ants:
@@ -279,6 +287,12 @@ class Spider:
         lx, ly = self.lair
         dx = MOVE_STEP if cx < lx else -MOVE_STEP if cx > lx else 0
         dy = MOVE_STEP if cy < ly else -MOVE_STEP if cy > ly else 0
+        paths = getattr(self.sim, "spider_paths", None)
+        if paths is not None:
+            here = (int(cx // TILE_SIZE), int(cy // TILE_SIZE))
+            step = paths.next_step(here, (int(lx // TILE_SIZE), int(ly // TILE_SIZE)))
+            if step is not None:
+                dx, dy = step[0] * MOVE_STEP, step[1] * MOVE_STEP
         scale = self.speed / MOVE_STEP
         dx *= scale
         dy *= scale
@@ -288,7 +302,11 @@ class Spider:
         self.grow()
 
     def grow(self) -> None:
-        self.size *= 1.20
+        self.set_size(self.size * GROWTH_RATE)
+
+    def set_size(self, size: float) -> None:
+        """Set the size and the speed, appetite and reach that scale with it."""
+        self.size = size
         self.speed = BASE_SPEED * self.size
         self.food_consumption = BASE_CONSUMPTION * self.size
         self.attack_radius = 20 * self.size
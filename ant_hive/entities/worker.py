@@ -1,5 +1,3 @@
-import random
-
 from ..constants import (
     ANT_SIZE,
     ENERGY_MAX,
@@ -40,11 +38,11 @@ class WorkerAnt(BaseAnt):
             self.die()
             return
         if getattr(self.sim, "is_night", False):
-            self.move_towards(self.sim.queen.item)
+            self.move_home()
             coords = self.sim.canvas.coords(self.item)
             self.last_pos = (coords[0], coords[1])
             from ..constants import ENERGY_DECAY
-            self.energy = max(0, self.energy - ENERGY_DECAY)
+            self.energy = max(0, self.energy - ENERGY_DECAY * self.tick_span)
             if self.energy <= 0:
                 self.die()
             return
@@ -52,9 +50,21 @@ class WorkerAnt(BaseAnt):
         best_dir = None
         best_value = -1.0
         if not self.carrying_food:
+            field = getattr(self.sim, "food_field", None)
+            drops = getattr(self.sim, "food_drops", [])
+            if field is not None:
+                tx, ty = self.current_tile()
+                closest = field.nearest(tx, ty)
+                # On rock or cut off from every drop the field has no answer,
+                # so fall back to looking at them all.
+                if closest is not None:
+                    # The field knows the closest drop; besides it only drops
+                    # near enough to touch need checking.
+                    drops = [closest]
+                    drops += [d for d in field.sources_near(tx, ty) if d is not closest]
             nearest_drop = None
             nearest_dist = float("inf")
-            for drop in getattr(self.sim, "food_drops", []):
+            for drop in drops:
                 if self.sim.check_collision(self.item, drop.item):
                     took = False
                     while self.energy < ENERGY_MAX and drop.charges > 0:
@@ -69,7 +79,7 @@ class WorkerAnt(BaseAnt):
                             cx = start[0] + ANT_SIZE / 2
                             cy = start[1] + ANT_SIZE / 2
                             self.sim.sparkle(cx, cy)
-                    if drop.charges <= 0:
+                    if drop.charges <= 0 and drop in self.sim.food_drops:
                         self.sim.food_drops.remove(drop)
                     if took:
                         break
@@ -96,7 +106,8 @@ class WorkerAnt(BaseAnt):
                 self.sim.canvas.move(self.item, best_dir[0], best_dir[1])
                 self.sim.canvas.move(self.image_id, best_dir[0], best_dir[1])
             elif nearest_drop is not None:
-                self.move_towards(nearest_drop.item)
+                if not self.follow_field(field):
+                    self.move_towards(nearest_drop.item)
             else:
                 self.move_random()
         else:
@@ -109,7 +120,7 @@ class WorkerAnt(BaseAnt):
                     self.sim.queen.feed()
                     self.sim.queen.fed += 1
                     self.sim.queen_fed += 1
-                    if random.random() < 0.3 and getattr(self.sim.queen, "egg_lay_cooldown", 0) <= 0:
+                    if self.rng.random() < 0.3 and getattr(self.sim.queen, "egg_lay_cooldown", 0) <= 0:
                         qx1, qy1, _, _ = self.sim.canvas.coords(self.sim.queen.item)
                         self.sim.queen.lay_egg(int(qx1 + 20), int(qy1))
                     self.carrying_food = False
@@ -141,7 +152,7 @@ class WorkerAnt(BaseAnt):
         self.last_pos = (coords[0], coords[1])
         from ..constants import ENERGY_DECAY
 
-        self.energy = max(0, self.energy - ENERGY_DECAY)
+        self.energy = max(0, self.energy - ENERGY_DECAY * self.tick_span)
         if self.energy <= 0:
             self.die()
         if self.is_breeder:
@@ -0,0 +1,486 @@
+"""Publishing live world state to shared memory for other processes.
+
+A :class:`StateExporter` attached to a sim copies the state of the world
+into named :mod:`multiprocessing.shared_memory` segments at the end of
+every tick.  That state is the terrain, every pheromone channel and a table
+of entities.  Dashboards and analysis scripts attach with a
+:class:`StateReader` from any process and read it in place, without copies
+and without the sim ever waiting on them.
+
+There are two segments.  The small control segment, named after the
+exporter, holds::
+
+    MAGIC, version (u16), generation (u32), latest buffer (u32)
+
+The data segment is named ``<name>.<generation>``.  It starts with its
+layout: map width and height in tiles, entity capacity, and the pheromone
+channel names.  Two frame buffers follow, each holding::
+
+    seq (u64), tick (i64), entity count, food collected, fed to queen
+    terrain    one tile code per tile (see TILE_STATES), column-major
+    channels   one float32 per tile for each channel, column-major
+    entities   ENTITY_FIELDS doubles per entity
+
+Column-major means tile ``(x, y)`` is at ``x * height + y``, which is the
+order pheromone chunks are laid out in, so they copy a column at a time.
+
+The buffers are written alternately, so a frame stays untouched for a full
+tick after it is published.  Each buffer's ``seq`` works as a seqlock.  It
+is odd while the buffer is being written and even once it is complete.  A
+reader keeps the ``seq`` it saw, and :meth:`Frame.consistent` tells it
+afterwards whether the frame was overwritten while it was reading.  A map
+that grows, a new pheromone channel or more entities than fit start a new
+generation: a larger data segment is created and the old one unlinked.
+Readers switch over on their next :meth:`StateReader.latest`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING
+
+from .entities.egg import HATCH_ROLES
+from .recording import KIND_CODES, KINDS
+from .terrain import TILE_STATES
+from .world import CHUNK_SHIFT, CHUNK_SIZE, chunks_in
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sim import AntSim
+
+MAGIC = b"AHLIVE"
+VERSION = 1
+# Name used when none is given to StateExporter.
+DEFAULT_NAME = "ant_hive"
+# Smallest entity table; a fuller one starts a new generation twice the size.
+MIN_ENTITIES = 256
+
+# One row of doubles per entity.  ``value`` is energy for ants, hunger for
+# the queen, size for spiders, ticks to hatching for eggs and charges for
+# food; ``role`` indexes ROLES for ants and is -1 otherwise.
+ENTITY_FIELDS = ("kind", "id", "x1", "y1", "x2", "y2", "value", "role", "flags")
+ROLES = tuple(HATCH_ROLES)
+# Entity flags.
+CARRYING = 1
+
+_ROW = len(ENTITY_FIELDS)
+_CONTROL = struct.Struct("<6sHII")
+_LAYOUT = struct.Struct("<iiII")
+_CHANNEL = struct.Struct("<16s")
+_FRAME = struct.Struct("<QqIqq")
+_ENTITY = struct.Struct(f"<{_ROW}d")
+_ROLE_CODES = {cls: code for code, (cls, _) in enumerate(HATCH_ROLES.values())}
+# Segments this process created; the tracker must keep cleaning those up.
+_created: set[str] = set()
+
+
+class ExportError(Exception):
+    """Raised when no live state is published under a name."""
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without tracking it.
+
+    A tracked segment is unlinked when the attaching process exits, which
+    would pull the state out from under the sim and every other reader.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class _Layout:
+    """Offsets of everything in one generation's data segment."""
+
+    def __init__(self, width: int, height: int, capacity: int, channels: tuple[str, ...]):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.channels = channels
+        self.tiles = width * height
+        head = _align(_LAYOUT.size + len(channels) * _CHANNEL.size)
+        self.terrain = _FRAME.size
+        self.pheromones = self.terrain + _align(self.tiles)
+        self.entities = self.pheromones + len(channels) * _align(self.tiles * 4)
+        self.buffer = self.entities + capacity * _ROW * 8
+        self.starts = (head, head + self.buffer)
+        self.size = head + 2 * self.buffer
+
+    def pack(self) -> bytes:
+        head = _LAYOUT.pack(self.width, self.height, self.capacity, len(self.channels))
+        return head + b"".join(_CHANNEL.pack(name.encode()) for name in self.channels)
+
+    @classmethod
+    def unpack(cls, buf) -> "_Layout":
+        width, height, capacity, count = _LAYOUT.unpack_from(buf)
+        channels = tuple(
+            _CHANNEL.unpack_from(buf, _LAYOUT.size + i * _CHANNEL.size)[0].rstrip(b"\0").decode()
+            for i in range(count)
+        )
+        return cls(width, height, capacity, channels)
+
+    def views(self, buf: memoryview, index: int):
+        """Return ``(terrain, {channel: heat}, entities)`` views of a buffer."""
+        base = self.starts[index]
+        terrain = buf[base + self.terrain : base + self.terrain + self.tiles]
+        channels = {}
+        for i, name in enumerate(self.channels):
+            start = base + self.pheromones + i * _align(self.tiles * 4)
+            channels[name] = buf[start : start + self.tiles * 4].cast("f")
+        start = base + self.entities
+        entities = buf[start : start + self.capacity * _ROW * 8].cast("d")
+        return terrain, channels, entities
+
+
+class StateExporter:
+    """Copy a sim's world into shared memory after every tick.
+
+    Attaches itself as ``sim.exporter``; :meth:`AntSim.export_state` is the
+    usual way to make one.  Call :meth:`close` to stop publishing and
+    unlink the segments.
+    """
+
+    def __init__(self, sim: "AntSim", name: str = DEFAULT_NAME) -> None:
+        self.sim = sim
+        self.name = name
+        self.control = shared_memory.SharedMemory(name=name, create=True, size=_CONTROL.size)
+        _created.add(name)
+        self.generation = 0
+        self.layout: _Layout | None = None
+        self.shm: shared_memory.SharedMemory | None = None
+        self.seq = 0
+        self._next = 0
+        self._views: list = []
+        # Per buffer: whether its terrain is current, tiles changed since it
+        # was written, and pheromone chunks copied into it.
+        self._fresh = [False, False]
+        self._dirty: list[set[tuple[int, int]]] = [set(), set()]
+        self._live: list[set[tuple[str, tuple[int, int]]]] = [set(), set()]
+        self._terrain = None
+        sim.exporter = self
+        self.publish()
+
+    # -- writing -----------------------------------------------------------
+
+    def _watch(self) -> None:
+        if self._terrain is not None and self._tile in self._terrain.listeners:
+            self._terrain.listeners.remove(self._tile)
+        terrain = self._terrain = self.sim.terrain
+        terrain.add_listener(self._tile)
+        self._fresh = [False, False]
+
+    def _tile(self, x: int, y: int, old: str, new: str) -> None:
+        if self._terrain is self.sim.terrain:
+            for dirty in self._dirty:
+                dirty.add((x, y))
+
+    def _generation(self, entities: int) -> None:
+        """Start a data segment sized for the world as it is now."""
+        sim = self.sim
+        capacity = self.layout.capacity if self.layout else MIN_ENTITIES
+        while capacity < entities:
+            capacity *= 2
+        layout = _Layout(sim.grid_width, sim.grid_height, capacity, tuple(sim.pheromones))
+        self._release()
+        self.generation += 1
+        self.layout = layout
+        self.shm = shared_memory.SharedMemory(
+            name=f"{self.name}.{self.generation}", create=True, size=layout.size
+        )
+        _created.add(self.shm.name)
+        self.shm.buf[: _LAYOUT.size + len(layout.channels) * _CHANNEL.size] = layout.pack()
+        self._views = [layout.views(self.shm.buf, index) for index in (0, 1)]
+        self._fresh = [False, False]
+        self._live = [set(), set()]
+
+    def _release(self) -> None:
+        for terrain, channels, entities in self._views:
+            terrain.release()
+            for heat in channels.values():
+                heat.release()
+            entities.release()
+        self._views = []
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            _created.discard(self.shm.name)
+            self.shm = None
+
+    def publish(self) -> None:
+        """Write the world as it is now into the next buffer."""
+        sim = self.sim
+        if self._terrain is not sim.terrain:
+            self._watch()
+        count = 1 + len(sim.ants) + len(sim.predators) + len(sim.eggs)
+        count += len(sim.food_drops) + len(getattr(sim, "dens", ()))
+        layout = self.layout
+        if (
+            layout is None
+            or layout.width != sim.grid_width
+            or layout.height != sim.grid_height
+            or layout.capacity < count
+            or layout.channels != tuple(sim.pheromones)
+        ):
+            self._generation(count)
+            layout = self.layout
+        index = self._next
+        start = layout.starts[index]
+        buf = self.shm.buf
+        self.seq += 1
+        _FRAME.pack_into(buf, start, 2 * self.seq - 1, 0, 0, 0, 0)
+        terrain, channels, _ = self._views[index]
+        self._write_terrain(index, terrain)
+        self._write_pheromones(index, channels)
+        written = self._write_entities(start + layout.entities)
+        _FRAME.pack_into(
+            buf, start, 2 * self.seq, sim.clock.ticks, written, sim.food_collected, sim.queen_fed
+        )
+        _CONTROL.pack_into(self.control.buf, 0, MAGIC, VERSION, self.generation, index)
+        self._next = 1 - index
+
+    def end_tick(self) -> None:
+        self.publish()
+
+    def _write_terrain(self, index: int, terrain: memoryview) -> None:
+        layout = self.layout
+        height = layout.height
+        dirty = self._dirty[index]
+        if self._fresh[index]:
+            cells = self.sim.terrain.cells
+            for x, y in dirty:
+                if x < layout.width and y < height:
+                    terrain[x * height + y] = cells.get(x, y)
+            dirty.clear()
+            return
+        cells = self.sim.terrain.cells
+        for key in chunks_in(0, 0, layout.width, height):
+            self._copy_chunk(key, cells.chunk(key), terrain, cells.default)
+        dirty.clear()
+        self._fresh[index] = True
+
+    def _copy_chunk(self, key, chunk, dest: memoryview, default) -> None:
+        """Copy the in-bounds columns of a chunk into a column-major view."""
+        layout = self.layout
+        height = layout.height
+        x0, y0 = key[0] << CHUNK_SHIFT, key[1] << CHUNK_SHIFT
+        rows = min(CHUNK_SIZE, height - y0)
+        fill = array(dest.format, [default]) * rows
+        for dx in range(min(CHUNK_SIZE, layout.width - x0)):
+            at = (x0 + dx) * height + y0
+            if chunk is None:
+                dest[at : at + rows] = fill
+            else:
+                dest[at : at + rows] = chunk[dx << CHUNK_SHIFT : (dx << CHUNK_SHIFT) + rows]
+
+    def _write_pheromones(self, index: int, channels: dict[str, memoryview]) -> None:
+        layout = self.layout
+        width, height = layout.width, layout.height
+        live = set()
+        previous = self._live[index]
+        for name, heat in channels.items():
+            grid = self.sim.pheromones[name]
+            for key, chunk, frozen in list(grid.stored()):
+                if frozen:
+                    chunk = grid.chunk(key)
+                if key[0] << CHUNK_SHIFT < width and key[1] << CHUNK_SHIFT < height:
+                    self._copy_chunk(key, chunk, heat, 0.0)
+                    live.add((name, key))
+            for entry in previous - live:
+                if entry[0] == name:
+                    self._copy_chunk(entry[1], None, heat, 0.0)
+        self._live[index] = live
+
+    def _write_entities(self, start: int) -> int:
+        sim = self.sim
+        coords = sim.canvas.coords
+        buf = self.shm.buf
+        pack = _ENTITY.pack_into
+        at = start
+
+        def put(entity, kind: int, value: float, role: int = -1, flags: int = 0) -> None:
+            nonlocal at
+            pack(buf, at, kind, entity.item, *coords(entity.item)[:4], value, role, flags)
+            at += _ENTITY.size
+
+        queen = sim.queen
+        put(queen, KIND_CODES["queen"], queen.hunger)
+        ant_kind = KIND_CODES["ant"]
+        for ant in sim.ants:
+            put(
+                ant,
+                ant_kind,
+                ant.energy,
+                _ROLE_CODES.get(type(ant), -1),
+                CARRYING if ant.carrying_food else 0,
+            )
+        for spider in sim.predators:
+            put(spider, KIND_CODES["spider"], spider.size)
+        for egg in sim.eggs:
+            put(egg, KIND_CODES["egg"], egg.hatch_time)
+        for drop in sim.food_drops:
+            put(drop, KIND_CODES["food"], drop.charges)
+        for den in getattr(sim, "dens", ()):
+            put(den, KIND_CODES["den"], 0.0)
+        return (at - start) // _ENTITY.size
+
+    def close(self) -> None:
+        """Stop publishing and remove the segments."""
+        if self.sim.exporter is self:
+            self.sim.exporter = None
+        if self._terrain is not None and self._tile in self._terrain.listeners:
+            self._terrain.listeners.remove(self._tile)
+        self._release()
+        self.control.close()
+        self.control.unlink()
+        _created.discard(self.name)
+
+
+# -- reading --------------------------------------------------------------
+
+
+class Frame:
+    """One published tick, viewed in place in shared memory.
+
+    ``terrain`` and the views in ``pheromones`` are column-major; use
+    :meth:`tile` and :meth:`heat` to look tiles up by coordinate.
+    ``entities`` holds ``count`` rows of :data:`ENTITY_FIELDS`.  Check
+    :meth:`consistent` after reading: if it is false the sim overwrote the
+    frame meanwhile and what was read must be discarded.
+    """
+
+    def __init__(self, reader: "StateReader", index: int) -> None:
+        layout = reader.layout
+        self._buf = reader.shm.buf
+        self._start = layout.starts[index]
+        self.seq, self.tick, self.count, self.food_collected, self.queen_fed = (
+            _FRAME.unpack_from(self._buf, self._start)
+        )
+        self.width = layout.width
+        self.height = layout.height
+        self.terrain, self.pheromones, self.entities = reader.views[index]
+
+    def consistent(self) -> bool:
+        """Whether the frame is unchanged since it was opened."""
+        try:
+            (seq,) = struct.unpack_from("<Q", self._buf, self._start)
+        except ValueError:
+            # The reader has moved on to a new generation.
+            return False
+        return seq == self.seq
+
+    def tile(self, x: int, y: int) -> str:
+        return TILE_STATES[self.terrain[x * self.height + y]]
+
+    def heat(self, ptype: str, x: int, y: int) -> float:
+        return self.pheromones[ptype][x * self.height + y]
+
+    def entity(self, i: int) -> dict[str, float]:
+        """Row ``i`` of the entity table, with ``kind`` (and ``role``) named."""
+        row = dict(zip(ENTITY_FIELDS, self.entities[i * _ROW : (i + 1) * _ROW]))
+        row["kind"] = KINDS[int(row["kind"])]
+        role = int(row["role"])
+        row["role"] = ROLES[role] if role >= 0 else None
+        return row
+
+
+class StateReader:
+    """Attach to the state a :class:`StateExporter` publishes as ``name``."""
+
+    def __init__(self, name: str = DEFAULT_NAME) -> None:
+        self.name = name
+        try:
+            self.control = _attach(name)
+        except FileNotFoundError:
+            raise ExportError(f"no live state published as {name!r}") from None
+        self.generation = 0
+        self.layout: _Layout | None = None
+        self.shm: shared_memory.SharedMemory | None = None
+        self.views: list = []
+
+    def _switch(self, generation: int) -> None:
+        self._detach()
+        self.shm = _attach(f"{self.name}.{generation}")
+        self.layout = _Layout.unpack(self.shm.buf)
+        self.views = [self.layout.views(self.shm.buf, index) for index in (0, 1)]
+        self.generation = generation
+
+    def _detach(self) -> None:
+        for terrain, channels, entities in self.views:
+            terrain.release()
+            for heat in channels.values():
+                heat.release()
+            entities.release()
+        self.views = []
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+    def latest(self) -> Frame | None:
+        """The newest complete frame, or ``None`` if none is ready.
+
+        Frames from earlier calls can no longer be read once this moves to
+        a new generation.
+        """
+        magic, version, generation, index = _CONTROL.unpack_from(self.control.buf)
+        if magic != MAGIC or version != VERSION:
+            return None
+        if generation != self.generation:
+            try:
+                self._switch(generation)
+            except FileNotFoundError:
+                # Replaced again while we looked; the next call catches up.
+                return None
+        frame = Frame(self, index)
+        if frame.seq & 1 or not frame.seq:
+            return None
+        return frame
+
+    def close(self) -> None:
+        self._detach()
+        self.control.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m ant_hive.export",
+        description="Print a summary of the live state a running sim publishes.",
+    )
+    parser.add_argument("name", nargs="?", default=DEFAULT_NAME)
+    parser.add_argument("--every", type=float, default=1.0, help="seconds between lines")
+    args = parser.parse_args(argv)
+    reader = StateReader(args.name)
+    try:
+        while True:
+            frame = reader.latest()
+            if frame is not None:
+                kinds = [0] * len(KINDS)
+                for i in range(frame.count):
+                    kinds[int(frame.entities[i * _ROW])] += 1
+                line = (
+                    f"tick {frame.tick}  {frame.width}x{frame.height}  "
+                    + "  ".join(f"{kind} {n}" for kind, n in zip(KINDS, kinds))
+                    + f"  collected {frame.food_collected}  fed {frame.queen_fed}"
+                )
+                if frame.consistent():
+                    print(line, flush=True)
+                del frame
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
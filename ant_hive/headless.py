@@ -0,0 +1,127 @@
+"""Stand-ins for the Tk root and canvas so the world runs without a display.
+
+Entities keep their positions in canvas items, so running headless means
+giving them a canvas that only remembers coordinates.  :class:`HeadlessCanvas`
+stores the coordinates of each item and ignores everything visual.
+:class:`HeadlessMaster` queues ``after`` callbacks and runs them as
+simulated time advances.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import Callable
+
+
+class HeadlessMaster:
+    """Timer queue driven by :meth:`advance` instead of an event loop."""
+
+    def __init__(self) -> None:
+        self.now_ms = 0
+        self._timers: list[tuple[int, int, Callable, tuple]] = []
+        self._cancelled: set[int] = set()
+        self._ids = itertools.count(1)
+
+    def after(self, ms: int, func: Callable | None = None, *args) -> str | None:
+        if func is None:
+            return None
+        job = next(self._ids)
+        heapq.heappush(self._timers, (self.now_ms + int(ms), job, func, args))
+        return f"after#{job}"
+
+    def after_idle(self, func: Callable, *args) -> str | None:
+        return self.after(0, func, *args)
+
+    def after_cancel(self, job: str | None) -> None:
+        if job:
+            self._cancelled.add(int(job.split("#")[1]))
+
+    def advance(self, ms: int) -> None:
+        """Move time forward and run every callback that came due.
+
+        Callbacks scheduled while these run wait for the next call.
+        """
+        self.now_ms += ms
+        due = []
+        while self._timers and self._timers[0][0] <= self.now_ms:
+            due.append(heapq.heappop(self._timers))
+        for _, job, func, args in due:
+            if job in self._cancelled:
+                self._cancelled.discard(job)
+                continue
+            func(*args)
+
+    def pending(self) -> int:
+        return len(self._timers)
+
+
+class HeadlessCanvas:
+    """Canvas that tracks item coordinates and draws nothing."""
+
+    def __init__(self, master: HeadlessMaster | None = None) -> None:
+        self.master = master or HeadlessMaster()
+        self.objects: dict[int, list[float]] = {}
+        self._ids = itertools.count(1)
+
+    def _create(self, coords) -> int:
+        item = next(self._ids)
+        self.objects[item] = [float(c) for c in coords]
+        return item
+
+    def create_rectangle(self, x1, y1, x2, y2, **kwargs) -> int:
+        return self._create((x1, y1, x2, y2))
+
+    def create_oval(self, x1, y1, x2, y2, **kwargs) -> int:
+        return self._create((x1, y1, x2, y2))
+
+    def create_line(self, x1, y1, x2, y2, **kwargs) -> int:
+        return self._create((x1, y1, x2, y2))
+
+    def create_text(self, x, y, **kwargs) -> int:
+        return self._create((x, y))
+
+    def create_image(self, x, y, **kwargs) -> int:
+        return self._create((x, y))
+
+    def create_window(self, *args, **kwargs) -> int:
+        return self._create((0, 0))
+
+    def coords(self, item, *args) -> list[float]:
+        if args:
+            if len(args) == 1:
+                args = args[0]
+            self.objects[item] = [float(c) for c in args]
+        return list(self.objects.get(item, []))
+
+    def move(self, item, dx, dy) -> None:
+        coords = self.objects.get(item)
+        if coords is not None:
+            for i in range(0, len(coords), 2):
+                coords[i] += dx
+                coords[i + 1] += dy
+
+    def delete(self, item) -> None:
+        if item == "all":
+            self.objects.clear()
+        else:
+            self.objects.pop(item, None)
+
+    def bbox(self, *items):
+        return None
+
+    def canvasx(self, x) -> float:
+        return float(x)
+
+    def canvasy(self, y) -> float:
+        return float(y)
+
+    def after(self, ms, func=None, *args):
+        return self.master.after(ms, func, *args)
+
+    def _ignore(self, *args, **kwargs) -> None:
+        return None
+
+    itemconfigure = itemconfig = configure = config = _ignore
+    tag_raise = tag_lower = tag_bind = bind = focus_set = pack = _ignore
+    xview_scroll = yview_scroll = _ignore
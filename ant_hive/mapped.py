@@ -0,0 +1,263 @@
+"""Chunked grids kept in memory-mapped files.
+
+:class:`MappedGrid` stores each chunk in a fixed-size slot of a data file
+mapped with :mod:`mmap`.  Live chunks are ``memoryview`` casts straight into
+the mapping, so reads and writes go to the OS page cache and only the pages
+that are touched are ever loaded.  Evicting a chunk just drops its view;
+the OS writes dirty pages back and reclaims them.
+
+The chunk-to-slot index is kept in memory and written to ``<path>.idx`` by
+:meth:`MappedGrid.flush`.  Opening a grid reads only that index, never the
+tile data.  Slots written after the last flush but missing from the index
+are unreferenced and get reused.
+
+:meth:`MappedGrid.decay` only walks the mapped chunks.  Each slot left
+unmapped counts the decay steps it missed and replays them when it is next
+mapped, so a grid of old trails opens without reading any of them.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from typing import Callable, Iterable, Iterator
+
+from .world import CHUNK_CELLS, Chunk, ChunkedGrid
+
+MAGIC = b"AHGRID"
+VERSION = 2
+
+_HEADER = struct.Struct("<6sHcxd")
+_HEADER_SIZE = 64
+_COUNT = struct.Struct("<I")
+_AMOUNT = struct.Struct("<d")
+# Chunk, slot and the decay steps the slot has yet to replay.
+_ENTRY = struct.Struct("<iiII")
+_BLANK = struct.Struct("<ii")
+# Slots the data file grows by at least, each time it fills up.
+_MIN_GROWTH = 64
+
+
+class MappedGrid(ChunkedGrid):
+    """:class:`~ant_hive.world.ChunkedGrid` backed by a memory-mapped file.
+
+    ``path`` is created if missing; an existing file must have been written
+    with the same ``typecode``.  Call :meth:`flush` to checkpoint and
+    :meth:`close` when done.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        typecode: str = "B",
+        default: float = 0,
+        generate: Callable[[Chunk], array | None] | None = None,
+    ) -> None:
+        super().__init__(typecode, default, generate)
+        self.path = path
+        self.slot_bytes = CHUNK_CELLS * array(typecode).itemsize
+        self.slots: dict[Chunk, int] = {}
+        self._free: list[int] = []
+        self._maps: list[mmap.mmap] = []
+        # Decay steps run so far and their amount; an unmapped slot owes
+        # ``decays - rested[key]`` of them (``rested`` defaults to 0).
+        self.decays = 0
+        self._decay_amount = 0.0
+        self._rested: dict[Chunk, int] = {}
+        exists = os.path.exists(path)
+        self._file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            self._open_existing()
+        else:
+            self._file.write(
+                _HEADER.pack(MAGIC, VERSION, typecode.encode(), float(default)).ljust(
+                    _HEADER_SIZE, b"\0"
+                )
+            )
+            self._file.flush()
+        self.capacity = (os.fstat(self._file.fileno()).st_size - _HEADER_SIZE) // self.slot_bytes
+        self._map()
+
+    def _open_existing(self) -> None:
+        magic, version, typecode, _ = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a grid file")
+        if typecode.decode() != self.typecode:
+            raise ValueError(
+                f"{self.path} holds typecode {typecode.decode()!r}, not {self.typecode!r}"
+            )
+        index = self.path + ".idx"
+        if not os.path.exists(index):
+            return
+        with open(index, "rb") as fh:
+            data = fh.read()
+        (self._decay_amount,) = _AMOUNT.unpack_from(data)
+        (count,) = _COUNT.unpack_from(data, _AMOUNT.size)
+        pos = _AMOUNT.size + _COUNT.size
+        for cx, cy, slot, owed in _ENTRY.iter_unpack(data[pos : pos + count * _ENTRY.size]):
+            self.slots[(cx, cy)] = slot
+            if owed:
+                self._rested[(cx, cy)] = -owed
+        pos += count * _ENTRY.size
+        (count,) = _COUNT.unpack_from(data, pos)
+        pos += _COUNT.size
+        self.blank = set(_BLANK.iter_unpack(data[pos : pos + count * _BLANK.size]))
+        used = set(self.slots.values())
+        top = max(used, default=-1) + 1
+        self._free = [slot for slot in range(top) if slot not in used]
+
+    def _map(self) -> None:
+        if self.capacity:
+            self._maps.append(mmap.mmap(self._file.fileno(), 0))
+
+    def _grow(self) -> None:
+        # Views into earlier mappings stay valid; they share the file's pages.
+        self.capacity += max(_MIN_GROWTH, self.capacity)
+        self._file.truncate(_HEADER_SIZE + self.capacity * self.slot_bytes)
+        self._map()
+
+    def _offset(self, slot: int) -> int:
+        return _HEADER_SIZE + slot * self.slot_bytes
+
+    def _view(self, slot: int) -> memoryview:
+        start = self._offset(slot)
+        return memoryview(self._maps[-1])[start : start + self.slot_bytes].cast(self.typecode)
+
+    def _allocate(self, key: Chunk) -> int:
+        slot = self.slots.get(key)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self.slots) + len(self._free)
+            while slot >= self.capacity:
+                self._grow()
+        self.slots[key] = slot
+        return slot
+
+    def _write(self, key: Chunk, data: bytes) -> memoryview:
+        slot = self._allocate(key)
+        start = self._offset(slot)
+        self._maps[-1][start : start + self.slot_bytes] = data
+        chunk = self.chunks[key] = self._view(slot)
+        return chunk
+
+    def put(self, key: Chunk, chunk) -> None:
+        self._write(key, chunk.tobytes())
+
+    def drop(self, key: Chunk) -> None:
+        self.chunks.pop(key, None)
+        self.touched.discard(key)
+        self._rested.pop(key, None)
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self._free.append(slot)
+
+    def freeze(self, keys: Iterable[Chunk]) -> int:
+        """Drop the views of the given chunks; the OS pages them out."""
+        count = 0
+        for key in list(keys):
+            if self.chunks.pop(key, None) is not None:
+                self._rested[key] = self.decays
+                count += 1
+        return count
+
+    def holds(self, key: Chunk) -> bool:
+        return key in self.slots or key in self.blank
+
+    def stored(self) -> Iterator[tuple[Chunk, memoryview, bool]]:
+        for key, slot in self.slots.items():
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                # Slots still owing decay are mapped to replay it first.
+                chunk = self._load(key, False) if self._owed(key) else self._view(slot)
+            yield key, chunk, False
+
+    def decay(self, amount: float) -> None:
+        super().decay(amount)
+        self.decays += 1
+        self._decay_amount = amount
+
+    def _owed(self, key: Chunk) -> int:
+        return self.decays - self._rested.get(key, 0)
+
+    def _catch_up(self, chunk: memoryview, steps: int) -> None:
+        # Step by step, rounding like live decay, so both end up equal.
+        amount = self._decay_amount
+        for i, value in enumerate(chunk):
+            for _ in range(steps):
+                if value <= 0:
+                    break
+                chunk[i] = max(0.0, value - amount)
+                value = chunk[i]
+
+    def replace(self, chunks: dict, frozen: dict[Chunk, bytes], blank: set[Chunk]) -> None:
+        self._free.extend(self.slots.values())
+        self.slots = {}
+        self._rested = {}
+        super().replace({}, {}, blank)
+        for key, chunk in chunks.items():
+            self.put(key, chunk)
+        for key, data in frozen.items():
+            self._write(key, zlib.decompress(data))
+
+    def nbytes(self) -> int:
+        """Bytes of the chunks currently viewed; residency is up to the OS."""
+        return len(self.chunks) * self.slot_bytes
+
+    def flush(self) -> None:
+        """Write dirty pages and the chunk index to disk."""
+        for mapping in self._maps:
+            mapping.flush()
+        parts = [_AMOUNT.pack(self._decay_amount), _COUNT.pack(len(self.slots))]
+        chunks = self.chunks
+        parts += [
+            _ENTRY.pack(cx, cy, slot, 0 if (cx, cy) in chunks else self._owed((cx, cy)))
+            for (cx, cy), slot in self.slots.items()
+        ]
+        parts.append(_COUNT.pack(len(self.blank)))
+        parts += [_BLANK.pack(cx, cy) for cx, cy in self.blank]
+        index = self.path + ".idx"
+        with open(index + ".tmp", "wb") as fh:
+            fh.write(b"".join(parts))
+        os.replace(index + ".tmp", index)
+
+    def close(self) -> None:
+        """Flush, then release the mappings and the file."""
+        if self._file.closed:
+            return
+        self.flush()
+        for view in self.chunks.values():
+            view.release()
+        self.chunks = {}
+        for mapping in self._maps:
+            try:
+                mapping.close()
+            except BufferError:
+                # A view is still held elsewhere; the GC unmaps it later.
+                pass
+        self._maps = []
+        self._file.close()
+
+    def _load(self, key: Chunk, create: bool):
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.thaws += 1
+            chunk = self.chunks[key] = self._view(slot)
+            owed = self._owed(key)
+            self._rested.pop(key, None)
+            if owed:
+                self._catch_up(chunk, owed)
+            return chunk
+        if self.generate is not None and key not in self.blank:
+            data = self.generate(key)
+            if data is not None:
+                return self._write(key, data.tobytes())
+            self.blank.add(key)
+        if not create:
+            return None
+        return self._write(key, self.new_chunk().tobytes())
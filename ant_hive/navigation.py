@@ -0,0 +1,358 @@
+"""Shared distance fields over the terrain grid.
+
+A :class:`DistanceField` stores, for every walkable tile, the number of steps
+to the nearest of its sources and which source that is.  Ants read their
+next step and nearest target from it in O(1) instead of each running their
+own search.  The field is kept per chunk and covers only chunks the terrain
+has already generated.  A chunk generated later joins the field when it is
+first queried or when a change spreads into it.  The field follows terrain
+edits and source changes incrementally.  It only falls back to a full pass
+over the covered chunks when a tile becomes blocked.
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections import deque
+from typing import Hashable
+
+from .terrain import TILE_ROCK, TILE_COLLAPSED
+from .world import CHUNK_CELLS, CHUNK_MASK, CHUNK_SHIFT, CHUNK_SIZE, Chunk
+
+BLOCKED_TILES = (TILE_ROCK, TILE_COLLAPSED)
+
+# Eight-way moves; diagonal moves may not cut past a blocked corner.
+NEIGHBOURS = (
+    (-1, -1), (0, -1), (1, -1),
+    (-1, 0),           (1, 0),
+    (-1, 1),  (0, 1),  (1, 1),
+)
+
+UNREACHED = 1 << 30
+
+Cell = tuple[array, list, int]
+
+
+class DistanceField:
+    """Multi-source breadth-first distances to ``sources`` over walkable tiles."""
+
+    def __init__(self, terrain) -> None:
+        self.terrain = terrain
+        self.sources: dict[Hashable, tuple[int, int]] = {}
+        # Source keys by tile, for lookups around a position.
+        self._by_tile: dict[tuple[int, int], list[Hashable]] = {}
+        self.width = 0
+        self.height = 0
+        # Per covered chunk, step counts and source keys in chunk order.
+        self.dist: dict[Chunk, array] = {}
+        self.owner: dict[Chunk, list[Hashable | None]] = {}
+        self.rebuilds = 0
+        self._dirty = True
+        terrain.add_listener(self._on_terrain_change)
+
+    # -- queries -----------------------------------------------------------
+
+    def distance(self, x: int, y: int) -> int | None:
+        """Return the step count from ``(x, y)`` to the nearest source."""
+        cell = self._query(x, y)
+        if cell is None:
+            return None
+        d = cell[0][cell[2]]
+        return None if d >= UNREACHED else d
+
+    def nearest(self, x: int, y: int) -> Hashable | None:
+        """Return the key of the source closest to ``(x, y)``."""
+        cell = self._query(x, y)
+        return None if cell is None else cell[1][cell[2]]
+
+    def step(self, x: int, y: int) -> tuple[int, int] | None:
+        """Return the ``(dx, dy)`` tile step toward the nearest source.
+
+        ``None`` means the tile is a source itself or cannot reach one.
+        """
+        cell = self._query(x, y)
+        if cell is None:
+            return None
+        here = cell[0][cell[2]]
+        if here == 0 or here >= UNREACHED:
+            return None
+        for dx, dy in NEIGHBOURS:
+            other = self._cell(x + dx, y + dy)
+            if other is None or other[0][other[2]] != here - 1:
+                continue
+            if dx and dy and not (self._open(x + dx, y) and self._open(x, y + dy)):
+                continue
+            return dx, dy
+        return None
+
+    def sources_near(self, x: int, y: int) -> list[Hashable]:
+        """Return the keys of sources on ``(x, y)`` or the eight tiles around it.
+
+        Unlike :meth:`nearest` this does not depend on walkable paths, so it
+        also answers for tiles off the field.
+        """
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                found += self._by_tile.get((x + dx, y + dy), ())
+        return found
+
+    # -- sources -----------------------------------------------------------
+
+    def add_source(self, key: Hashable, tile: tuple[int, int]) -> None:
+        if key in self.sources:
+            self._unindex(key, self.sources[key])
+        self.sources[key] = tile
+        self._by_tile.setdefault(tile, []).append(key)
+        if self._dirty:
+            return
+        if len(self.sources) == 1:
+            # A single source is cheapest to lay out with a plain BFS.
+            self._dirty = True
+            return
+        x, y = tile
+        cell = self._cell(x, y)
+        if cell is None:
+            # Placed with the rest of its chunk's sources once covered.
+            self._extend(x, y)
+            return
+        dist, owner, i = cell
+        dist[i] = 0
+        owner[i] = key
+        self._propagate([(0, x, y)])
+
+    def remove_source(self, key: Hashable) -> None:
+        tile = self.sources.pop(key, None)
+        if tile is not None:
+            self._unindex(key, tile)
+        if tile is None or self._dirty:
+            return
+        if not self.sources:
+            self._dirty = True
+            return
+        cell = self._cell(*tile)
+        if cell is None or cell[1][cell[2]] != key:
+            return
+        # Clear the region this source owned and refill it from its border.
+        cleared = {tile}
+        queue = deque([tile])
+        while queue:
+            cx, cy = queue.popleft()
+            for dx, dy in NEIGHBOURS:
+                n = (cx + dx, cy + dy)
+                if n not in cleared:
+                    other = self._cell(*n)
+                    if other is not None and other[1][other[2]] == key:
+                        cleared.add(n)
+                        queue.append(n)
+        for n in cleared:
+            dist, owner, i = self._cell(*n)
+            dist[i] = UNREACHED
+            owner[i] = None
+        seeds = []
+        for cx, cy in cleared:
+            for dx, dy in NEIGHBOURS:
+                n = (cx + dx, cy + dy)
+                if n not in cleared:
+                    other = self._cell(*n)
+                    if other is not None and other[0][other[2]] < UNREACHED:
+                        seeds.append((other[0][other[2]], *n))
+        for other, source in self.sources.items():
+            if source in cleared:
+                dist, owner, i = self._cell(*source)
+                dist[i] = 0
+                owner[i] = other
+                seeds.append((0, *source))
+        self._propagate(seeds)
+
+    def move_source(self, key: Hashable, tile: tuple[int, int]) -> None:
+        if self.sources.get(key) == tile:
+            return
+        self.remove_source(key)
+        self.add_source(key, tile)
+
+    def _unindex(self, key: Hashable, tile: tuple[int, int]) -> None:
+        keys = self._by_tile[tile]
+        keys.remove(key)
+        if not keys:
+            del self._by_tile[tile]
+
+    # -- chunks ------------------------------------------------------------
+
+    def _inside(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def _cell(self, x: int, y: int) -> Cell | None:
+        """``(dist, owner, index)`` of a tile in a covered chunk."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        dist = self.dist.get(key)
+        if dist is None:
+            return None
+        return dist, self.owner[key], ((x & CHUNK_MASK) << CHUNK_SHIFT) | (y & CHUNK_MASK)
+
+    def _held(self, key: Chunk) -> bool:
+        return key in self.dist or self.terrain.cells.holds(key)
+
+    def _open(self, x: int, y: int) -> bool:
+        """Walkable and generated; the field never generates terrain."""
+        if not self._held((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)):
+            return False
+        return self.terrain.get_cell(x, y) not in BLOCKED_TILES
+
+    def _cover(self, key: Chunk) -> list[tuple[int, int, int]]:
+        """Start covering chunk ``key``; return its sources as seeds."""
+        dist = self.dist[key] = array("i", [UNREACHED]) * CHUNK_CELLS
+        owner = self.owner[key] = [None] * CHUNK_CELLS
+        seeds = []
+        for source, (x, y) in self.sources.items():
+            if (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT) == key and self._inside(x, y):
+                i = ((x & CHUNK_MASK) << CHUNK_SHIFT) | (y & CHUNK_MASK)
+                if dist[i] != 0:
+                    dist[i] = 0
+                    owner[i] = source
+                    seeds.append((0, x, y))
+        return seeds
+
+    def _reach(self, x: int, y: int, seeds: list) -> Cell | None:
+        """Like :meth:`_cell`, but covers a generated chunk on the way.
+
+        Sources in a newly covered chunk are pushed onto the heap ``seeds``.
+        """
+        cell = self._cell(x, y)
+        if cell is not None or not self._inside(x, y):
+            return cell
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        if not self.terrain.cells.holds(key):
+            return None
+        for seed in self._cover(key):
+            heapq.heappush(seeds, seed)
+        return self._cell(x, y)
+
+    def _extend(self, x: int, y: int) -> None:
+        """Cover the generated chunk holding ``(x, y)`` from its neighbours."""
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        if not self._inside(x, y) or key in self.dist or not self.terrain.cells.holds(key):
+            return
+        seeds = self._cover(key)
+        x0, y0 = key[0] << CHUNK_SHIFT, key[1] << CHUNK_SHIFT
+        x1, y1 = x0 + CHUNK_SIZE, y0 + CHUNK_SIZE
+        ring = [(rx, ry) for rx in range(x0 - 1, x1 + 1) for ry in (y0 - 1, y1)]
+        ring += [(rx, ry) for rx in (x0 - 1, x1) for ry in range(y0, y1)]
+        for rx, ry in ring:
+            cell = self._cell(rx, ry)
+            if cell is not None and cell[0][cell[2]] < UNREACHED:
+                seeds.append((cell[0][cell[2]], rx, ry))
+        self._propagate(seeds)
+
+    def _query(self, x: int, y: int) -> Cell | None:
+        self._refresh()
+        self._extend(x, y)
+        return self._cell(x, y)
+
+    # -- maintenance -------------------------------------------------------
+
+    def _on_terrain_change(self, x: int, y: int, old: str, new: str) -> None:
+        was_open = old not in BLOCKED_TILES
+        is_open = new not in BLOCKED_TILES
+        if was_open == is_open or self._dirty or self._cell(x, y) is None:
+            return
+        if not is_open:
+            # Paths through this tile may all change; recompute on next use.
+            self._dirty = True
+            return
+        seeds = []
+        for dx, dy in NEIGHBOURS:
+            cell = self._cell(x + dx, y + dy)
+            if cell is not None and cell[0][cell[2]] < UNREACHED:
+                seeds.append((cell[0][cell[2]], x + dx, y + dy))
+        self._propagate(seeds)
+
+    def _refresh(self) -> None:
+        w, h = self.terrain.width, self.terrain.height
+        if (w, h) != (self.width, self.height) and not self._dirty:
+            if w < self.width or h < self.height:
+                self._dirty = True
+            else:
+                self._grow(w, h)
+        if self._dirty:
+            self.rebuild()
+
+    def _grow(self, w: int, h: int) -> None:
+        """Spread the field into tiles the map grew by."""
+        old_w, old_h = self.width, self.height
+        self.width, self.height = w, h
+        seeds = []
+        for key, dist in self.dist.items():
+            x0, y0 = key[0] << CHUNK_SHIFT, key[1] << CHUNK_SHIFT
+            if x0 + CHUNK_SIZE < old_w and y0 + CHUNK_SIZE < old_h:
+                continue
+            # Only tiles on the old edge can lead into the new ones.
+            for i, d in enumerate(dist):
+                x, y = x0 + (i >> CHUNK_SHIFT), y0 + (i & CHUNK_MASK)
+                if d < UNREACHED and (x == old_w - 1 or y == old_h - 1):
+                    seeds.append((d, x, y))
+        for source, (x, y) in self.sources.items():
+            cell = self._cell(x, y)
+            if cell is not None and (x >= old_w or y >= old_h) and cell[0][cell[2]] != 0:
+                cell[0][cell[2]] = 0
+                cell[1][cell[2]] = source
+                seeds.append((0, x, y))
+        self._propagate(seeds)
+
+    def rebuild(self) -> None:
+        """Recompute the field over the generated chunks with one
+        breadth-first pass."""
+        self.width, self.height = self.terrain.width, self.terrain.height
+        self.dist = {}
+        self.owner = {}
+        queue: deque[tuple[int, int]] = deque()
+        for x, y in self.sources.values():
+            key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+            if self._inside(x, y) and key not in self.dist and self.terrain.cells.holds(key):
+                queue.extend((sx, sy) for _, sx, sy in self._cover(key))
+        # Every chunk holding a source is covered by now, so chunks the
+        # search spreads into add no seeds.
+        spare: list = []
+        opened = self._open
+        while queue:
+            x, y = queue.popleft()
+            dist, owner, i = self._cell(x, y)
+            nd = dist[i] + 1
+            who = owner[i]
+            for dx, dy in NEIGHBOURS:
+                nx, ny = x + dx, y + dy
+                cell = self._reach(nx, ny, spare)
+                if cell is None or cell[0][cell[2]] <= nd or not opened(nx, ny):
+                    continue
+                if dx and dy and not (opened(x + dx, y) and opened(x, y + dy)):
+                    continue
+                cell[0][cell[2]] = nd
+                cell[1][cell[2]] = who
+                queue.append((nx, ny))
+        self.rebuilds += 1
+        self._dirty = False
+
+    def _propagate(self, seeds: list[tuple[int, int, int]]) -> None:
+        """Relax distances outward from ``seeds`` (Dijkstra on unit costs)."""
+        opened = self._open
+        heapq.heapify(seeds)
+        while seeds:
+            d, x, y = heapq.heappop(seeds)
+            dist, owner, i = self._cell(x, y)
+            if d != dist[i]:
+                continue
+            nd = d + 1
+            who = owner[i]
+            for dx, dy in NEIGHBOURS:
+                nx, ny = x + dx, y + dy
+                cell = self._reach(nx, ny, seeds)
+                if cell is None or cell[0][cell[2]] <= nd or not opened(nx, ny):
+                    continue
+                if dx and dy and not (opened(x + dx, y) and opened(x, y + dy)):
+                    continue
+                cell[0][cell[2]] = nd
+                cell[1][cell[2]] = who
+                heapq.heappush(seeds, (nd, nx, ny))
@@ -0,0 +1,688 @@
+"""Ticking very large colonies across worker processes.
+
+:class:`PartitionedSim` splits the ants of an :class:`~ant_hive.sim.AntSim`
+between worker processes by x position.  Each worker owns the ants in one
+vertical strip of the map and updates only those.  The coordinating process
+keeps the rest of the world: the queen, eggs, spiders, food and map growth.
+It also keeps a ghost of every ant for spiders to hunt and the canvas to
+draw.  A tick runs in three steps:
+
+1. Each worker applies what happened elsewhere during the last tick:
+   terrain edits and pheromone deposits from other strips, the queen and
+   food drops as the coordinator left them, damage to its ants, and ants
+   migrating in.  Then it updates its ants.
+2. Workers write each ant's position, energy and load into an
+   :class:`EntityTable` in :mod:`multiprocessing.shared_memory`.  They send
+   back what they did to the shared world: tiles dug, trails laid, food
+   taken, calls on the queen, and ants that died or left the strip.
+3. The coordinator moves the ghosts to their rows and replays those
+   changes.  It then updates spiders, eggs and the queen and finishes the
+   tick as :meth:`AntSim.step` would.
+
+An ant that crosses a strip boundary is encoded with its random streams and
+update phase.  The next worker adopts it before the following tick.
+Boundaries are rebalanced from ghost positions every ``REBALANCE_TICKS``
+ticks, so strips keep similar head counts however the colony clusters.
+Terrain and pheromone grids are sparse chunk maps rather than fixed arrays.
+Each process therefore keeps its own copy, and edits to them travel as
+events.  Only the dense per-ant state lives in shared memory.
+
+Tolerance: with one worker, a run matches the single-process engine
+exactly.  With more, an ant sees the world as the single-process engine
+would show it, with two exceptions.  Changes made earlier in the same tick
+by ants in *other* strips arrive one tick late.  Trail strengths are summed
+in a different order.  Runs therefore drift apart slowly rather than
+diverging outright.  Over the first day from the same seed, ant, egg and
+spider counts stay within 10% of the single-process run, and so do food
+collected and fed.  Use :meth:`PartitionedSim.gather` to pull the full ant
+state back before saving a snapshot.
+
+How throughput grows with the number of cores has not been measured.
+Every process still rebuilds its own navigation fields, and the
+coordinator replays every strip's changes, so expect well under linear
+gains.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from bisect import bisect_right
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING
+
+from . import snapshot
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sim import AntSim
+
+# Smallest entity table; it doubles whenever ids run past the end.
+MIN_CAPACITY = 1024
+# Ticks between recomputing strip boundaries from ant positions.
+REBALANCE_TICKS = 50
+
+# One row of doubles per ant id: x1, y1, energy, flags.
+_ROW = 4
+_ALIVE, _CARRYING = 1, 2
+
+
+class EntityTable:
+    """Rows of per-ant state in a shared memory segment, indexed by id.
+
+    Created by the coordinator; workers attach by ``name``.
+    """
+
+    def __init__(self, capacity: int, name: str | None = None) -> None:
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=capacity * _ROW * 8)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.capacity = capacity
+        self.rows = self.shm.buf.cast("d")
+
+    def write(self, uid: int, x: float, y: float, energy: float, flags: int) -> None:
+        base = uid * _ROW
+        rows = self.rows
+        rows[base] = x
+        rows[base + 1] = y
+        rows[base + 2] = energy
+        rows[base + 3] = flags
+
+    def read(self, uid: int) -> tuple[float, float, float, int]:
+        base = uid * _ROW
+        rows = self.rows
+        return rows[base], rows[base + 1], rows[base + 2], int(rows[base + 3])
+
+    def copy_from(self, other: "EntityTable") -> None:
+        self.rows[: len(other.rows)] = other.rows
+
+    def close(self, unlink: bool = False) -> None:
+        self.rows.release()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def owner_of(boundaries: list[float], x: float) -> int:
+    """Index of the strip holding x position ``x``."""
+    return bisect_right(boundaries, x)
+
+
+def _place(sim: "AntSim", ant, x: float, y: float) -> None:
+    x1, y1, *_ = sim.canvas.coords(ant.item)
+    dx, dy = x - x1, y - y1
+    if dx or dy:
+        sim.canvas.move(ant.item, dx, dy)
+        sim.canvas.move(ant.image_id, dx, dy)
+
+
+# -- worker side ----------------------------------------------------------
+
+
+class _Strip:
+    """The share of the world one worker process runs."""
+
+    def __init__(
+        self,
+        index: int,
+        data: bytes,
+        uids: list[int],
+        owned: set[int],
+        boundaries: list[float],
+        table: tuple[str, int],
+    ) -> None:
+        from .sim import AntSim
+
+        self.index = index
+        self.boundaries = boundaries
+        self.table = EntityTable(table[1], table[0])
+        sim = self.sim = AntSim(headless=True, seed=0)
+        snapshot.loads(sim, data)
+        for ant, uid in zip(list(sim.ants), uids):
+            ant.uid = uid
+            if uid not in owned:
+                ant.die()
+        for uid, drop in enumerate(sim.food_drops):
+            drop.uid = uid
+        self.ants = {ant.uid: ant for ant in sim.ants}
+        self.calls: list[tuple] = []
+        self.tiles: list[tuple] = []
+        self.deposits: list[tuple] = []
+        self._quiet = False
+        self._started = False
+        sim.terrain.add_listener(self._on_tile)
+        # Deposits reach the strip through the sim's recorder hook.
+        sim.recorder = self
+        self._hook_queen()
+
+    # Hooks for the sim and queen; each records what must be replayed.
+
+    def _on_tile(self, x: int, y: int, old: str, new: str) -> None:
+        if not self._quiet:
+            self.tiles.append((x, y, new))
+
+    def deposit(self, x: float, y: float, amount: float, ptype: str, prev) -> None:
+        if not self._quiet:
+            self.deposits.append((x, y, amount, ptype, prev))
+
+    def end_tick(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _hook_queen(self) -> None:
+        queen = self.sim.queen
+        calls = self.calls
+
+        def feed(amount: float = 10) -> None:
+            calls.append(("feed", amount))
+
+        def lay_egg(x: int, y: int) -> None:
+            calls.append(("lay_egg", x, y))
+
+        def begin_reproduction_cycle() -> None:
+            if queen.ready_to_mate:
+                queen.ready_to_mate = False
+                calls.append(("begin_reproduction_cycle",))
+
+        queen.feed = feed
+        queen.lay_egg = lay_egg
+        queen.begin_reproduction_cycle = begin_reproduction_cycle
+
+    # Applying the coordinator's message.
+
+    def _apply(self, msg: dict) -> None:
+        sim = self.sim
+        if "table" in msg:
+            self.table.close()
+            self.table = EntityTable(msg["table"][1], msg["table"][0])
+        self.boundaries = msg["boundaries"]
+        (
+            sim.map_width,
+            sim.map_height,
+            sim.expansion_level,
+            sim.grid_width,
+            sim.grid_height,
+        ) = msg["bounds"]
+        sim.terrain.expand(sim.grid_width, sim.grid_height)
+        self._quiet = True
+        for x, y, state in msg["tiles"]:
+            sim.terrain.set_cell(x, y, state)
+        for x, y, amount, ptype, _ in msg["deposits"]:
+            sim.deposit_pheromone(x, y, amount, ptype)
+        self._quiet = False
+        if self._started:
+            # Decay for the tick just finished, now every strip's trails are in.
+            sim.decay_pheromones()
+        self._started = True
+        self._sync_queen(msg["queen"])
+        self._sync_food(msg["food"])
+        sim.food_collected, sim.queen_fed = msg["counters"]
+        for uid, energy in msg["hits"]:
+            ant = self.ants.get(uid)
+            if ant is not None:
+                ant.energy = max(0, ant.energy + energy)
+        for uid, status in msg["statuses"]:
+            if uid in self.ants:
+                self.ants[uid].status = status
+        for uid in msg["kills"]:
+            ant = self.ants.pop(uid, None)
+            if ant is not None:
+                ant.die()
+        for uid, data, phase in msg["adopt"]:
+            self._adopt(uid, data, phase)
+
+    def _sync_queen(self, state: tuple) -> None:
+        queen = self.sim.queen
+        x, y, *attrs = state
+        (
+            queen.hunger,
+            queen.fed,
+            queen.egg_lay_cooldown,
+            queen.ready_to_mate,
+            queen.mating_cooldown,
+            queen.base_spawn_time,
+        ) = attrs
+        x1, y1, *_ = self.sim.canvas.coords(queen.item)
+        if (x, y) != (x1, y1):
+            self.sim.canvas.move(queen.item, x - x1, y - y1)
+            queen.sync_home_field()
+
+    def _sync_food(self, food: list[tuple]) -> None:
+        sim = self.sim
+        live = {uid: (x, y, charges) for uid, x, y, charges in food}
+        for drop in list(sim.food_drops):
+            uid = getattr(drop, "uid", None)
+            if uid in live:
+                drop.charges = live.pop(uid)[2]
+            else:
+                sim.food_drops.remove(drop)
+                sim.food_field.remove_source(drop)
+                sim.canvas.delete(drop.item)
+        for uid, (x, y, charges) in live.items():
+            drop = sim.add_food_drop(x, y)
+            drop.uid = uid
+            drop.charges = charges
+
+    def _adopt(self, uid: int, data: bytes, phase: tuple[int, int] | None) -> None:
+        sim = self.sim
+        ant = snapshot.loads_ant(sim, data)
+        ant.uid = uid
+        sim.ants.append(ant)
+        self.ants[uid] = ant
+        if phase is not None:
+            scheduler = sim.scheduler
+            scheduler._phase[ant] = phase[0]
+            scheduler._last[ant] = scheduler.tick - phase[1]
+
+    def _phase(self, ant) -> tuple[int, int] | None:
+        scheduler = self.sim.scheduler
+        phase = scheduler._phase.get(ant)
+        if phase is None:
+            return None
+        return phase, scheduler.tick - scheduler._last[ant]
+
+    # Running a tick.
+
+    def tick(self, msg: dict) -> dict:
+        self._apply(msg)
+        sim = self.sim
+        queen = sim.queen
+        fed = queen.fed
+        charges = {drop.uid: drop.charges for drop in sim.food_drops}
+        counters = (sim.food_collected, sim.queen_fed)
+
+        sim.clock.advance()
+        sim.update_lighting()
+        scheduler = sim.scheduler
+        scheduler.begin_tick()
+        # Hand out scheduler phases from the coordinator's sequence, as the
+        # single-process engine numbers ants and other entities together.
+        scheduler._next_phase = msg["phase"]
+        for ant in list(sim.ants):
+            scheduler.run(ant)
+
+        food = {}
+        for drop in sim.food_drops:
+            taken = charges.pop(drop.uid, 0) - drop.charges
+            if taken:
+                food[drop.uid] = taken
+        # Drops used up here were already removed from the list.
+        food.update(charges)
+        died = []
+        migrants = []
+        table = self.table
+        present = set(map(id, sim.ants))
+        for uid, ant in list(self.ants.items()):
+            if not ant.alive or id(ant) not in present:
+                died.append(uid)
+                del self.ants[uid]
+                table.write(uid, 0.0, 0.0, 0.0, 0)
+                continue
+            x1, y1, *_ = sim.canvas.coords(ant.item)
+            table.write(
+                uid, x1, y1, ant.energy, _ALIVE | (_CARRYING if ant.carrying_food else 0)
+            )
+            dest = owner_of(self.boundaries, x1)
+            if dest != self.index:
+                migrants.append((uid, dest, snapshot.dumps_ant(sim, ant), self._phase(ant)))
+                del self.ants[uid]
+                ant.die()
+        sim.master.advance(sim.clock.tick_ms)
+
+        result = {
+            "calls": self.calls[:],
+            "fed": queen.fed - fed,
+            "food": food,
+            "counters": (sim.food_collected - counters[0], sim.queen_fed - counters[1]),
+            "tiles": self.tiles,
+            "deposits": self.deposits,
+            "died": died,
+            "migrants": migrants,
+            "phases": scheduler._next_phase - msg["phase"],
+        }
+        self.calls.clear()
+        self.tiles = []
+        self.deposits = []
+        return result
+
+    def gather(self) -> list[tuple]:
+        sim = self.sim
+        return [
+            (uid, snapshot.dumps_ant(sim, ant), self._phase(ant))
+            for uid, ant in self.ants.items()
+        ]
+
+
+def _serve(conn, index, data, uids, owned, boundaries, table) -> None:
+    strip = _Strip(index, data, uids, owned, boundaries, table)
+    try:
+        while True:
+            command, payload = conn.recv()
+            if command == "tick":
+                conn.send(strip.tick(payload))
+            elif command == "gather":
+                conn.send(strip.gather())
+            else:
+                break
+    finally:
+        strip.table.close()
+        conn.close()
+
+
+# -- coordinator side -----------------------------------------------------
+
+
+class PartitionedSim:
+    """Run the ants of ``sim`` in ``workers`` processes, one per CPU by default.
+
+    ``sim`` stays the coordinator's view of the world and can be drawn or
+    recorded as usual.  Its ants are ghosts, moved from the entity table
+    each tick; :meth:`gather` refreshes their full state.  Call
+    :meth:`close` (or use the engine as a context manager) to stop the
+    workers.
+    """
+
+    def __init__(
+        self,
+        sim: "AntSim",
+        workers: int | None = None,
+        rebalance_ticks: int = REBALANCE_TICKS,
+    ) -> None:
+        self.sim = sim
+        self.count = max(1, workers or os.cpu_count() or 1)
+        self.rebalance_ticks = rebalance_ticks
+        self.ghosts = {}
+        self.owner: dict[int, int] = {}
+        # Ants handed from one worker to another so far.
+        self.migrations = 0
+        for uid, ant in enumerate(sim.ants):
+            ant.uid = uid
+            self.ghosts[uid] = ant
+        self._next_uid = len(sim.ants)
+        self.food = {}
+        for uid, drop in enumerate(sim.food_drops):
+            drop.uid = uid
+            self.food[uid] = drop
+        self._next_food = len(sim.food_drops)
+        self.boundaries = self._balance()
+        for uid, ant in self.ghosts.items():
+            self.owner[uid] = owner_of(self.boundaries, self._x(ant))
+        self.table = EntityTable(max(MIN_CAPACITY, 2 * self._next_uid))
+        self._retired: list[EntityTable] = []
+        self._table_changed = False
+        for uid, ant in self.ghosts.items():
+            x1, y1, *_ = sim.canvas.coords(ant.item)
+            self.table.write(uid, x1, y1, ant.energy, _ALIVE)
+        self._outbox = [self._empty() for _ in range(self.count)]
+        self._tiles: list[tuple] = []
+        self._deposits: list[tuple] = []
+        self._applying = False
+        sim.terrain.add_listener(self._on_tile)
+
+        data = snapshot.dumps(sim, compress=False)
+        uids = [ant.uid for ant in sim.ants]
+        ctx = multiprocessing.get_context()
+        self.conns = []
+        self.processes = []
+        for index in range(self.count):
+            owned = {uid for uid, owner in self.owner.items() if owner == index}
+            parent, child = ctx.Pipe()
+            process = ctx.Process(
+                target=_serve,
+                args=(
+                    child,
+                    index,
+                    data,
+                    uids,
+                    owned,
+                    self.boundaries,
+                    (self.table.name, self.table.capacity),
+                ),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def __enter__(self) -> "PartitionedSim":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _empty() -> dict:
+        return {"hits": [], "statuses": [], "kills": [], "adopt": []}
+
+    def _x(self, ant) -> float:
+        return self.sim.canvas.coords(ant.item)[0]
+
+    def _balance(self) -> list[float]:
+        """Strip boundaries giving each worker an equal share of ants."""
+        xs = sorted(self._x(ant) for ant in self.ghosts.values())
+        if not xs:
+            width = self.sim.map_width
+            return [width * k / self.count for k in range(1, self.count)]
+        return [xs[len(xs) * k // self.count] for k in range(1, self.count)]
+
+    def _on_tile(self, x: int, y: int, old: str, new: str) -> None:
+        if not self._applying:
+            self._tiles.append((-1, (x, y, new)))
+
+    # -- ticking ----------------------------------------------------------
+
+    def _message(self, index: int) -> dict:
+        sim = self.sim
+        queen = sim.queen
+        qx, qy, *_ = sim.canvas.coords(queen.item)
+        for drop in sim.food_drops:
+            if not hasattr(drop, "uid"):
+                drop.uid = self._next_food
+                self.food[drop.uid] = drop
+                self._next_food += 1
+        msg = self._outbox[index]
+        msg.update(
+            boundaries=self.boundaries,
+            bounds=(
+                sim.map_width,
+                sim.map_height,
+                sim.expansion_level,
+                sim.grid_width,
+                sim.grid_height,
+            ),
+            tiles=[tile for source, tile in self._tiles if source != index],
+            deposits=[dep for source, dep in self._deposits if source != index],
+            queen=(
+                qx,
+                qy,
+                queen.hunger,
+                queen.fed,
+                queen.egg_lay_cooldown,
+                queen.ready_to_mate,
+                queen.mating_cooldown,
+                queen.base_spawn_time,
+            ),
+            food=[
+                (drop.uid, *sim.canvas.coords(drop.item)[:2], drop.charges)
+                for drop in sim.food_drops
+                if drop.charges > 0
+            ],
+            counters=(sim.food_collected, sim.queen_fed),
+            phase=sim.scheduler._next_phase,
+        )
+        if self._table_changed:
+            msg["table"] = (self.table.name, self.table.capacity)
+        return msg
+
+    def step(self) -> None:
+        """Advance the world one tick across all workers."""
+        sim = self.sim
+        for index, conn in enumerate(self.conns):
+            conn.send(("tick", self._message(index)))
+        self._outbox = [self._empty() for _ in range(self.count)]
+        self._tiles = []
+        self._deposits = []
+        self._table_changed = False
+        sim.clock.advance()
+        sim.update_lighting()
+        scheduler = sim.scheduler
+        scheduler.begin_tick()
+        # Like ``AntSim._begin_tick``: eggs laid this tick wait for the next.
+        work = [*sim.predators, *sim.eggs, sim.queen]
+        replies = [conn.recv() for conn in self.conns]
+        for table in self._retired:
+            table.close(unlink=True)
+        self._retired = []
+
+        scheduler._next_phase += sum(reply["phases"] for reply in replies)
+        self._refresh_ghosts()
+        for index, reply in enumerate(replies):
+            self._merge(index, reply)
+
+        before = {uid: (ant.energy, ant.status) for uid, ant in self.ghosts.items()}
+        for entity in work:
+            scheduler.run(entity)
+        self._after_entities(before)
+        sim._end_tick()
+        if self.rebalance_ticks and sim.clock.ticks % self.rebalance_ticks == 0:
+            self.boundaries = self._balance()
+
+    def run_ticks(self, ticks: int) -> None:
+        for _ in range(ticks):
+            self.step()
+
+    def _refresh_ghosts(self) -> None:
+        sim = self.sim
+        table = self.table
+        for uid, ant in self.ghosts.items():
+            x, y, energy, flags = table.read(uid)
+            if flags & _ALIVE:
+                _place(sim, ant, x, y)
+                ant.energy = energy
+                ant.carrying_food = bool(flags & _CARRYING)
+
+    def _merge(self, index: int, reply: dict) -> None:
+        sim = self.sim
+        self._applying = True
+        for x, y, state in reply["tiles"]:
+            sim.terrain.set_cell(x, y, state)
+            self._tiles.append((index, (x, y, state)))
+        for deposit in reply["deposits"]:
+            x, y, amount, ptype, prev = deposit
+            sim.deposit_pheromone(x, y, amount, ptype, prev)
+            self._deposits.append((index, deposit))
+        self._applying = False
+        queen = sim.queen
+        for name, *args in reply["calls"]:
+            getattr(queen, name)(*args)
+        queen.fed += reply["fed"]
+        collected, fed = reply["counters"]
+        sim.food_collected += collected
+        sim.queen_fed += fed
+        for uid, taken in reply["food"].items():
+            drop = self.food.get(uid)
+            for _ in range(taken if drop is not None else 0):
+                drop.take_charge()
+        for uid in reply["died"]:
+            ghost = self.ghosts.pop(uid, None)
+            self.owner.pop(uid, None)
+            if ghost is not None:
+                ghost.die()
+        for uid, dest, data, phase in reply["migrants"]:
+            self.owner[uid] = dest
+            self.migrations += 1
+            self._outbox[dest]["adopt"].append((uid, data, phase))
+
+    def _after_entities(self, before: dict) -> None:
+        """Send what spiders and the queen did to ghosts to their owners."""
+        sim = self.sim
+        ants = set(sim.ants)
+        for uid, (energy, status) in before.items():
+            ant = self.ghosts[uid]
+            outbox = self._outbox[self.owner[uid]]
+            if ant not in ants:
+                # Killed by a spider, which takes ants straight off the list.
+                outbox["kills"].append(uid)
+                ant.alive = False
+                del self.ghosts[uid]
+                del self.owner[uid]
+                continue
+            if ant.energy != energy:
+                outbox["hits"].append((uid, ant.energy - energy))
+            if ant.status != status:
+                outbox["statuses"].append((uid, ant.status))
+        for ant in sim.ants:
+            if not hasattr(ant, "uid"):
+                self._hatched(ant)
+        for drop in list(self.food):
+            if self.food[drop].charges <= 0:
+                del self.food[drop]
+
+    def _hatched(self, ant) -> None:
+        uid = ant.uid = self._next_uid
+        self._next_uid += 1
+        if uid >= self.table.capacity:
+            self._grow()
+        self.ghosts[uid] = ant
+        x1, y1, *_ = self.sim.canvas.coords(ant.item)
+        self.table.write(uid, x1, y1, ant.energy, _ALIVE)
+        owner = self.owner[uid] = owner_of(self.boundaries, x1)
+        self._outbox[owner]["adopt"].append((uid, snapshot.dumps_ant(self.sim, ant), None))
+
+    def _grow(self) -> None:
+        table = EntityTable(self.table.capacity * 2)
+        table.copy_from(self.table)
+        # Workers detach from the old segment during the next tick.
+        self._retired.append(self.table)
+        self.table = table
+        self._table_changed = True
+
+    # -- results ----------------------------------------------------------
+
+    def gather(self) -> None:
+        """Replace every ghost with its worker's full copy of the ant.
+
+        Afterwards ``sim`` holds the whole colony, e.g. for a snapshot.
+        """
+        sim = self.sim
+        for conn in self.conns:
+            conn.send(("gather", None))
+        scheduler = sim.scheduler
+        slots = {id(ant): i for i, ant in enumerate(sim.ants)}
+        for conn in self.conns:
+            for uid, data, phase in conn.recv():
+                ghost = self.ghosts.get(uid)
+                if ghost is None:
+                    continue
+                ant = snapshot.loads_ant(sim, data)
+                ant.uid = uid
+                sim.ants[slots[id(ghost)]] = ant
+                ghost.alive = False
+                for item in (ghost.item, ghost.image_id, ghost.energy_bar_bg, ghost.energy_bar):
+                    sim.canvas.delete(item)
+                self.ghosts[uid] = ant
+                if phase is not None:
+                    scheduler._phase[ant] = phase[0]
+                    scheduler._last[ant] = scheduler.tick - phase[1]
+
+    def close(self) -> None:
+        """Stop the workers and free the entity table."""
+        for conn in self.conns:
+            try:
+                conn.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        for conn in self.conns:
+            conn.close()
+        self.conns = []
+        for table in [self.table, *self._retired]:
+            table.close(unlink=True)
+        self._retired = []
+        if self._on_tile in self.sim.terrain.listeners:
+            self.sim.terrain.listeners.remove(self._on_tile)
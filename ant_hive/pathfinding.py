@@ -0,0 +1,470 @@
+"""A* pathfinding over the terrain grid with a shared path cache.
+
+:class:`PathFinder` answers ``path(start, goal)`` queries in tile
+coordinates.  Results are kept in an LRU cache keyed by their endpoints and
+indexed by every tile they cross, so a terrain edit that blocks a tile only
+drops the paths running through it.  A query that starts on a tile of a
+cached path to the same goal reuses that path's tail, which lets many ants
+heading for one target share a single search.
+
+:class:`HierarchicalPathFinder` adds an HPA*-style tier for long routes on
+large, expanded maps.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Callable
+
+from .navigation import BLOCKED_TILES, NEIGHBOURS
+from .terrain import TILE_TUNNEL
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .connectivity import TileComponents
+
+Tile = tuple[int, int]
+Bounds = tuple[int, int, int, int]
+
+
+
+def ground_passable(state: str) -> bool:
+    """Tiles ants can walk through."""
+    return state not in BLOCKED_TILES
+
+
+def surface_passable(state: str) -> bool:
+    """Tiles spiders can cross: anything but the colony's tunnels."""
+    return state != TILE_TUNNEL
+
+
+def _bounded(walkable: Callable[[int, int], bool], bounds: Bounds):
+    x0, y0, x1, y1 = bounds
+
+    def inside(x: int, y: int) -> bool:
+        return x0 <= x < x1 and y0 <= y < y1 and walkable(x, y)
+
+    return inside
+
+
+class PathFinder:
+    """Cached A* queries over ``terrain`` restricted to ``passable`` tiles."""
+
+    def __init__(
+        self,
+        terrain,
+        passable: Callable[[str], bool] = ground_passable,
+        capacity: int = 1024,
+        components: TileComponents | None = None,
+    ) -> None:
+        self.terrain = terrain
+        self.passable = passable
+        self.capacity = capacity
+        # Optional index over the same passable tiles used to reject
+        # goals in another component without searching.
+        self.components = components
+        self.cache: OrderedDict[tuple[Tile, Tile], list[Tile] | None] = OrderedDict()
+        self._by_tile: dict[Tile, set[tuple[Tile, Tile]]] = {}
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+        self.nodes_expanded = 0
+        self.invalidated = 0
+        self.pruned = 0
+        terrain.add_listener(self._on_terrain_change)
+
+    def walkable(self, x: int, y: int) -> bool:
+        if not (0 <= x < self.terrain.width and 0 <= y < self.terrain.height):
+            return False
+        return self.passable(self.terrain.get_cell(x, y))
+
+    def path(self, start: Tile, goal: Tile) -> list[Tile] | None:
+        """Return the tiles from ``start`` to ``goal`` inclusive, or ``None``."""
+        key = (start, goal)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        through = next((k for k in self._by_tile.get(start, ()) if k[1] == goal), None)
+        if through is not None:
+            route = self.cache[through]
+            self.shared += 1
+            self._store(key, route[route.index(start):])
+            return self.cache[key]
+        self.misses += 1
+        if self._disconnected(start, goal):
+            self.pruned += 1
+            self._store(key, None)
+            return None
+        route = self.search(start, goal)
+        self._store(key, route)
+        return route
+
+    def next_step(self, start: Tile, goal: Tile) -> Tile | None:
+        """Return the ``(dx, dy)`` tile step from ``start`` toward ``goal``."""
+        route = self.path(start, goal)
+        if not route or len(route) < 2:
+            return None
+        return route[1][0] - start[0], route[1][1] - start[1]
+
+    def _disconnected(self, start: Tile, goal: Tile) -> bool:
+        if self.components is None:
+            return False
+        a = self.components.component_of(start)
+        b = self.components.component_of(goal)
+        return a is not None and b is not None and a != b
+
+    def search(
+        self, start: Tile, goal: Tile, bounds: Bounds | None = None
+    ) -> list[Tile] | None:
+        """Uncached A* with a Chebyshev heuristic and no corner cutting.
+
+        ``bounds`` (``x0, y0, x1, y1``, exclusive upper) keeps the route
+        inside a rectangle of the map.
+        """
+        if not self.walkable(*goal):
+            return None
+        walkable = self.walkable
+        enter = walkable if bounds is None else _bounded(walkable, bounds)
+        gx, gy = goal
+        g_cost = {start: 0}
+        parent: dict[Tile, Tile] = {}
+        counter = 0
+        frontier = [(max(abs(gx - start[0]), abs(gy - start[1])), counter, start)]
+        closed = set()
+        while frontier:
+            _, _, tile = heapq.heappop(frontier)
+            if tile in closed:
+                continue
+            if tile == goal:
+                route = [tile]
+                while tile in parent:
+                    tile = parent[tile]
+                    route.append(tile)
+                route.reverse()
+                return route
+            closed.add(tile)
+            self.nodes_expanded += 1
+            x, y = tile
+            cost = g_cost[tile] + 1
+            for dx, dy in NEIGHBOURS:
+                nxt = (x + dx, y + dy)
+                if nxt in closed or cost >= g_cost.get(nxt, cost + 1):
+                    continue
+                if not enter(*nxt):
+                    continue
+                if dx and dy and not (walkable(x + dx, y) and walkable(x, y + dy)):
+                    continue
+                g_cost[nxt] = cost
+                parent[nxt] = tile
+                counter += 1
+                h = max(abs(gx - nxt[0]), abs(gy - nxt[1]))
+                heapq.heappush(frontier, (cost + h, counter, nxt))
+        return None
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self._by_tile.clear()
+
+    def _store(self, key: tuple[Tile, Tile], route: list[Tile] | None) -> None:
+        self.cache[key] = route
+        for tile in route or ():
+            self._by_tile.setdefault(tile, set()).add(key)
+        while len(self.cache) > self.capacity:
+            self._evict(next(iter(self.cache)))
+
+    def _evict(self, key: tuple[Tile, Tile]) -> None:
+        route = self.cache.pop(key, None)
+        for tile in route or ():
+            keys = self._by_tile.get(tile)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tile[tile]
+
+    def _on_terrain_change(self, x: int, y: int, old: str, new: str) -> None:
+        was_open = self.passable(old)
+        is_open = self.passable(new)
+        if was_open == is_open:
+            return
+        if is_open:
+            # A new opening can only help queries that found no route.
+            stale = [key for key, route in self.cache.items() if route is None]
+        else:
+            stale = list(self._by_tile.get((x, y), ()))
+        for key in stale:
+            self._evict(key)
+        self.invalidated += len(stale)
+
+
+class HierarchicalPathFinder(PathFinder):
+    """HPA*-style planner for long routes on large maps.
+
+    The map is cut into ``chunk_size`` square chunks.  Each open run along a
+    chunk border becomes one entrance (a pair of tiles facing each other),
+    and every chunk stores the walking cost between its entrances.  Long
+    queries search this small abstract graph and then refine each hop with
+    an A* confined to one chunk, so their cost follows the route length
+    rather than the map area.  A chunk's entrances and costs are worked out
+    the first time a search reaches it, so chunks no route has come near are
+    never read or generated.  A terrain edit only marks its chunk; the next
+    query rebuilds that chunk's borders, and any chunk whose entrances moved
+    is worked out again when next reached.  Short queries use a flat
+    search kept to the chunks around both ends.
+
+    A goal walled off from the start is pruned on the chunk graph.  Next to
+    the search, a flood spreads from the goal's entrances one node per step.
+    If it runs out before meeting the search, the goal is walled in and the
+    query ends without spreading over the start's side of the map.
+    """
+
+    def __init__(
+        self,
+        terrain,
+        passable: Callable[[str], bool] = ground_passable,
+        capacity: int = 1024,
+        components: TileComponents | None = None,
+        chunk_size: int = 16,
+    ) -> None:
+        super().__init__(terrain, passable, capacity, components)
+        self.chunk_size = chunk_size
+        self.chunks_x = 0
+        self.chunks_y = 0
+        # Border (chunk, right or lower neighbour) -> entrance tile pairs.
+        self._entrances: dict[tuple[Tile, Tile], list[tuple[Tile, Tile]]] = {}
+        self._cross: dict[Tile, set[Tile]] = {}
+        self._intra: dict[Tile, dict[Tile, dict[Tile, int]]] = {}
+        self._stale: set[Tile] = set()
+        self.chunk_rebuilds = 0
+        self.abstract_expanded = 0
+
+    def chunk_of(self, tile: Tile) -> Tile:
+        return tile[0] // self.chunk_size, tile[1] // self.chunk_size
+
+    def chunk_bounds(self, chunk: Tile) -> Bounds:
+        size = self.chunk_size
+        x0, y0 = chunk[0] * size, chunk[1] * size
+        return (
+            x0,
+            y0,
+            min(x0 + size, self.terrain.width),
+            min(y0 + size, self.terrain.height),
+        )
+
+    def search(
+        self, start: Tile, goal: Tile, bounds: Bounds | None = None
+    ) -> list[Tile] | None:
+        if bounds is not None:
+            return super().search(start, goal, bounds)
+        if not self.walkable(*goal):
+            return None
+        size = self.chunk_size
+        if max(abs(goal[0] - start[0]), abs(goal[1] - start[1])) <= 2 * size:
+            # Stay within a chunk of both ends; anything further is the
+            # chunk graph's job.
+            x0 = (min(start[0], goal[0]) // size - 1) * size
+            y0 = (min(start[1], goal[1]) // size - 1) * size
+            x1 = (max(start[0], goal[0]) // size + 2) * size
+            y1 = (max(start[1], goal[1]) // size + 2) * size
+            route = super().search(start, goal, (x0, y0, x1, y1))
+            if route is not None:
+                return route
+        self._refresh()
+        hops = self._abstract_route(start, goal)
+        if hops is None:
+            return None
+        route = [start]
+        for a, b in zip(hops, hops[1:]):
+            if self.chunk_of(a) != self.chunk_of(b):
+                route.append(b)
+                continue
+            segment = super().search(a, b, self.chunk_bounds(self.chunk_of(a)))
+            if segment is None:
+                return None
+            route.extend(segment[1:])
+        return route
+
+    # -- abstract graph ----------------------------------------------------
+
+    def _abstract_route(self, start: Tile, goal: Tile) -> list[Tile] | None:
+        start_links = self._costs_from(start, self._chunk_nodes(self.chunk_of(start)))
+        goal_links = self._costs_from(goal, self._chunk_nodes(self.chunk_of(goal)))
+        gx, gy = goal
+        g_cost = {start: 0}
+        parent: dict[Tile, Tile] = {}
+        counter = 0
+        frontier = [(0, counter, start)]
+        closed = set()
+        # The goal's side of the graph, flooded a node per search step.
+        flooded = set(goal_links)
+        flood = deque(flooded)
+        flooding = True
+        while frontier:
+            if flooding and not flood:
+                if flooded.isdisjoint(start_links):
+                    # The goal is walled in, away from every start entrance.
+                    self.pruned += 1
+                    return None
+                flooding = False
+            elif flooding:
+                node = flood.popleft()
+                if node in g_cost:
+                    flooding = False
+                for nxt, _ in self._edges(node):
+                    if nxt not in flooded:
+                        flooded.add(nxt)
+                        flood.append(nxt)
+            _, _, node = heapq.heappop(frontier)
+            if node in closed:
+                continue
+            if node == goal:
+                hops = [node]
+                while node in parent:
+                    node = parent[node]
+                    hops.append(node)
+                hops.reverse()
+                return hops
+            closed.add(node)
+            self.abstract_expanded += 1
+            edges = list(start_links.items()) if node == start else self._edges(node)
+            if node in goal_links:
+                edges.append((goal, goal_links[node]))
+            for nxt, step in edges:
+                cost = g_cost[node] + step
+                if nxt in closed or cost >= g_cost.get(nxt, cost + 1):
+                    continue
+                g_cost[nxt] = cost
+                parent[nxt] = node
+                counter += 1
+                h = max(abs(gx - nxt[0]), abs(gy - nxt[1]))
+                heapq.heappush(frontier, (cost + h, counter, nxt))
+        return None
+
+    def _edges(self, node: Tile) -> list[tuple[Tile, int]]:
+        """Abstract edges out of the entrance ``node`` with their costs."""
+        edges = list(self._graph(self.chunk_of(node)).get(node, {}).items())
+        edges += [(other, 1) for other in self._cross.get(node, ())]
+        return edges
+
+    def _costs_from(self, origin: Tile, targets: set[Tile]) -> dict[Tile, int]:
+        """Walking cost from ``origin`` to each of ``targets`` in its chunk."""
+        enter = _bounded(self.walkable, self.chunk_bounds(self.chunk_of(origin)))
+        walkable = self.walkable
+        dist = {origin: 0}
+        found = {origin: 0} if origin in targets else {}
+        queue = [origin]
+        for tile in queue:
+            if len(found) == len(targets):
+                break
+            x, y = tile
+            for dx, dy in NEIGHBOURS:
+                nxt = (x + dx, y + dy)
+                if nxt in dist or not enter(*nxt):
+                    continue
+                if dx and dy and not (walkable(x + dx, y) and walkable(x, y + dy)):
+                    continue
+                dist[nxt] = dist[tile] + 1
+                if nxt in targets:
+                    found[nxt] = dist[nxt]
+                queue.append(nxt)
+        return found
+
+    def _chunk_nodes(self, chunk: Tile) -> set[Tile]:
+        nodes = set()
+        for border in self._borders(chunk):
+            for a, b in self._border_entrances(border):
+                nodes.add(a if border[0] == chunk else b)
+        return nodes
+
+    def _graph(self, chunk: Tile) -> dict[Tile, dict[Tile, int]]:
+        """Costs between the entrances of ``chunk``, worked out on first use."""
+        intra = self._intra.get(chunk)
+        if intra is None:
+            nodes = self._chunk_nodes(chunk)
+            intra = self._intra[chunk] = {
+                node: {
+                    other: cost
+                    for other, cost in self._costs_from(node, nodes).items()
+                    if other != node
+                }
+                for node in nodes
+            }
+            self.chunk_rebuilds += 1
+        return intra
+
+    def _borders(self, chunk: Tile) -> list[tuple[Tile, Tile]]:
+        cx, cy = chunk
+        borders = []
+        for other in ((cx + 1, cy), (cx, cy + 1)):
+            if other[0] < self.chunks_x and other[1] < self.chunks_y:
+                borders.append((chunk, other))
+        for other in ((cx - 1, cy), (cx, cy - 1)):
+            if other[0] >= 0 and other[1] >= 0:
+                borders.append((other, chunk))
+        return borders
+
+    def _border_entrances(self, border: tuple[Tile, Tile]) -> list[tuple[Tile, Tile]]:
+        entrances = self._entrances.get(border)
+        if entrances is None:
+            entrances = self._entrances[border] = self._scan_border(border)
+            for a, b in entrances:
+                self._cross.setdefault(a, set()).add(b)
+                self._cross.setdefault(b, set()).add(a)
+        return entrances
+
+    def _scan_border(self, border: tuple[Tile, Tile]) -> list[tuple[Tile, Tile]]:
+        (ax, ay), (bx, by) = border
+        x0, y0, x1, y1 = self.chunk_bounds((ax, ay))
+        if bx != ax:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+        entrances = []
+        run: list[tuple[Tile, Tile]] = []
+        for a, b in pairs:
+            if self.walkable(*a) and self.walkable(*b):
+                run.append((a, b))
+            elif run:
+                entrances.append(run[len(run) // 2])
+                run = []
+        if run:
+            entrances.append(run[len(run) // 2])
+        return entrances
+
+    def _refresh(self) -> None:
+        size = self.chunk_size
+        cw = -(-self.terrain.width // size)
+        ch = -(-self.terrain.height // size)
+        if (cw, ch) != (self.chunks_x, self.chunks_y):
+            # Worked-out chunks on the old far edges may have grown.
+            built = set(self._intra).union(*self._entrances)
+            for cx, cy in built:
+                if cx >= self.chunks_x - 1 or cy >= self.chunks_y - 1:
+                    self._stale.add((cx, cy))
+            self.chunks_x, self.chunks_y = cw, ch
+        if not self._stale:
+            return
+        for chunk in self._stale:
+            self._intra.pop(chunk, None)
+            for border in self._borders(chunk):
+                old = self._entrances.get(border)
+                if old is None:
+                    continue
+                new = self._scan_border(border)
+                if new == old:
+                    continue
+                for a, b in old:
+                    self._cross.get(a, set()).discard(b)
+                    self._cross.get(b, set()).discard(a)
+                for a, b in new:
+                    self._cross.setdefault(a, set()).add(b)
+                    self._cross.setdefault(b, set()).add(a)
+                self._entrances[border] = new
+                for side in border:
+                    self._intra.pop(side, None)
+        self._stale.clear()
+
+    def _on_terrain_change(self, x: int, y: int, old: str, new: str) -> None:
+        super()._on_terrain_change(x, y, old, new)
+        if self.passable(old) != self.passable(new):
+            self._stale.add(self.chunk_of((x, y)))
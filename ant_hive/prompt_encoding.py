@@ -0,0 +1,223 @@
+"""Prompt encoders for the AI decision points.
+
+Each encoding turns the canonical state of a decision (``move``, ``spawn`` or
+``thought``) into the system and user messages sent to the model.  The
+``json`` encoding reproduces the original verbose prompts; ``compact`` sends
+relative, tile-quantized values in a fixed field order so every request costs
+only a handful of tokens.  :data:`stats` counts estimated tokens per request
+and :func:`compare_encodings` runs an A/B comparison against a responder such
+as :class:`ant_hive.ai_standin.StandInServer`.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Callable
+
+from .constants import TILE_SIZE, MOVE_STEP
+
+MOVE = "move"
+SPAWN = "spawn"
+THOUGHT = "thought"
+
+# Largest tile offset the compact move encoding reports on either axis.
+MAX_TILE_OFFSET = 20
+
+# Fixed column order for the compact population field.
+ROLE_ORDER = ("WorkerAnt", "ScoutAnt", "SoldierAnt", "NurseAnt", "Drone")
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the BPE token count of ``text``.
+
+    Words and punctuation count as one token each and digit runs as one
+    token per three digits, which tracks the OpenAI tokenizers closely for
+    these short prompts.
+    """
+    return len(_TOKEN_RE.findall(text))
+
+
+def relative_tiles(
+    origin: list[float], target: list[float], limit: int = MAX_TILE_OFFSET
+) -> tuple[int, int]:
+    """Return the clamped tile offset from ``origin`` to ``target``."""
+    dx = int((target[0] - origin[0]) // TILE_SIZE)
+    dy = int((target[1] - origin[1]) // TILE_SIZE)
+    return max(-limit, min(limit, dx)), max(-limit, min(limit, dy))
+
+
+class JsonEncoding:
+    """Original prompts: the raw state serialized with ``json.dumps``."""
+
+    name = "json"
+    system = {
+        MOVE: 'You control an ant in a grid. Respond with JSON like {"dx":5,"dy":0}.',
+        SPAWN: "Respond with yes or no if the queen should spawn a new worker.",
+        THOUGHT: (
+            "You are a curious ant queen. "
+            "Speak in eight words or fewer about current observations."
+        ),
+    }
+
+    def encode(self, decision: str, state: dict) -> str:
+        return json.dumps(state)
+
+    def decode_move(self, text: str) -> tuple[int, int, int, int] | None:
+        """Recover food and queen tile offsets from an encoded move prompt."""
+        try:
+            state = json.loads(text)
+            fx, fy = relative_tiles(state["ant"], state["food"])
+            qx, qy = relative_tiles(state["ant"], state["queen"])
+        except (ValueError, KeyError, TypeError, IndexError):
+            return None
+        return fx, fy, qx, qy
+
+
+class CompactEncoding:
+    """Relative, tile-quantized prompts with a fixed field order."""
+
+    name = "compact"
+    system = {
+        MOVE: (
+            'Ant on tile grid. "f:x,y q:x,y" = food and queen offset in tiles. '
+            'Reply JSON {"dx":5,"dy":0}, each -5, 0 or 5.'
+        ),
+        SPAWN: (
+            '"h,a,f,w,s,o,n,d" = queen hunger, ants, food, then workers, scouts, '
+            "soldiers, nurses, drones. Should the queen spawn a worker? yes or no."
+        ),
+        THOUGHT: (
+            'Curious ant queen. "h,fed,f,a,e,p,mood" = hunger, fed, food, ants, '
+            "eggs, predators, mood. Speak in eight words or fewer."
+        ),
+    }
+
+    def encode(self, decision: str, state: dict) -> str:
+        if decision == MOVE:
+            fx, fy = relative_tiles(state["ant"], state["food"])
+            qx, qy = relative_tiles(state["ant"], state["queen"])
+            return f"f:{fx},{fy} q:{qx},{qy}"
+        if decision == SPAWN:
+            population = state.get("population", {})
+            fields = [int(state["hunger"]), state["ants"], state["food"]]
+            fields += [population.get(role, 0) for role in ROLE_ORDER]
+            return ",".join(str(v) for v in fields)
+        fields = [
+            state["hunger"],
+            state["fed"],
+            state["food"],
+            state["ants"],
+            state["eggs"],
+            state["predators"],
+            state["mood"],
+        ]
+        return ",".join(str(v) for v in fields)
+
+    def decode_move(self, text: str) -> tuple[int, int, int, int] | None:
+        match = re.fullmatch(r"f:(-?\d+),(-?\d+) q:(-?\d+),(-?\d+)", text.strip())
+        if match is None:
+            return None
+        fx, fy, qx, qy = (int(v) for v in match.groups())
+        return fx, fy, qx, qy
+
+
+ENCODINGS = {enc.name: enc for enc in (JsonEncoding(), CompactEncoding())}
+DEFAULT_ENCODING = os.getenv("ANT_HIVE_PROMPT_ENCODING", "compact")
+
+
+class PromptStats:
+    """Requests and estimated prompt tokens per encoding and decision type."""
+
+    def __init__(self) -> None:
+        self.requests: Counter = Counter()
+        self.tokens: Counter = Counter()
+
+    def record(self, encoding: str, decision: str, messages: list[dict]) -> int:
+        tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        self.requests[(encoding, decision)] += 1
+        self.tokens[(encoding, decision)] += tokens
+        return tokens
+
+    def tokens_per_request(self, encoding: str, decision: str) -> float:
+        count = self.requests[(encoding, decision)]
+        return self.tokens[(encoding, decision)] / count if count else 0.0
+
+
+stats = PromptStats()
+
+
+def build_messages(
+    decision: str, state: dict, encoding: str | None = None, record: bool = True
+) -> list[dict]:
+    """Return chat messages for ``decision`` and count their tokens."""
+    enc = ENCODINGS[encoding or DEFAULT_ENCODING]
+    messages = [
+        {"role": "system", "content": enc.system[decision]},
+        {"role": "user", "content": enc.encode(decision, state)},
+    ]
+    if record:
+        stats.record(enc.name, decision, messages)
+    return messages
+
+
+def decode_move(text: str) -> tuple[int, int, int, int] | None:
+    """Decode a move prompt written in any known encoding."""
+    for enc in ENCODINGS.values():
+        offsets = enc.decode_move(text)
+        if offsets is not None:
+            return offsets
+    return None
+
+
+def score_move(state: dict, reply: str | None) -> float:
+    """Return 1.0 if ``reply`` moves the ant closer to the food, else 0.0."""
+    try:
+        data = json.loads(reply or "")
+        dx, dy = int(data.get("dx", 0)), int(data.get("dy", 0))
+    except (ValueError, TypeError, AttributeError):
+        return 0.0
+    ax, ay = state["ant"][0], state["ant"][1]
+    fx, fy = state["food"][0], state["food"][1]
+    before = abs(fx - ax) + abs(fy - ay)
+    after = abs(fx - ax - dx) + abs(fy - ay - dy)
+    return 1.0 if after < before else 0.0
+
+
+def compare_encodings(
+    decision: str,
+    samples: list[dict],
+    answer: Callable[[list[dict]], str | None],
+    score: Callable[[dict, str | None], float],
+    encodings: tuple[str, ...] | None = None,
+) -> dict[str, dict[str, float]]:
+    """A/B test encodings on ``samples``.
+
+    ``answer`` sends the messages to a model (or stand-in) and ``score``
+    rates the reply for the original state.  Returns the mean prompt tokens
+    and mean score per encoding.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for name in encodings or tuple(ENCODINGS):
+        tokens = 0
+        quality = 0.0
+        for state in samples:
+            messages = build_messages(decision, state, name, record=False)
+            tokens += sum(estimate_tokens(m["content"]) for m in messages)
+            quality += score(state, answer(messages))
+        count = max(1, len(samples))
+        results[name] = {"tokens": tokens / count, "quality": quality / count}
+    return results
+
+
+def greedy_move_responder(payload: dict) -> str:
+    """Stand-in model that steps toward the food described in a move prompt."""
+    offsets = decode_move(payload["messages"][-1]["content"])
+    if offsets is None:
+        return '{"dx":0,"dy":0}'
+    fx, fy = offsets[0], offsets[1]
+    dx = MOVE_STEP if fx > 0 else -MOVE_STEP if fx < 0 else 0
+    dy = MOVE_STEP if fy > 0 else -MOVE_STEP if fy < 0 else 0
+    return json.dumps({"dx": dx, "dy": dy})
@@ -0,0 +1,764 @@
+"""Recording runs as event streams, and playing them back.
+
+A :class:`Recorder` attached to a sim writes what changed on every tick:
+entities that spawned, moved, resized or died, terrain tiles that changed
+state and pheromone deposits.  A :class:`Player` rebuilds the picture from
+those events alone.  It never runs an ant, the queen or the AI, so a run
+plays back far faster than it was simulated and needs no API keys.
+
+The file is a header followed by blocks::
+
+    header   MAGIC, version (u16), seed (i64), spawn tile (2 x i32),
+             tick length in ms (u32), ticks per keyframe (u32)
+    block    first tick (i64), size (u32), zlib-compressed body
+    end      size 0, block index, index offset (u64), INDEX_MAGIC
+
+Each block body starts with a keyframe: the full entity list, counters,
+map size and the terrain chunks edited so far.  The per-tick deltas that
+follow are varint-coded; positions are in quarter pixels and written as
+the change since the previous tick.  Untouched terrain is regrown from the
+seed, so keyframes only carry chunks that ants have dug or that were
+changed before recording started.
+
+Seeking decompresses only the block holding the target tick, using the
+index at the end of the file.  A file whose recorder never closed has no
+index; its blocks are found by walking their headers instead.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Callable
+
+from .clock import SimClock
+from .constants import PALETTE
+from .headless import HeadlessCanvas
+from .terrain import TILE_CODES, TILE_SIZE, TILE_STATES, Terrain
+from .world import CHUNK_CELLS, chunk_of
+from .worldgen import TerrainGenerator
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sim import AntSim
+
+MAGIC = b"AHREC\0"
+INDEX_MAGIC = b"AHRIDX"
+VERSION = 1
+# Ticks between keyframes; seeking replays at most this many deltas.
+KEYFRAME_EVERY = 200
+# Positions are stored in 1/QUANTUM pixel steps.
+QUANTUM = 4
+
+KINDS = ("ant", "queen", "spider", "egg", "food", "den")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+# Playback shapes and fills; ants record their own colour.
+_SHAPES = {"ant": "rectangle", "food": "rectangle"}
+_FILLS = {
+    "queen": PALETTE["neon_purple"],
+    "spider": "brown",
+    "egg": "white",
+    "food": "#ffcc00",
+    "den": "gray",
+}
+_PHEROMONE_COLORS = {"food": "green", "danger": "red", "scout": "purple"}
+
+_HEADER = struct.Struct("<6sHqiiII")
+_BLOCK = struct.Struct("<qI")
+_ENTRY = struct.Struct("<qQ")
+_TRAILER = struct.Struct("<Q6s")
+_COUNT = struct.Struct("<I")
+_AMOUNT = struct.Struct("<f")
+
+_BOUNDS, _COUNTERS = 1, 2
+
+
+class RecordingError(ValueError):
+    """Raised when a file is not a recording this version can read."""
+
+
+# -- encoding -------------------------------------------------------------
+
+
+def write_uint(out: bytearray, n: int) -> None:
+    """Append ``n >= 0`` as a varint."""
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def write_sint(out: bytearray, n: int) -> None:
+    """Append ``n`` as a zigzag varint."""
+    write_uint(out, n << 1 if n >= 0 else (-n << 1) - 1)
+
+
+def write_text(out: bytearray, value: str) -> None:
+    """Append ``value`` as UTF-8 behind its length."""
+    data = value.encode()
+    write_uint(out, len(data))
+    out += data
+
+
+class Cursor:
+    """Reads back what the ``write_*`` functions appended to ``data``."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def byte(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def uint(self) -> int:
+        data = self.data
+        shift = value = 0
+        while True:
+            b = data[self.pos]
+            self.pos += 1
+            value |= (b & 0x7F) << shift
+            if b < 0x80:
+                return value
+            shift += 7
+
+    def sint(self) -> int:
+        n = self.uint()
+        return -((n + 1) >> 1) if n & 1 else n >> 1
+
+    def raw(self, size: int) -> bytes:
+        data = self.data[self.pos : self.pos + size]
+        self.pos += size
+        return data
+
+    def text(self) -> str:
+        return self.raw(self.uint()).decode()
+
+    def amount(self) -> float:
+        return _AMOUNT.unpack(self.raw(_AMOUNT.size))[0]
+
+
+def _q(value: float) -> int:
+    return round(value * QUANTUM)
+
+
+def _entities(sim: "AntSim"):
+    """Yield ``(entity, kind)`` for everything drawn in the world."""
+    yield sim.queen, "queen"
+    for ant in sim.ants:
+        yield ant, "ant"
+    for spider in sim.predators:
+        yield spider, "spider"
+    for egg in sim.eggs:
+        yield egg, "egg"
+    for drop in sim.food_drops:
+        yield drop, "food"
+    for den in getattr(sim, "dens", ()):
+        yield den, "den"
+
+
+def _spawn(out: bytearray, rid: int, kind: str, box: tuple, entity) -> None:
+    write_uint(out, rid)
+    out.append(KIND_CODES[kind])
+    write_sint(out, box[0])
+    write_sint(out, box[1])
+    write_uint(out, box[2])
+    write_uint(out, box[3])
+    write_text(out, getattr(entity, "color", None) or _FILLS.get(kind, "black"))
+    write_text(out, getattr(entity, "role", "") if kind == "ant" else "")
+
+
+def _deposits(out: bytearray, deposits: list) -> None:
+    write_uint(out, len(deposits))
+    for ptype, qx, qy, amount, prev in deposits:
+        write_text(out, ptype)
+        write_sint(out, qx)
+        write_sint(out, qy)
+        out += _AMOUNT.pack(amount)
+        if prev is None:
+            out.append(0)
+        else:
+            out.append(1)
+            write_sint(out, prev[0])
+            write_sint(out, prev[1])
+
+
+class WorldEncoder:
+    """The entities, counters and terrain of ``sim`` as last encoded.
+
+    This is the part of the format recordings share with
+    :mod:`ant_hive.stream`.  :meth:`keyframe` writes the world in full and
+    :meth:`delta` what changed since the previous call; a
+    :class:`WorldDecoder` reads both.  Call :meth:`watch` when the sim
+    gets a new terrain (see :meth:`stale`) and :meth:`close` when done.
+    """
+
+    def __init__(self, sim: "AntSim") -> None:
+        self.sim = sim
+        # id(entity) -> (entity, recording id); holding the entity keeps
+        # its id() from being reused while it is tracked.
+        self.ids: dict[int, tuple[object, int]] = {}
+        self.boxes: dict[int, tuple[int, int, int, int]] = {}
+        self.next_id = 0
+        self.tiles: list[tuple[int, int, int]] = []
+        self.terrain: Terrain | None = None
+        self.edited: set[tuple[int, int]] = set()
+        self.state: tuple = ()
+        self.watch()
+
+    def watch(self) -> None:
+        """Follow the sim's current terrain."""
+        self.close()
+        self.terrain = self.sim.terrain
+        self.terrain.add_listener(self._on_tile)
+        # Tiles changed before we watched are unknown, so every chunk the
+        # world has stored so far counts as edited.
+        self.edited = {key for key, _, _ in self.terrain.cells.stored()}
+        self.tiles = []
+
+    def stale(self) -> bool:
+        """Whether the sim has a new terrain, as after a snapshot load."""
+        return self.sim.terrain is not self.terrain
+
+    def close(self) -> None:
+        if self.terrain is not None and self._on_tile in self.terrain.listeners:
+            self.terrain.listeners.remove(self._on_tile)
+
+    def _on_tile(self, x: int, y: int, old: str, new: str) -> None:
+        self.tiles.append((x, y, TILE_CODES[new]))
+        self.edited.add(chunk_of(x, y))
+
+    def _scan(self):
+        """Yield ``(rid, kind, box, entity)`` and drop the ids of the dead."""
+        canvas = self.sim.canvas
+        seen = {}
+        for entity, kind in _entities(self.sim):
+            coords = canvas.coords(entity.item)
+            if len(coords) < 4:
+                continue
+            key = id(entity)
+            tracked = self.ids.get(key)
+            if tracked is None:
+                tracked = (entity, self.next_id)
+                self.next_id += 1
+            seen[key] = tracked
+            x1, y1, x2, y2 = (_q(c) for c in coords[:4])
+            yield tracked[1], kind, (x1, y1, x2 - x1, y2 - y1), entity
+        self.ids = seen
+
+    def _status(self) -> tuple:
+        sim = self.sim
+        return (sim.terrain.width, sim.terrain.height, sim.food_collected, sim.queen_fed)
+
+    def keyframe(self, out: bytearray) -> None:
+        """Append the world in full; it becomes the baseline for deltas."""
+        self.state = self._status()
+        for value in self.state:
+            write_uint(out, value)
+        entities = list(self._scan())
+        self.boxes = {rid: box for rid, _, box, _ in entities}
+        write_uint(out, len(entities))
+        for rid, kind, box, entity in entities:
+            _spawn(out, rid, kind, box, entity)
+        cells = self.terrain.cells
+        write_uint(out, len(self.edited))
+        for key in sorted(self.edited):
+            write_sint(out, key[0])
+            write_sint(out, key[1])
+            out += bytes(cells.chunk(key, create=True))
+        self.tiles = []
+
+    def delta(self, out: bytearray) -> None:
+        """Append the changes since the last call or keyframe."""
+        state = self._status()
+        flags = 0
+        if state[:2] != self.state[:2]:
+            flags |= _BOUNDS
+        if state[2:] != self.state[2:]:
+            flags |= _COUNTERS
+        out.append(flags)
+        for value in (state[:2] if flags & _BOUNDS else ()) + (
+            state[2:] if flags & _COUNTERS else ()
+        ):
+            write_uint(out, value)
+        self.state = state
+
+        previous = self.boxes
+        boxes = {}
+        spawns = bytearray()
+        moves = bytearray()
+        resizes = bytearray()
+        spawned = moved = resized = 0
+        for rid, kind, box, entity in self._scan():
+            boxes[rid] = box
+            last = previous.get(rid)
+            if last is None:
+                _spawn(spawns, rid, kind, box, entity)
+                spawned += 1
+                continue
+            if box[:2] != last[:2]:
+                write_uint(moves, rid)
+                write_sint(moves, box[0] - last[0])
+                write_sint(moves, box[1] - last[1])
+                moved += 1
+            if box[2:] != last[2:]:
+                write_uint(resizes, rid)
+                write_uint(resizes, box[2])
+                write_uint(resizes, box[3])
+                resized += 1
+        died = [rid for rid in previous if rid not in boxes]
+        self.boxes = boxes
+
+        write_uint(out, spawned)
+        out += spawns
+        write_uint(out, len(died))
+        for rid in died:
+            write_uint(out, rid)
+        write_uint(out, moved)
+        out += moves
+        write_uint(out, resized)
+        out += resizes
+        write_uint(out, len(self.tiles))
+        for x, y, code in self.tiles:
+            write_uint(out, x)
+            write_uint(out, y)
+            out.append(code)
+        self.tiles = []
+
+
+# -- recording ------------------------------------------------------------
+
+
+class Recorder:
+    """Write the ticks of ``sim`` to ``path`` until :meth:`close`.
+
+    The recorder attaches itself as ``sim.recorder``; the sim reports each
+    finished tick and every pheromone deposit to it.  Recording starts
+    with a keyframe of the world as it is now.
+    """
+
+    def __init__(self, sim: "AntSim", path: str, keyframe_every: int = KEYFRAME_EVERY) -> None:
+        self.sim = sim
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.index: list[tuple[int, int]] = []
+        self.ticks = 0
+        # Blocks are stamped with this plus the ticks recorded, which keeps
+        # the timeline going forward when a snapshot load rewinds the clock.
+        self.first_tick = sim.clock.ticks
+        self._deposits: list = []
+        self._block = bytearray()
+        self._block_tick = 0
+        self._block_ticks = 0
+        self._deltas = bytearray()
+        self._file = open(path, "wb")
+        spawn = sim.worldgen.spawn
+        self._file.write(
+            _HEADER.pack(
+                MAGIC, VERSION, sim.seed, spawn[0], spawn[1], sim.clock.tick_ms, keyframe_every
+            )
+        )
+        self._world = WorldEncoder(sim)
+        self._keyframe()
+        sim.recorder = self
+
+    # -- hooks called by the sim ------------------------------------------
+
+    def deposit(self, x: float, y: float, amount: float, ptype: str, prev) -> None:
+        self._deposits.append(
+            (ptype, _q(x), _q(y), amount, None if prev is None else (_q(prev[0]), _q(prev[1])))
+        )
+
+    def end_tick(self) -> None:
+        """Record the tick that just finished."""
+        if self._file.closed:
+            return
+        self.ticks += 1
+        if self._world.stale():
+            # A snapshot was loaded: a new world, so start from a keyframe.
+            self._flush()
+            self._world.watch()
+            self._keyframe()
+        elif self._block_ticks >= self.keyframe_every:
+            self._flush()
+            self._keyframe()
+        else:
+            self._delta()
+
+    # -- frames -----------------------------------------------------------
+
+    def _keyframe(self) -> None:
+        out = self._block
+        self._block_tick = self.first_tick + self.ticks
+        self._block_ticks = 0
+        self._world.keyframe(out)
+        _deposits(out, self._deposits)
+        self._deposits = []
+        self._deltas = bytearray()
+
+    def _delta(self) -> None:
+        out = self._deltas
+        self._world.delta(out)
+        _deposits(out, self._deposits)
+        self._deposits = []
+        self._block_ticks += 1
+
+    def _flush(self) -> None:
+        if not self._block:
+            return
+        body = bytearray(self._block)
+        write_uint(body, self._block_ticks)
+        body += self._deltas
+        data = zlib.compress(bytes(body))
+        self.index.append((self._block_tick, self._file.tell()))
+        self._file.write(_BLOCK.pack(self._block_tick, len(data)))
+        self._file.write(data)
+        self._block = bytearray()
+        self._deltas = bytearray()
+        self._block_ticks = 0
+
+    def close(self) -> None:
+        """Write the last block and the index, and detach from the sim."""
+        if self._file.closed:
+            return
+        self._flush()
+        self._file.write(_BLOCK.pack(0, 0))
+        offset = self._file.tell()
+        self._file.write(_COUNT.pack(len(self.index)))
+        for entry in self.index:
+            self._file.write(_ENTRY.pack(*entry))
+        self._file.write(_TRAILER.pack(offset, INDEX_MAGIC))
+        self._file.close()
+        self._world.close()
+        if getattr(self.sim, "recorder", None) is self:
+            self.sim.recorder = None
+
+
+# -- playback -------------------------------------------------------------
+
+
+class Tracked:
+    """An entity as the player knows it: what it is and where."""
+
+    def __init__(self, kind: str, fill: str, label: str, box: list[int]) -> None:
+        self.kind = kind
+        self.fill = fill
+        self.label = label
+        self.box = box
+        self.item: int | None = None
+
+    def coords(self) -> tuple[float, float, float, float]:
+        x, y, w, h = (v / QUANTUM for v in self.box)
+        return x, y, x + w, y + h
+
+
+class WorldDecoder:
+    """Rebuild on ``canvas`` the world a :class:`WorldEncoder` wrote.
+
+    Entities are drawn as plain shapes and terrain through a
+    :class:`~ant_hive.terrain.Terrain` regrown by ``worldgen``, which must
+    be set before the first keyframe.  Without a canvas nothing is drawn,
+    but ``entities``, ``terrain`` and the counters still follow.
+    """
+
+    def __init__(self, canvas=None) -> None:
+        self.canvas = canvas or HeadlessCanvas()
+        self.worldgen: TerrainGenerator | None = None
+        self.terrain: Terrain | None = None
+        self.entities: dict[int, Tracked] = {}
+        self.food_collected = 0
+        self.queen_fed = 0
+
+    def _read_spawn(self, cursor: Cursor) -> tuple[int, Tracked]:
+        rid = cursor.uint()
+        kind = KINDS[cursor.byte()]
+        box = [cursor.sint(), cursor.sint(), cursor.uint(), cursor.uint()]
+        fill = cursor.text()
+        return rid, Tracked(kind, fill, cursor.text(), box)
+
+    def _read_world(self, cursor: Cursor) -> tuple:
+        """Read a keyframe: ``(width, height, food, fed, entities, chunks)``."""
+        width, height = cursor.uint(), cursor.uint()
+        food, fed = cursor.uint(), cursor.uint()
+        entities = dict(self._read_spawn(cursor) for _ in range(cursor.uint()))
+        chunks = {}
+        for _ in range(cursor.uint()):
+            key = (cursor.sint(), cursor.sint())
+            chunks[key] = array("B", cursor.raw(CHUNK_CELLS))
+        return width, height, food, fed, entities, chunks
+
+    def _read_changes(self, cursor: Cursor) -> None:
+        """Read and apply a delta."""
+        flags = cursor.byte()
+        if flags & _BOUNDS:
+            width, height = cursor.uint(), cursor.uint()
+            self.terrain.expand(width, height)
+            self.terrain.show_region(0, 0, width, height)
+        if flags & _COUNTERS:
+            self.food_collected, self.queen_fed = cursor.uint(), cursor.uint()
+        for _ in range(cursor.uint()):
+            self._add(*self._read_spawn(cursor))
+        for _ in range(cursor.uint()):
+            self._remove(cursor.uint())
+        entities = self.entities
+        for _ in range(cursor.uint()):
+            tracked = entities[cursor.uint()]
+            tracked.box[0] += cursor.sint()
+            tracked.box[1] += cursor.sint()
+            self._place(tracked)
+        for _ in range(cursor.uint()):
+            tracked = entities[cursor.uint()]
+            tracked.box[2] = cursor.uint()
+            tracked.box[3] = cursor.uint()
+            self._place(tracked)
+        terrain = self.terrain
+        for _ in range(cursor.uint()):
+            x, y = cursor.uint(), cursor.uint()
+            terrain.set_cell(x, y, TILE_STATES[cursor.byte()])
+
+    # -- drawing ----------------------------------------------------------
+
+    def _set_terrain(self, width: int, height: int, chunks: dict) -> None:
+        if self.terrain is None:
+            self.terrain = Terrain(width, height, self.canvas, self.worldgen)
+        terrain = self.terrain
+        terrain.cells.replace(chunks, {}, set())
+        terrain.width, terrain.height = width, height
+        terrain.redraw()
+        terrain.show_region(0, 0, width, height)
+
+    def _set_entities(self, entities: dict[int, Tracked]) -> None:
+        """Make ``entities`` the world's, reusing the drawn items that match."""
+        for rid in [rid for rid in self.entities if rid not in entities]:
+            self._remove(rid)
+        for rid, tracked in entities.items():
+            old = self.entities.get(rid)
+            if old is not None and (old.kind, old.fill) == (tracked.kind, tracked.fill):
+                old.box = tracked.box
+                self._place(old)
+            else:
+                self._remove(rid)
+                self._add(rid, tracked)
+
+    def _add(self, rid: int, tracked: Tracked) -> None:
+        self.entities[rid] = tracked
+        create = getattr(self.canvas, f"create_{_SHAPES.get(tracked.kind, 'oval')}")
+        tracked.item = create(*tracked.coords(), fill=tracked.fill)
+
+    def _place(self, tracked: Tracked) -> None:
+        self.canvas.coords(tracked.item, *tracked.coords())
+
+    def _remove(self, rid: int) -> None:
+        tracked = self.entities.pop(rid, None)
+        if tracked is not None and tracked.item is not None:
+            self.canvas.delete(tracked.item)
+
+
+class Player(WorldDecoder):
+    """Rebuild a recorded run on ``canvas`` without running the simulation.
+
+    :meth:`seek` jumps to any recorded tick and :meth:`step` moves one tick
+    forward.  Entities are drawn as plain shapes and terrain through a
+    :class:`~ant_hive.terrain.Terrain` regrown from the recorded seed.
+    Without a canvas nothing is drawn, but the state is still there to
+    inspect: ``entities``, ``terrain``, ``deposits`` and the counters.
+    """
+
+    def __init__(self, path: str, canvas=None) -> None:
+        super().__init__(canvas)
+        self.path = path
+        with open(path, "rb") as fh:
+            self._data = fh.read()
+        if len(self._data) < _HEADER.size:
+            raise RecordingError(f"{path} is not a recording")
+        magic, version, seed, sx, sy, tick_ms, every = _HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise RecordingError(f"{path} is not a recording")
+        self.seed = seed
+        self.keyframe_every = every
+        self.clock = SimClock(tick_ms)
+        self.index = self._read_index()
+        if not self.index:
+            raise RecordingError(f"{path} holds no ticks")
+        self._starts = [tick for tick, _ in self.index]
+        self.worldgen = TerrainGenerator(seed, spawn=(sx, sy))
+        self.deposits: list = []
+        self._trails: list[int] = []
+        self._block = -1
+        self._cursor: Cursor | None = None
+        self._left = 0
+        self.tick = self.first_tick
+        self.seek(self.first_tick)
+
+    # -- index ------------------------------------------------------------
+
+    def _read_index(self) -> list[tuple[int, int]]:
+        data = self._data
+        end = len(data) - _TRAILER.size
+        if end > _HEADER.size:
+            offset, magic = _TRAILER.unpack_from(data, end)
+            if magic == INDEX_MAGIC:
+                (count,) = _COUNT.unpack_from(data, offset)
+                start = offset + _COUNT.size
+                return list(_ENTRY.iter_unpack(data[start : start + count * _ENTRY.size]))
+        # Never closed: walk the block headers.
+        index = []
+        pos = _HEADER.size
+        while pos + _BLOCK.size <= len(data):
+            tick, size = _BLOCK.unpack_from(data, pos)
+            if size == 0 or pos + _BLOCK.size + size > len(data):
+                break
+            index.append((tick, pos))
+            pos += _BLOCK.size + size
+        return index
+
+    @property
+    def first_tick(self) -> int:
+        return self.index[0][0]
+
+    @property
+    def last_tick(self) -> int:
+        """Last recorded tick; reads the final block once to find it."""
+        cursor = self._load(len(self.index) - 1)
+        self._read_keyframe(cursor, apply=False)
+        ticks = cursor.uint()
+        return self.index[-1][0] + ticks
+
+    # -- navigation -------------------------------------------------------
+
+    def seek(self, tick: int) -> None:
+        """Show the world as it was at the end of ``tick``."""
+        tick = max(self.first_tick, tick)
+        block = bisect_right(self._starts, tick) - 1
+        if block != self._block or tick < self.tick or self._cursor is None:
+            self._enter(block)
+        while self.tick < tick and self.step():
+            pass
+
+    def step(self) -> bool:
+        """Advance one tick; return ``False`` at the end of the recording."""
+        if self._left == 0:
+            if self._block + 1 >= len(self.index):
+                return False
+            # Tiles already match the keyframe when playing straight on.
+            self._enter(self._block + 1, terrain=False)
+            return True
+        self._left -= 1
+        self.tick += 1
+        self._read_delta(self._cursor)
+        return True
+
+    def play(self, master, speed: float = 50.0, frame_ms: int = 33, on_frame: Callable | None = None) -> None:
+        """Play to the end at ``speed`` times real time on ``master.after``."""
+        per_frame = max(1, round(speed * frame_ms / self.clock.tick_ms))
+
+        def frame() -> None:
+            for _ in range(per_frame):
+                if not self.step():
+                    return
+            if on_frame is not None:
+                on_frame(self)
+            master.after(frame_ms, frame)
+
+        frame()
+
+    # -- decoding ---------------------------------------------------------
+
+    def _load(self, block: int) -> Cursor:
+        offset = self.index[block][1]
+        _, size = _BLOCK.unpack_from(self._data, offset)
+        start = offset + _BLOCK.size
+        return Cursor(zlib.decompress(self._data[start : start + size]))
+
+    def _enter(self, block: int, terrain: bool = True) -> None:
+        cursor = self._cursor = self._load(block)
+        self._block = block
+        self.tick = self.index[block][0]
+        self._read_keyframe(cursor, apply=True, terrain=terrain)
+        self._left = cursor.uint()
+
+    def _read_deposits(self, cursor: Cursor) -> list:
+        deposits = []
+        for _ in range(cursor.uint()):
+            ptype = cursor.text()
+            x, y = cursor.sint() / QUANTUM, cursor.sint() / QUANTUM
+            amount = cursor.amount()
+            prev = None
+            if cursor.byte():
+                prev = (cursor.sint() / QUANTUM, cursor.sint() / QUANTUM)
+            deposits.append((ptype, x, y, amount, prev))
+        return deposits
+
+    def _read_keyframe(self, cursor: Cursor, apply: bool, terrain: bool = True) -> None:
+        width, height, food, fed, entities, chunks = self._read_world(cursor)
+        deposits = self._read_deposits(cursor)
+        if not apply:
+            return
+        self.food_collected, self.queen_fed = food, fed
+        if terrain or self.terrain is None:
+            self._set_terrain(width, height, chunks)
+        else:
+            self.terrain.expand(width, height)
+        self._set_entities(entities)
+        self._show_deposits(deposits)
+        self.clock.ticks = self.tick
+
+    def _read_delta(self, cursor: Cursor) -> None:
+        self._read_changes(cursor)
+        self._show_deposits(self._read_deposits(cursor))
+        self.clock.ticks = self.tick
+
+    # -- drawing ----------------------------------------------------------
+
+    def _show_deposits(self, deposits: list) -> None:
+        # Trails last one tick, however fast playback runs.
+        for item in self._trails:
+            self.canvas.delete(item)
+        self._trails = [
+            self.canvas.create_line(
+                prev[0], prev[1], x, y, fill=_PHEROMONE_COLORS.get(ptype, "black")
+            )
+            for ptype, x, y, _, prev in deposits
+            if prev is not None
+        ]
+        self.deposits = deposits
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Play a recording in a window: ``python -m ant_hive.recording FILE``."""
+    import argparse
+    import tkinter as tk
+
+    from .constants import WINDOW_HEIGHT, WINDOW_WIDTH
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=50.0)
+    parser.add_argument("--start", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    root.title("Ant Hive Playback")
+    canvas = tk.Canvas(
+        root, width=WINDOW_WIDTH, height=WINDOW_HEIGHT, bg=PALETTE["background"]
+    )
+    canvas.pack()
+    player = Player(args.path, canvas)
+    if args.start is not None:
+        player.seek(args.start)
+
+    def show(p: Player) -> None:
+        canvas.configure(scrollregion=(0, 0, p.terrain.width * TILE_SIZE, p.terrain.height * TILE_SIZE))
+        root.title(
+            f"Ant Hive Playback - day {p.clock.day}, tick {p.tick}, "
+            f"food {p.food_collected}"
+        )
+
+    player.play(root, args.speed, on_frame=show)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Per-activity update cadence for simulation entities.
+
+Not every entity needs its ``update()`` on every tick.  A nurse recovering
+energy or a soldier loitering by the queen can run every few ticks without
+visibly changing anything.  :class:`UpdateScheduler` asks each entity for
+its ``activity()`` ("active", "idle", "resting", "sleeping") and runs it
+every ``UPDATE_CADENCE[activity]`` ticks.  Entities are given staggered
+phases so the ones sharing a cadence are spread evenly across ticks instead
+of all landing on the same one.  Before each update the entity's
+``tick_span`` is set to the number of ticks since its last update; anything
+that accumulates per tick (resting, incubation) scales by it.
+"""
+
+from __future__ import annotations
+
+import time
+import weakref
+from collections import defaultdict
+
+from .constants import SLICE_BUDGET_MS, TICK_MS, UPDATE_CADENCE
+
+
+class UpdateScheduler:
+    """Decide which entities update on the current tick and time them."""
+
+    def __init__(self, cadence: dict[str, int] | None = None) -> None:
+        self.cadence = dict(UPDATE_CADENCE if cadence is None else cadence)
+        self.tick = 0
+        self._phase: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._last: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._next_phase = 0
+        # Per-role counters for tuning the cadences.
+        self.calls: dict[str, int] = defaultdict(int)
+        self.skips: dict[str, int] = defaultdict(int)
+        self.seconds: dict[str, float] = defaultdict(float)
+
+    def begin_tick(self) -> None:
+        self.tick += 1
+
+    def cadence_of(self, entity) -> int:
+        activity = getattr(entity, "activity", None)
+        state = activity() if activity is not None else "active"
+        return max(1, self.cadence.get(state, 1))
+
+    def due(self, entity) -> bool:
+        """Return whether ``entity`` should update on this tick."""
+        phase = self._phase.get(entity)
+        if phase is None:
+            phase = self._phase[entity] = self._next_phase
+            self._next_phase += 1
+            self._last[entity] = self.tick - 1
+        cadence = self.cadence_of(entity)
+        if cadence == 1:
+            return True
+        waited = self.tick - self._last[entity]
+        return waited >= cadence or (self.tick + phase) % cadence == 0
+
+    def run(self, entity) -> bool:
+        """Update ``entity`` if it is due; return whether it ran."""
+        role = getattr(entity, "role", type(entity).__name__)
+        if not self.due(entity):
+            self.skips[role] += 1
+            return False
+        entity.tick_span = self.tick - self._last[entity]
+        self._last[entity] = self.tick
+        start = time.perf_counter()
+        entity.update()
+        self.seconds[role] += time.perf_counter() - start
+        self.calls[role] += 1
+        return True
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """Per-role update counts, skips and mean cost in milliseconds."""
+        roles = set(self.calls) | set(self.skips)
+        return {
+            role: {
+                "calls": self.calls[role],
+                "skips": self.skips[role],
+                "mean_ms": 1000 * self.seconds[role] / self.calls[role] if self.calls[role] else 0.0,
+            }
+            for role in sorted(roles)
+        }
+
+
+class FramePacer:
+    """Measure tick cost, time-slice long ticks and pace the next one.
+
+    Entity updates are run in slices of at most ``slice_ms``; a tick whose
+    work does not fit is resumed from an idle callback.  The next tick is
+    scheduled ``interval_ms`` after this one started rather than after it
+    finished, so a slow tick eats into the wait instead of adding to it.
+    """
+
+    # Weight of the newest sample in the moving averages.
+    SMOOTHING = 0.1
+
+    def __init__(self, interval_ms: int = TICK_MS, slice_ms: int = SLICE_BUDGET_MS) -> None:
+        self.interval_ms = interval_ms
+        self.slice_ms = slice_ms
+        self.ticks = 0
+        self.slices = 0
+        self.split_ticks = 0
+        self.mean_cost_ms = 0.0
+        self.mean_period_ms = float(interval_ms)
+        self._tick_start: float | None = None
+        self._slice_start = 0.0
+        self._tick_slices = 0
+
+    def begin_tick(self) -> None:
+        now = time.perf_counter()
+        if self._tick_start is not None:
+            period = (now - self._tick_start) * 1000
+            self.mean_period_ms += (period - self.mean_period_ms) * self.SMOOTHING
+        self._tick_start = now
+        self._tick_slices = 0
+
+    def begin_slice(self) -> None:
+        self._slice_start = time.perf_counter()
+        self._tick_slices += 1
+        self.slices += 1
+
+    def over_budget(self) -> bool:
+        return (time.perf_counter() - self._slice_start) * 1000 >= self.slice_ms
+
+    def end_tick(self) -> int:
+        """Finish the tick; return the delay in ms before the next one."""
+        cost = (time.perf_counter() - self._tick_start) * 1000
+        self.mean_cost_ms += (cost - self.mean_cost_ms) * self.SMOOTHING
+        self.ticks += 1
+        if self._tick_slices > 1:
+            self.split_ticks += 1
+        return max(1, round(self.interval_ms - cost))
+
+    @property
+    def target_rate(self) -> float:
+        return 1000 / self.interval_ms
+
+    @property
+    def achieved_rate(self) -> float:
+        return 1000 / self.mean_period_ms if self.mean_period_ms else 0.0
+
+    def report(self) -> dict[str, float]:
+        return {
+            "target_tps": self.target_rate,
+            "achieved_tps": self.achieved_rate,
+            "mean_cost_ms": self.mean_cost_ms,
+            "split_ticks": self.split_ticks,
+        }
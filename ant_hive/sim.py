@@ -1,8 +1,8 @@
+import os
 import random
 import tkinter as tk
 from tkinter import ttk
 from typing import List
-import time
 
 
 from .constants import (
@@ -14,8 +14,12 @@ from .constants import (
     MONO_FONT,
     FOOD_SIZE,
     PREDATOR_ALERT_RANGE,
+    TERRAIN_EVICT_TICKS,
 )
-from .terrain import Terrain, TILE_ROCK, TILE_TUNNEL
+from .scheduler import FramePacer, UpdateScheduler
+from .clock import SimClock
+from .headless import HeadlessCanvas, HeadlessMaster
+from .terrain import Terrain, TILE_TUNNEL
 from .sprites import create_glowing_icon
 from .entities.base_ant import BaseAnt
 from .entities.worker import WorkerAnt
@@ -23,10 +27,21 @@ from .entities.scout import ScoutAnt
 from .entities.soldier import SoldierAnt
 from .entities.nurse import NurseAnt
 from .entities.queen import Queen
-from .entities.spider import Spider
+from .entities.spider import Den, Spider
 from .entities.egg import Egg
 from .entities.food import FoodDrop
-from .utils import brightness_at, stipple_from_brightness
+from .navigation import DistanceField
+from .world import ChunkedGrid, chunks_in
+from .mapped import MappedGrid
+from .rng import RngStreams
+from .pathfinding import HierarchicalPathFinder, surface_passable
+from .connectivity import TileComponents, is_tunnel
+from .worldgen import TerrainGenerator
+from .utils import stipple_from_brightness
+from . import snapshot
+from .recording import KEYFRAME_EVERY, Recorder
+from .export import DEFAULT_NAME, StateExporter
+from .stream import DEFAULT_ADDRESS, StreamServer, parse_address
 
 
 # Depth of diggable soil above the rocky layer at the bottom of the map.
@@ -34,9 +49,62 @@ DIRT_DEPTH = 5
 
 
 class AntSim:
-    def __init__(self, master: tk.Tk) -> None:
-        self.master = master
-        self.frame = tk.Frame(master, bg=PALETTE["frame"])
+    def __init__(
+        self,
+        master: tk.Tk | None = None,
+        headless: bool = False,
+        seed: int | None = None,
+        world_dir: str | None = None,
+    ) -> None:
+        """Build the world, and the Tk interface unless ``headless``.
+
+        A headless sim (or one given no ``master``) draws nothing and is
+        advanced by calling :meth:`step` or :meth:`run_ticks`; otherwise the
+        Tk event loop drives :meth:`update`.  With ``world_dir`` the terrain
+        and pheromone grids live in memory-mapped files there, and reopening
+        the directory picks up the same world.
+        """
+        self.world_dir = world_dir
+        self.headless = headless or master is None
+        self.master = HeadlessMaster() if master is None else master
+        # Simulated time; day and night follow ticks, not the wall clock.
+        self.clock = SimClock()
+        # Logic ticks run per rendered frame; raise it to fast-forward.
+        self.ticks_per_frame = 1
+        # Sidebar and lighting redraws; off when headless.
+        self.render = not self.headless
+        self.is_night = False
+        self.current_day = 1
+        if self.headless:
+            self.canvas = HeadlessCanvas(self.master)
+        else:
+            self._build_ui()
+        self.map_width = WINDOW_WIDTH
+        self.map_height = WINDOW_HEIGHT
+        self.expansion_level = 1
+        self.evict_timer = TERRAIN_EVICT_TICKS
+        # Runs idle, resting and sleeping entities less often than foragers.
+        self.scheduler = UpdateScheduler()
+        # Paces ticks and splits slow ones so the UI stays responsive.
+        self.pacer = FramePacer()
+        self._tick_work: list = []
+        self._tick_cursor = 0
+        # Set while a :class:`~ant_hive.recording.Recorder` is attached.
+        self.recorder: Recorder | None = None
+        # Set while a :class:`~ant_hive.export.StateExporter` is attached.
+        self.exporter: StateExporter | None = None
+        # Set while a :class:`~ant_hive.stream.StreamServer` is attached.
+        self.streamer: StreamServer | None = None
+        self.ant_labels: dict[int, tk.Label] = {}
+        self.predator_alert_label: tk.Label | None = None
+        self._alert_job = None
+        self._alert_flash_state = False
+        self._build_world(seed)
+        if not self.headless:
+            self.update()
+
+    def _build_ui(self) -> None:
+        self.frame = tk.Frame(self.master, bg=PALETTE["frame"])
         self.frame.pack(side="left", padx=5, pady=5)
         self.canvas = tk.Canvas(
             self.frame,
@@ -48,15 +116,10 @@ class AntSim:
         self.canvas.pack()
         self.canvas.configure(scrollregion=(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
         self.canvas.focus_set()
-        self.canvas.bind("<Left>", lambda e: self.canvas.xview_scroll(-20, "units"))
-        self.canvas.bind("<Right>", lambda e: self.canvas.xview_scroll(20, "units"))
-        self.canvas.bind("<Up>", lambda e: self.canvas.yview_scroll(-20, "units"))
-        self.canvas.bind("<Down>", lambda e: self.canvas.yview_scroll(20, "units"))
-        self.map_width = WINDOW_WIDTH
-        self.map_height = WINDOW_HEIGHT
-        self.expansion_level = 1
-        self.start_time = time.time()
-        self.is_night = False
+        self.canvas.bind("<Left>", lambda e: self.scroll_view(-20, 0))
+        self.canvas.bind("<Right>", lambda e: self.scroll_view(20, 0))
+        self.canvas.bind("<Up>", lambda e: self.scroll_view(0, -20))
+        self.canvas.bind("<Down>", lambda e: self.scroll_view(0, 20))
         self.overlay = self.canvas.create_rectangle(
             0,
             0,
@@ -66,7 +129,6 @@ class AntSim:
             outline="",
             state="hidden",
         )
-        self.current_day = 1
         self.status_icon = self.canvas.create_text(
             5,
             5,
@@ -76,7 +138,7 @@ class AntSim:
         )
         self.canvas.tag_raise(self.overlay)
         self.canvas.tag_raise(self.status_icon)
-        self.sidebar_frame = tk.Frame(master, bg=PALETTE["frame"])
+        self.sidebar_frame = tk.Frame(self.master, bg=PALETTE["frame"])
         self.sidebar_frame.pack(side="right", fill="y")
         self.food_icon = create_glowing_icon(20)
         self.spawn_button = tk.Button(
@@ -157,56 +219,164 @@ class AntSim:
         self.event_log.pack(fill="both", pady=(5, 0))
         self.spawn_button.bind("<ButtonPress-1>", self.start_place_food)
         self.canvas.bind("<Button-1>", self.place_food)
+
+    def _build_world(self, seed: int | None) -> None:
+        saved = self._saved_seed()
+        if saved is not None:
+            if seed is not None and seed != saved:
+                raise ValueError(f"{self.world_dir} holds the world of seed {saved}, not {seed}")
+            seed = saved
+        # The same seed always grows the same world; set ANT_HIVE_SEED to pin it.
+        if seed is None:
+            seed = int(os.getenv("ANT_HIVE_SEED") or random.randrange(1 << 32))
+        self._new_world(seed)
+        start_x, start_y = self.worldgen.spawn
+        center_x = start_x * TILE_SIZE
+        center_y = start_y * TILE_SIZE
+        self.queen: Queen = Queen(self, center_x, center_y)
+        self._index_world()
+        for tx, ty in self.worldgen.deposits(0, 0, self.grid_width, self.grid_height):
+            self.add_food_drop(tx * TILE_SIZE, ty * TILE_SIZE)
+        self.ants = [
+            WorkerAnt(self, center_x + 15, center_y + 5, "blue"),
+            WorkerAnt(self, center_x + 35, center_y + 5, "red"),
+            ScoutAnt(self, center_x + 55, center_y + 5, "black"),
+            SoldierAnt(self, center_x + 75, center_y + 5, "orange"),
+            NurseAnt(self, center_x + 95, center_y + 5, "pink"),
+        ]
+        self.predators.append(Spider(self, 50, TILE_SIZE * 2))
+
+    def _new_world(self, seed: int) -> None:
+        """Start an empty world of the initial size grown from ``seed``."""
+        if self.world_dir is not None:
+            os.makedirs(self.world_dir, exist_ok=True)
+            with open(os.path.join(self.world_dir, "seed"), "w") as fh:
+                fh.write(str(seed))
         self.placing_food = False
         self.food_drops: List[FoodDrop] = []
         self.eggs: List[Egg] = []
         self.predators: List[Spider] = []
+        self.dens: List[Den] = []
+        self.ants: List[BaseAnt] = []
+        self.food_collected: int = 0
+        self.queen_fed: int = 0
         self.grid_width = WINDOW_WIDTH // TILE_SIZE
         self.grid_height = WINDOW_HEIGHT // TILE_SIZE
-        # Pheromone grids keyed by type
-        self.pheromones: dict[str, list[list[float]]] = {}
+        # Pheromone grids keyed by type; chunks exist only where trails are.
+        self.pheromones: dict[str, ChunkedGrid] = {}
         for key in ("food", "danger", "scout"):
-            self.pheromones[key] = [
-                [0.0 for _ in range(self.grid_height)] for _ in range(self.grid_width)
-            ]
+            self.pheromones[key] = self._pheromone_grid(key)
         self.pheromone_colors = {
             "food": "green",
             "danger": "red",
             "scout": "purple",
         }
-        self.terrain = Terrain(self.grid_width, self.grid_height, self.canvas)
-        for _ in range(30):
-            rx = random.randint(0, self.terrain.width - 1)
-            ry = random.randint(self.terrain.height // 2, self.terrain.height - 1)
-            self.terrain.set_cell(rx, ry, TILE_ROCK)
         start_x = self.grid_width // 2
         start_y = self.grid_height // 2
+        self.seed = seed
+        # Every random draw in the world comes from a stream under this seed.
+        self.rng = RngStreams(seed)
+        self.worldgen = TerrainGenerator(self.seed, spawn=(start_x, start_y))
+        self.terrain = Terrain(
+            self.grid_width, self.grid_height, self.canvas, self.worldgen, self.world_dir
+        )
         self.terrain.initialize_explored(start_x, start_y, radius=3)
-
-        center_x = start_x * TILE_SIZE
-        center_y = start_y * TILE_SIZE
         self.food: int | None = None
-        self.queen: Queen = Queen(self, center_x, center_y)
-        self.ants: List[BaseAnt] = [
-            WorkerAnt(self, center_x + 15, center_y + 5, "blue"),
-            WorkerAnt(self, center_x + 35, center_y + 5, "red"),
-            ScoutAnt(self, center_x + 55, center_y + 5, "black"),
-            SoldierAnt(self, center_x + 75, center_y + 5, "orange"),
-            NurseAnt(self, center_x + 95, center_y + 5, "pink"),
-        ]
-        self.predators.append(Spider(self, 50, TILE_SIZE * 2))
-        self.food_collected: int = 0
-        self.queen_fed: int = 0
-        self.ant_labels: dict[int, tk.Label] = {}
-        self.predator_alert_label: tk.Label | None = None
-        self._alert_job = None
-        self._alert_flash_state = False
-        self.update()
+
+    def _saved_seed(self) -> int | None:
+        if self.world_dir is None:
+            return None
+        try:
+            with open(os.path.join(self.world_dir, "seed")) as fh:
+                return int(fh.read())
+        except FileNotFoundError:
+            return None
+
+    def _pheromone_grid(self, ptype: str) -> ChunkedGrid:
+        if self.world_dir is None:
+            return ChunkedGrid("f", 0.0)
+        # Saved trails stay unmapped until read; they replay the evaporation
+        # they missed when they are.
+        return MappedGrid(os.path.join(self.world_dir, f"pheromone-{ptype}.grid"), "f", 0.0)
+
+    def checkpoint(self) -> None:
+        """Flush memory-mapped world files to disk; a no-op in memory."""
+        self.terrain.flush()
+        for grid in self.pheromones.values():
+            grid.flush()
+
+    def close(self) -> None:
+        """Checkpoint and release the world files."""
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.streamer is not None:
+            self.streamer.close()
+        self._release_world()
+
+    def _release_world(self) -> None:
+        """Release the terrain and pheromone files, leaving hooks attached."""
+        self.terrain.close()
+        for grid in self.pheromones.values():
+            grid.close()
+
+    def _index_world(self) -> None:
+        """Build the navigation indexes over the terrain and the queen."""
+        # Flow field toward the queen shared by every ant heading home.
+        self.home_field = DistanceField(self.terrain)
+        self.queen.sync_home_field()
+        # Distances to the closest live food drop, seeded in place_food().
+        self.food_field = DistanceField(self.terrain)
+        self.tunnels = TileComponents(self.terrain, is_tunnel)
+        # Cached A* routes for directed moves; spiders keep out of tunnels.
+        # Goals walled off from the start are pruned on the chunk graph.
+        self.paths = HierarchicalPathFinder(self.terrain)
+        self.spider_paths = HierarchicalPathFinder(self.terrain, surface_passable)
+
+    def save_snapshot(self, path: str, compress: bool = True) -> int:
+        """Write the whole world to ``path``; return the bytes written.
+
+        Call between ticks.  See :mod:`ant_hive.snapshot` for the format.
+        """
+        return snapshot.save(self, path, compress)
+
+    def load_snapshot(self, path: str) -> None:
+        """Replace the current world with one saved by :meth:`save_snapshot`."""
+        snapshot.load(self, path)
+
+    def record(self, path: str, keyframe_every: int = KEYFRAME_EVERY) -> Recorder:
+        """Record every following tick to ``path`` for :class:`~ant_hive.recording.Player`.
+
+        Call ``close()`` on the returned recorder to finish the file.
+        """
+        return Recorder(self, path, keyframe_every)
+
+    def export_state(self, name: str = DEFAULT_NAME) -> StateExporter:
+        """Publish the world to shared memory as ``name`` after every tick.
+
+        Other processes read it with :class:`~ant_hive.export.StateReader`.
+        Call ``close()`` on the returned exporter to stop.
+        """
+        return StateExporter(self, name)
+
+    def stream(self, address=parse_address(DEFAULT_ADDRESS)) -> StreamServer:
+        """Stream every following tick to viewers connecting on ``address``.
+
+        ``address`` is a unix socket path or a ``(host, port)`` pair; see
+        :class:`~ant_hive.stream.StreamClient`.  Call ``close()`` on the
+        returned server to stop.
+        """
+        return StreamServer(self, address)
 
     def update_lighting(self) -> None:
-        """Update overlay brightness and day/night icon."""
-        t = time.time() - self.start_time
-        brightness = brightness_at(t)
+        """Update day/night state, then the overlay and day/night icon."""
+        clock = self.clock
+        self.is_night = clock.is_night
+        self.current_day = clock.day
+        if not self.render:
+            return
+        brightness = clock.brightness
 
         if brightness >= 0.999:
             # Daytime without overlay
@@ -222,10 +392,7 @@ class AntSim:
             for predator in self.predators:
                 predator.set_visible(True)
 
-        cycle = t % 60.0
-        self.is_night = cycle >= 30.0
-        icon = "\u2600\ufe0f" if cycle < 30.0 else "\U0001f319"
-        self.current_day = int(t // 60.0) + 1
+        icon = "\U0001f319" if self.is_night else "\u2600\ufe0f"
         self.canvas.itemconfigure(self.status_icon, text=f"{icon} Day {self.current_day}")
 
 
@@ -288,9 +455,15 @@ class AntSim:
     def place_food(self, event) -> None:
         if not self.placing_food:
             return
-        self.food_drops.append(FoodDrop(self, event.x, event.y))
+        self.add_food_drop(event.x, event.y)
         self.placing_food = False
 
+    def add_food_drop(self, x: int, y: int) -> FoodDrop:
+        drop = FoodDrop(self, x, y)
+        self.food_drops.append(drop)
+        self.food_field.add_source(drop, drop.tile())
+        return drop
+
     def deposit_pheromone(
         self,
         x: float,
@@ -299,14 +472,17 @@ class AntSim:
         ptype: str = "scout",
         prev: tuple[float, float] | None = None,
     ) -> None:
-        grid = self.pheromones.setdefault(
-            ptype,
-            [[0.0 for _ in range(self.grid_height)] for _ in range(self.grid_width)],
-        )
+        grid = self.pheromones.get(ptype)
+        if grid is None:
+            grid = self.pheromones[ptype] = self._pheromone_grid(ptype)
         gx = int(x) // TILE_SIZE
         gy = int(y) // TILE_SIZE
         if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
-            grid[gx][gy] += amount
+            grid.set(gx, gy, grid.get(gx, gy) + amount)
+        if self.recorder is not None:
+            self.recorder.deposit(x, y, amount, ptype, prev)
+        if self.streamer is not None:
+            self.streamer.deposit(x, y, amount, ptype, prev)
         if prev is not None:
             color = self.pheromone_colors.get(ptype, "black")
             line = self.canvas.create_line(prev[0], prev[1], x, y, fill=color)
@@ -319,15 +495,12 @@ class AntSim:
         gx = int(x) // TILE_SIZE
         gy = int(y) // TILE_SIZE
         if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
-            return grid[gx][gy]
+            return grid.get(gx, gy)
         return 0.0
 
     def decay_pheromones(self) -> None:
         for grid in self.pheromones.values():
-            for x in range(self.grid_width):
-                for y in range(self.grid_height):
-                    if grid[x][y] > 0:
-                        grid[x][y] = max(0.0, grid[x][y] - PHEROMONE_DECAY)
+            grid.decay(PHEROMONE_DECAY)
 
     def get_coords(self, item: int) -> list[float]:
         return self.canvas.coords(item)
@@ -341,8 +514,9 @@ class AntSim:
         """Randomly reposition the main food source within canvas bounds."""
         if self.food is None:
             return
-        x = random.randint(0, WINDOW_WIDTH - FOOD_SIZE)
-        y = random.randint(0, WINDOW_HEIGHT - FOOD_SIZE)
+        food_rng = self.rng.stream("food")
+        x = food_rng.randint(0, WINDOW_WIDTH - FOOD_SIZE)
+        y = food_rng.randint(0, WINDOW_HEIGHT - FOOD_SIZE)
         self.canvas.coords(self.food, x, y, x + FOOD_SIZE, y + FOOD_SIZE)
 
     def sparkle(self, x: float, y: float) -> None:
@@ -359,18 +533,33 @@ class AntSim:
             self.map_width += 200
             self.map_height += 150
             self.canvas.configure(scrollregion=(0, 0, self.map_width, self.map_height))
-            new_grid_w = self.map_width // TILE_SIZE
-            new_grid_h = self.map_height // TILE_SIZE
-            self.terrain.expand(new_grid_w, new_grid_h)
-            for row in self.pheromones:
-                row.extend([0.0] * (new_grid_h - len(row)))
-            for row in self.pheromone_items:
-                row.extend([None] * (new_grid_h - len(row)))
-            for _ in range(len(self.pheromones), new_grid_w):
-                self.pheromones.append([0.0] * new_grid_h)
-                self.pheromone_items.append([None] * new_grid_h)
-            self.grid_width = new_grid_w
-            self.grid_height = new_grid_h
+            self.grid_width = self.map_width // TILE_SIZE
+            self.grid_height = self.map_height // TILE_SIZE
+            # Only the bounds move; chunks are generated and drawn on demand.
+            self.terrain.expand(self.grid_width, self.grid_height)
+
+    def scroll_view(self, dx: int, dy: int) -> None:
+        if dx:
+            self.canvas.xview_scroll(dx, "units")
+        if dy:
+            self.canvas.yview_scroll(dy, "units")
+        self.reveal_view()
+
+    def visible_chunks(self) -> set[tuple[int, int]]:
+        """Chunks overlapping the scrolled canvas viewport."""
+        x0 = int(self.canvas.canvasx(0)) // TILE_SIZE
+        y0 = int(self.canvas.canvasy(0)) // TILE_SIZE
+        x1 = x0 + WINDOW_WIDTH // TILE_SIZE + 1
+        y1 = y0 + WINDOW_HEIGHT // TILE_SIZE + 1
+        return set(chunks_in(x0, y0, x1, y1))
+
+    def reveal_view(self) -> None:
+        """Draw any terrain chunk that has scrolled into view."""
+        x0 = int(self.canvas.canvasx(0)) // TILE_SIZE
+        y0 = int(self.canvas.canvasy(0)) // TILE_SIZE
+        self.terrain.show_region(
+            x0, y0, x0 + WINDOW_WIDTH // TILE_SIZE + 1, y0 + WINDOW_HEIGHT // TILE_SIZE + 1
+        )
 
     def _flash_predator_alert(self) -> None:
         if self.predator_alert_label is None:
@@ -440,31 +629,95 @@ class AntSim:
             self._hide_predator_alert()
 
 
+    def step(self) -> None:
+        """Advance the world one tick at once, without drawing the UI."""
+        self._begin_tick()
+        scheduler = self.scheduler
+        for entity in self._tick_work:
+            if scheduler.run(entity) and isinstance(entity, BaseAnt) and entity.alive:
+                entity.update_energy_bar()
+        self._end_tick()
+
+    def run_ticks(self, ticks: int) -> None:
+        for _ in range(ticks):
+            self.step()
+
+    def run_days(self, days: float) -> None:
+        self.run_ticks(round(days * self.clock.ticks_per_day))
+
     def update(self) -> None:
+        """Run one frame from the Tk loop.
+
+        With ``ticks_per_frame`` above one, the extra ticks run first with
+        :meth:`step`; the last one is time-sliced and then drawn.
+        """
+        self.pacer.begin_tick()
+        for _ in range(self.ticks_per_frame - 1):
+            self.step()
+        self._begin_tick()
+        self._run_slice()
+
+    def _begin_tick(self) -> None:
+        self.clock.advance()
         self.update_lighting()
-        for ant in self.ants[:]:
-            ant.update()
-            if ant.alive:
-                ant.update_energy_bar()
-        for predator in self.predators[:]:
-            predator.update()
-        for egg in self.eggs[:]:
-            egg.update()
-        self.queen.update()
+        self.scheduler.begin_tick()
+        self._tick_work = [*self.ants, *self.predators, *self.eggs, self.queen]
+        self._tick_cursor = 0
+
+    def _run_slice(self) -> None:
+        """Update entities from the cursor until the slice budget runs out."""
+        pacer = self.pacer
+        scheduler = self.scheduler
+        work = self._tick_work
+        pacer.begin_slice()
+        while self._tick_cursor < len(work):
+            entity = work[self._tick_cursor]
+            self._tick_cursor += 1
+            if scheduler.run(entity) and isinstance(entity, BaseAnt) and entity.alive:
+                entity.update_energy_bar()
+            if pacer.over_budget():
+                break
+        if self._tick_cursor < len(work):
+            self.master.after_idle(self._run_slice)
+            return
+        self._finish_tick()
+
+    def _end_tick(self) -> None:
+        """World bookkeeping shared by drawn and headless ticks."""
+        self._tick_work = []
         for drop in self.food_drops[:]:
             if drop.charges <= 0:
                 self.food_drops.remove(drop)
         self.decay_pheromones()
-        self._update_predator_alert()
-        stats = (
-            f"Food Collected: {self.food_collected}\n"
-            f"Fed to Queen: {self.queen_fed}\n"
-            f"Ants Active: {len(self.ants)}\n"
-            f"Eggs: {len(self.eggs)}\n"
-            f"Predators: {len(self.predators)}"
-        )
-        self.stats_label.configure(text=stats)
-        self.refresh_ant_stats()
-        self.refresh_colony_stats()
         self.maybe_expand_map()
-        self.master.after(100, self.update)
+        self.evict_timer -= 1
+        if self.evict_timer <= 0:
+            self.evict_timer = TERRAIN_EVICT_TICKS
+            self.terrain.evict_cold(self.visible_chunks())
+        if self.recorder is not None:
+            self.recorder.end_tick()
+        if self.exporter is not None:
+            self.exporter.end_tick()
+        if self.streamer is not None:
+            self.streamer.end_tick()
+        if self.headless:
+            self.master.advance(self.clock.tick_ms)
+
+    def _finish_tick(self) -> None:
+        self._end_tick()
+        if self.render:
+            self._update_predator_alert()
+            stats = (
+                f"Food Collected: {self.food_collected}\n"
+                f"Fed to Queen: {self.queen_fed}\n"
+                f"Ants Active: {len(self.ants)}\n"
+                f"Eggs: {len(self.eggs)}\n"
+                f"Predators: {len(self.predators)}\n"
+                f"Sim Rate: {self.pacer.achieved_rate * self.ticks_per_frame:.1f}"
+                f"/{self.pacer.target_rate:.0f} tps"
+            )
+            self.stats_label.configure(text=stats)
+            self.refresh_ant_stats()
+            self.refresh_colony_stats()
+        delay = self.pacer.end_tick()
+        self.master.after(delay if self.render else 1, self.update)
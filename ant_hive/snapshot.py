@@ -0,0 +1,650 @@
+"""Binary snapshots of a running simulation.
+
+A snapshot is a short header followed by a body, which is zlib-compressed
+when the header's ``FLAG_ZLIB`` bit is set::
+
+    header   MAGIC, version (u16), flags (u8)
+    body     sim scalars, terrain cells and explored grids, pheromone
+             grids, queen, ants, eggs, food drops, spiders, dens, update
+             phases, random streams
+
+Grids are written chunk by chunk as raw :class:`array.array` bytes, so they
+load with one ``frombytes`` each.  Chunks that were frozen in memory are
+written still compressed and go back into ``frozen`` as they are.  Entities
+are fixed :class:`struct.Struct` records, with strings and per-role extras
+after them.  Numbers are little-endian.
+
+Only world state is saved, including every random stream, so a restored
+run draws the same numbers the original would have.  Canvas items, pending
+AI requests and the queen's stuck-ant memory are rebuilt, or refill, after
+a load.  The
+terrain generator is rebuilt from the saved seed, so chunks the world never
+touched are not stored at all.
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+import sys
+import zlib
+from array import array
+from typing import TYPE_CHECKING
+
+from .entities.base_ant import AIBaseAnt
+from .entities.drone import DroneAnt
+from .entities.egg import Egg
+from .entities.nurse import NurseAnt
+from .entities.queen import Queen
+from .entities.scout import ScoutAnt
+from .entities.soldier import SoldierAnt
+from .entities.spider import Den, Spider
+from .entities.worker import WorkerAnt
+from .world import ChunkedGrid
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sim import AntSim
+
+MAGIC = b"AHSNAP"
+VERSION = 3
+FLAG_ZLIB = 1
+
+# Ant classes by the role code stored in their records.
+ANT_ROLES = (WorkerAnt, ScoutAnt, SoldierAnt, NurseAnt, DroneAnt, AIBaseAnt)
+
+_HEADER = struct.Struct("<6sHB")
+_SIM = struct.Struct("<qqiiiiiqqi")
+_RNG = struct.Struct("<BBd")
+_COUNT = struct.Struct("<I")
+_CHUNK = struct.Struct("<iiBI")
+_STR = struct.Struct("<H")
+_QUEEN = struct.Struct("<dddiiiBiBiiii")
+_ANT = struct.Struct("<BdddBB")
+_WORKER = struct.Struct("<Bii")
+_DRONE = struct.Struct("<i")
+_EGG = struct.Struct("<ddi")
+_FOOD = struct.Struct("<ddi")
+_SPIDER = struct.Struct("<ddddddddddBBB")
+_DEN = struct.Struct("<dd")
+_SCHED = struct.Struct("<qq")
+_FLAG = struct.Struct("<B")
+
+_SWAP = sys.byteorder != "little"
+_RAW, _FROZEN = 0, 1
+
+
+class SnapshotError(ValueError):
+    """Raised when a file is not a snapshot this version can read."""
+
+
+# -- encoding -------------------------------------------------------------
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.out = bytearray()
+
+    def pack(self, record: struct.Struct, *values) -> None:
+        self.out += record.pack(*values)
+
+    def blob(self, data: bytes) -> None:
+        self.out += _COUNT.pack(len(data))
+        self.out += data
+
+    def text(self, value: str | None) -> None:
+        # 0xFFFF marks None; real strings are far shorter.
+        if value is None:
+            self.out += _STR.pack(0xFFFF)
+            return
+        data = value.encode()[:0xFFFE]
+        self.out += _STR.pack(len(data))
+        self.out += data
+
+    def numbers(self, typecode: str, values) -> None:
+        self.blob(_le_bytes(typecode, array(typecode, values)))
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def unpack(self, record: struct.Struct) -> tuple:
+        values = record.unpack_from(self.data, self.pos)
+        self.pos += record.size
+        return values
+
+    def count(self) -> int:
+        return self.unpack(_COUNT)[0]
+
+    def blob(self) -> bytes:
+        size = self.count()
+        data = bytes(self.data[self.pos : self.pos + size])
+        if len(data) != size:
+            raise SnapshotError("snapshot is truncated")
+        self.pos += size
+        return data
+
+    def text(self) -> str | None:
+        (size,) = self.unpack(_STR)
+        if size == 0xFFFF:
+            return None
+        data = bytes(self.data[self.pos : self.pos + size])
+        self.pos += size
+        return data.decode()
+
+    def numbers(self, typecode: str) -> array:
+        return _native(array(typecode), self.blob())
+
+
+def _le_bytes(typecode: str, values) -> bytes:
+    if _SWAP and array(typecode).itemsize > 1:
+        values = array(typecode, values.tobytes())
+        values.byteswap()
+    return values.tobytes()
+
+
+def _native(values: array, data: bytes) -> array:
+    values.frombytes(data)
+    if _SWAP and values.itemsize > 1:
+        values.byteswap()
+    return values
+
+
+# -- grids ----------------------------------------------------------------
+
+
+def _write_grid(w: _Writer, grid: ChunkedGrid) -> None:
+    swap = _SWAP and array(grid.typecode).itemsize > 1
+    stored = []
+    for key, data, frozen in grid.stored():
+        if frozen and swap:
+            # Frozen bytes are native order; inflate them to write little-endian.
+            data, frozen = array(grid.typecode, zlib.decompress(data)), False
+        stored.append((key, data, frozen))
+    w.pack(_COUNT, len(stored))
+    for (cx, cy), data, frozen in stored:
+        data = data if frozen else _le_bytes(grid.typecode, data)
+        w.pack(_CHUNK, cx, cy, _FROZEN if frozen else _RAW, len(data))
+        w.out += data
+    w.numbers("i", [v for key in grid.blank for v in key])
+
+
+def _read_grid(r: _Reader, grid: ChunkedGrid) -> None:
+    """Replace the contents of ``grid`` with the next grid in ``r``."""
+    chunks: dict = {}
+    frozen: dict = {}
+    for _ in range(r.count()):
+        cx, cy, kind, size = r.unpack(_CHUNK)
+        data = bytes(r.data[r.pos : r.pos + size])
+        r.pos += size
+        if kind == _FROZEN:
+            frozen[(cx, cy)] = data
+        else:
+            chunks[(cx, cy)] = _native(array(grid.typecode), data)
+    blank = r.numbers("i")
+    grid.replace(chunks, frozen, set(zip(blank[::2], blank[1::2])))
+
+
+# -- entities -------------------------------------------------------------
+
+
+def _top_left(sim: "AntSim", item: int) -> tuple[float, float]:
+    x1, y1, *_ = sim.canvas.coords(item)
+    return x1, y1
+
+
+def _write_queen(w: _Writer, sim: "AntSim") -> None:
+    q = sim.queen
+    w.pack(
+        _QUEEN,
+        *_top_left(sim, q.item),
+        q.hunger,
+        q.spawn_timer,
+        q.base_spawn_time,
+        q.egg_lay_cooldown,
+        q.ready_to_mate,
+        q.mating_cooldown,
+        q.mad,
+        q.fed,
+        q.move_counter,
+        q.thought_timer,
+        q.command_cooldown,
+    )
+    for value in (q.current_thought, q.last_command, q.mood):
+        w.text(value)
+
+
+def _read_queen(r: _Reader, sim: "AntSim") -> Queen:
+    (
+        x,
+        y,
+        hunger,
+        spawn_timer,
+        base_spawn_time,
+        egg_lay_cooldown,
+        ready_to_mate,
+        mating_cooldown,
+        mad,
+        fed,
+        move_counter,
+        thought_timer,
+        command_cooldown,
+    ) = r.unpack(_QUEEN)
+    q = Queen(sim, x, y)
+    q.hunger = hunger
+    q.spawn_timer = spawn_timer
+    q.base_spawn_time = base_spawn_time
+    q.egg_lay_cooldown = egg_lay_cooldown
+    q.ready_to_mate = bool(ready_to_mate)
+    q.mating_cooldown = mating_cooldown
+    q.mad = bool(mad)
+    q.fed = fed
+    q.move_counter = move_counter
+    q.thought_timer = thought_timer
+    q.command_cooldown = command_cooldown
+    q.current_thought = r.text() or ""
+    q.last_command = r.text() or ""
+    q.mood = r.text() or "content"
+    return q
+
+
+def _write_ant(w: _Writer, sim: "AntSim", ant) -> None:
+    try:
+        role = ANT_ROLES.index(type(ant))
+    except ValueError:
+        raise TypeError(f"cannot snapshot ant of type {type(ant).__name__}") from None
+    w.pack(
+        _ANT,
+        role,
+        *_top_left(sim, ant.item),
+        ant.energy,
+        ant.carrying_food,
+        ant.frame_index,
+    )
+    w.text(ant.color)
+    w.text(ant.status)
+    w.text(ant.command)
+    if isinstance(ant, WorkerAnt):
+        w.pack(_WORKER, ant.is_breeder, ant.min_energy_threshold, ant.mate_cooldown)
+    elif isinstance(ant, DroneAnt):
+        w.pack(_DRONE, ant.cooldown)
+    elif isinstance(ant, ScoutAnt):
+        w.numbers("d", [v for pos in ant.visited for v in pos])
+    elif isinstance(ant, AIBaseAnt):
+        w.text(ant.model)
+
+
+def _read_ant(r: _Reader, sim: "AntSim"):
+    role, x, y, energy, carrying, frame = r.unpack(_ANT)
+    color = r.text() or "black"
+    ant = ANT_ROLES[role](sim, x, y, color)
+    ant.energy = energy
+    ant.carrying_food = bool(carrying)
+    ant.frame_index = frame
+    ant.status = r.text() or "Active"
+    ant.command = r.text()
+    if isinstance(ant, WorkerAnt):
+        breeder, threshold, cooldown = r.unpack(_WORKER)
+        ant.is_breeder = bool(breeder)
+        ant.min_energy_threshold = threshold
+        ant.mate_cooldown = cooldown
+    elif isinstance(ant, DroneAnt):
+        (ant.cooldown,) = r.unpack(_DRONE)
+    elif isinstance(ant, ScoutAnt):
+        visited = r.numbers("d")
+        ant.visited = set(zip(visited[::2], visited[1::2]))
+    elif isinstance(ant, AIBaseAnt):
+        ant.model = r.text() or ant.model
+    return ant
+
+
+def _write_spider(w: _Writer, sim: "AntSim", spider: Spider) -> None:
+    w.pack(
+        _SPIDER,
+        *_top_left(sim, spider.item),
+        spider.energy,
+        spider.health,
+        spider.vitality,
+        spider.hunger,
+        spider.consumed,
+        spider.size,
+        *spider.lair,
+        spider.has_laid_eggs,
+        spider.last_is_night,
+        spider.visible,
+    )
+
+
+def _read_spider(r: _Reader, sim: "AntSim") -> Spider:
+    (
+        x,
+        y,
+        energy,
+        health,
+        vitality,
+        hunger,
+        consumed,
+        size,
+        lair_x,
+        lair_y,
+        laid,
+        last_is_night,
+        visible,
+    ) = r.unpack(_SPIDER)
+    spider = Spider(sim, x, y, energy=energy, health=health, size=size)
+    spider.vitality = vitality
+    spider.hunger = hunger
+    spider.consumed = consumed
+    spider.lair = (lair_x, lair_y)
+    spider.has_laid_eggs = bool(laid)
+    spider.last_is_night = bool(last_is_night)
+    spider.set_visible(bool(visible))
+    return spider
+
+
+def _scheduled(sim: "AntSim") -> list:
+    return [*sim.ants, *sim.predators, *sim.eggs, sim.queen]
+
+
+def _write_schedule(w: _Writer, sim: "AntSim") -> None:
+    """Write each entity's update phase so cadences resume in step."""
+    scheduler = sim.scheduler
+    w.pack(_SCHED, scheduler.tick, scheduler._next_phase)
+    phases = []
+    for entity in _scheduled(sim):
+        phase = scheduler._phase.get(entity)
+        if phase is None:
+            phases += [-1, 0]
+        else:
+            phases += [phase, scheduler.tick - scheduler._last[entity]]
+    w.numbers("q", phases)
+
+
+def _read_schedule(r: _Reader, sim: "AntSim") -> None:
+    scheduler = sim.scheduler
+    scheduler.tick, scheduler._next_phase = r.unpack(_SCHED)
+    phases = r.numbers("q")
+    for i, entity in enumerate(_scheduled(sim)):
+        phase, waited = phases[2 * i], phases[2 * i + 1]
+        if phase >= 0:
+            scheduler._phase[entity] = phase
+            scheduler._last[entity] = scheduler.tick - waited
+
+
+def _write_rng(w: _Writer, rng: random.Random) -> None:
+    version, state, gauss = rng.getstate()
+    w.pack(_RNG, version, gauss is not None, gauss or 0.0)
+    w.numbers("I", state)
+
+
+def _read_rng(r: _Reader, rng: random.Random) -> None:
+    version, has_gauss, gauss = r.unpack(_RNG)
+    state = tuple(r.numbers("I"))
+    rng.setstate((version, state, gauss if has_gauss else None))
+
+
+def _write_ant_streams(w: _Writer, ant) -> None:
+    _write_rng(w, ant.rng)
+    # Ants on the global ``random`` have no step buffer; a flag marks that.
+    steps = getattr(ant, "steps", None)
+    w.pack(_FLAG, steps is not None)
+    if steps is not None:
+        _write_rng(w, steps.rng)
+        w.numbers("b", [steps.options.index(v) for v in steps.pending])
+
+
+def _read_ant_streams(r: _Reader, ant) -> None:
+    _read_rng(r, ant.rng)
+    (has_steps,) = r.unpack(_FLAG)
+    if not has_steps:
+        # Drawing from ant.rng directly, as the saved ant did.
+        ant.steps = None
+        return
+    _read_rng(r, ant.steps.rng)
+    ant.steps.pending = [ant.steps.options[i] for i in r.numbers("b")]
+
+
+def _write_streams(w: _Writer, sim: "AntSim") -> None:
+    """Write every random stream, including half-used blocks of steps."""
+    streams = sim.rng
+    w.pack(_COUNT, len(streams.spawned))
+    for kind, count in streams.spawned.items():
+        w.text(kind)
+        w.pack(_COUNT, count)
+    w.pack(_COUNT, len(streams.streams))
+    for name, rng in streams.streams.items():
+        w.text(name)
+        _write_rng(w, rng)
+    for ant in sim.ants:
+        _write_ant_streams(w, ant)
+    _write_rng(w, sim.queen.rng)
+
+
+def _read_streams(r: _Reader, sim: "AntSim") -> None:
+    streams = sim.rng
+    streams.spawned = {}
+    for _ in range(r.count()):
+        kind = r.text()
+        streams.spawned[kind] = r.count()
+    streams.streams = {}
+    for _ in range(r.count()):
+        _read_rng(r, streams.stream(r.text()))
+    for ant in sim.ants:
+        _read_ant_streams(r, ant)
+    _read_rng(r, sim.queen.rng)
+
+
+# -- whole sim ------------------------------------------------------------
+
+
+def dumps(sim: "AntSim", compress: bool = True) -> bytes:
+    """Encode the state of ``sim`` as snapshot bytes."""
+    w = _Writer()
+    w.pack(
+        _SIM,
+        sim.seed,
+        sim.clock.ticks,
+        sim.map_width,
+        sim.map_height,
+        sim.expansion_level,
+        sim.grid_width,
+        sim.grid_height,
+        sim.food_collected,
+        sim.queen_fed,
+        sim.evict_timer,
+    )
+
+    w.pack(_COUNT, sim.terrain.width)
+    w.pack(_COUNT, sim.terrain.height)
+    _write_grid(w, sim.terrain.cells)
+    _write_grid(w, sim.terrain.explored)
+    w.pack(_COUNT, len(sim.pheromones))
+    for name, grid in sim.pheromones.items():
+        w.text(name)
+        _write_grid(w, grid)
+
+    _write_queen(w, sim)
+    w.pack(_COUNT, len(sim.ants))
+    for ant in sim.ants:
+        _write_ant(w, sim, ant)
+    w.pack(_COUNT, len(sim.eggs))
+    for egg in sim.eggs:
+        w.pack(_EGG, *_top_left(sim, egg.item), egg.hatch_time)
+    w.pack(_COUNT, len(sim.food_drops))
+    for drop in sim.food_drops:
+        w.pack(_FOOD, *_top_left(sim, drop.item), drop.charges)
+    w.pack(_COUNT, len(sim.predators))
+    for spider in sim.predators:
+        _write_spider(w, sim, spider)
+    dens = getattr(sim, "dens", [])
+    w.pack(_COUNT, len(dens))
+    for den in dens:
+        w.pack(_DEN, *_top_left(sim, den.item))
+
+    _write_schedule(w, sim)
+    _write_streams(w, sim)
+
+    body = bytes(w.out)
+    flags = 0
+    if compress:
+        body = zlib.compress(body)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(MAGIC, VERSION, flags) + body
+
+
+def dumps_ant(sim: "AntSim", ant) -> bytes:
+    """Encode one ant and its random streams, e.g. to hand it to another process."""
+    w = _Writer()
+    _write_ant(w, sim, ant)
+    _write_ant_streams(w, ant)
+    return bytes(w.out)
+
+
+def loads_ant(sim: "AntSim", data: bytes):
+    """Rebuild an ant encoded by :func:`dumps_ant` in ``sim``.
+
+    The ant is not added to ``sim.ants``, and no new random stream is used
+    up for it.
+    """
+    spawned = dict(sim.rng.spawned)
+    r = _Reader(data)
+    ant = _read_ant(r, sim)
+    _read_ant_streams(r, ant)
+    sim.rng.spawned = spawned
+    return ant
+
+
+def save(sim: "AntSim", path: str, compress: bool = True) -> int:
+    """Write a snapshot of ``sim`` to ``path``; return its size in bytes."""
+    data = dumps(sim, compress)
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return len(data)
+
+
+def _clear(sim: "AntSim") -> None:
+    """Delete the canvas items of the current world."""
+    canvas = sim.canvas
+    for ant in list(sim.ants):
+        ant.die()
+    items = []
+    for spider in sim.predators:
+        items += [
+            spider.item,
+            spider.life_bar_bg,
+            spider.life_bar,
+            spider.hunger_bar_bg,
+            spider.hunger_bar,
+            spider.sense_label,
+        ]
+        spider.alive = False
+    items += [den.item for den in getattr(sim, "dens", [])]
+    items += [egg.item for egg in sim.eggs]
+    for drop in sim.food_drops:
+        items += [drop.item, drop.image_item, drop.tooltip]
+    q = sim.queen
+    items += [
+        q.item,
+        q.hunger_bar_bg,
+        q.hunger_bar,
+        q.glow_item,
+        q.expression_item,
+        q.thinking_item,
+    ]
+    # Stops the old queen's glow animation from rescheduling itself.
+    q.glow_item = None
+    for item in items:
+        if item is not None:
+            canvas.delete(item)
+    for key in list(sim.terrain.rendered):
+        sim.terrain.hide_chunk(key)
+    # World files are reopened, then overwritten, by the load.  Recorders,
+    # exporters and streams stay attached and pick up the new world.
+    sim._release_world()
+
+
+def loads(sim: "AntSim", data: bytes) -> None:
+    """Replace the world of ``sim`` with the snapshot in ``data``."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("not a snapshot")
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    body = data[_HEADER.size :]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    r = _Reader(body)
+
+    (
+        seed,
+        ticks,
+        map_width,
+        map_height,
+        expansion_level,
+        grid_width,
+        grid_height,
+        food_collected,
+        queen_fed,
+        evict_timer,
+    ) = r.unpack(_SIM)
+
+    _clear(sim)
+    sim._new_world(seed)
+    terrain = sim.terrain
+    width, height = r.count(), r.count()
+    _read_grid(r, terrain.cells)
+    _read_grid(r, terrain.explored)
+    terrain.expand(width, height)
+    terrain.redraw()
+    saved = set()
+    for _ in range(r.count()):
+        name = r.text()
+        grid = sim.pheromones.get(name)
+        if grid is None:
+            grid = sim.pheromones[name] = sim._pheromone_grid(name)
+        _read_grid(r, grid)
+        saved.add(name)
+    for name, grid in sim.pheromones.items():
+        if name not in saved:
+            grid.replace({}, {}, set())
+
+    sim.queen = _read_queen(r, sim)
+    sim._index_world()
+    sim.ants = [_read_ant(r, sim) for _ in range(r.count())]
+    for _ in range(r.count()):
+        x, y, hatch_time = r.unpack(_EGG)
+        sim.eggs.append(Egg(sim, x, y, hatch_time))
+    for _ in range(r.count()):
+        x, y, charges = r.unpack(_FOOD)
+        if charges > 0:
+            sim.add_food_drop(x, y).charges = charges
+    sim.predators = [_read_spider(r, sim) for _ in range(r.count())]
+    for _ in range(r.count()):
+        Den(sim, *r.unpack(_DEN), count=0)
+
+    _read_schedule(r, sim)
+    _read_streams(r, sim)
+    sim.clock.ticks = ticks
+    sim.map_width = map_width
+    sim.map_height = map_height
+    sim.expansion_level = expansion_level
+    sim.grid_width = grid_width
+    sim.grid_height = grid_height
+    sim.food_collected = food_collected
+    sim.queen_fed = queen_fed
+    sim.evict_timer = evict_timer
+    if not sim.headless:
+        sim.canvas.configure(scrollregion=(0, 0, map_width, map_height))
+    # A tick interrupted mid-slice ends with the old world's work dropped.
+    sim._tick_work = []
+    sim._tick_cursor = 0
+    sim.update_lighting()
+
+
+def load(sim: "AntSim", path: str) -> None:
+    """Replace the world of ``sim`` with the snapshot saved at ``path``."""
+    with open(path, "rb") as fh:
+        loads(sim, fh.read())
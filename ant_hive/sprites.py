@@ -1,10 +1,17 @@
-import tkinter as tk
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from .constants import ANT_SIZE
 
+if TYPE_CHECKING:  # pragma: no cover
+    import tkinter as tk
+
 
 def _load_sprites() -> list[tk.PhotoImage | None]:
     try:
+        import tkinter as tk
+
         frames: list[tk.PhotoImage] = []
         for i in range(4):
             img = tk.PhotoImage(width=ANT_SIZE, height=ANT_SIZE)
@@ -40,10 +47,20 @@ def _load_sprites() -> list[tk.PhotoImage | None]:
         return [None, None, None, None]
 
 
-ANT_SPRITES = _load_sprites()
+# Filled in place by load_ant_sprites() once a Tk root exists.
+ANT_SPRITES: list[tk.PhotoImage | None] = [None, None, None, None]
+
+
+def load_ant_sprites() -> list[tk.PhotoImage | None]:
+    """Render the ant animation frames into :data:`ANT_SPRITES` on first use."""
+    if ANT_SPRITES[0] is None:
+        ANT_SPRITES[:] = _load_sprites()
+    return ANT_SPRITES
 
 
 def create_glowing_icon(size: int = 16, inner: str = "#ffff99", outer: str = "#ff9900") -> tk.PhotoImage:
+    import tkinter as tk
+
     img = tk.PhotoImage(width=size, height=size)
     cx = cy = size / 2
     ir, ig, ib = int(inner[1:3], 16), int(inner[3:5], 16), int(inner[5:7], 16)
@@ -0,0 +1,577 @@
+"""Streaming a running world to viewers over a local socket.
+
+A :class:`StreamServer` attached to a sim sends every connected viewer
+what changed on each tick.  That covers entities that spawned, moved,
+resized or died, terrain tiles that changed state, pheromone deposits,
+the map size and the food counters.  A :class:`StreamClient`
+rebuilds the world from those messages alone, so the machine running the
+colony never draws anything::
+
+    python -m ant_hive.stream serve --seed 7 --address /tmp/ant_hive.sock
+    python -m ant_hive.stream view /tmp/ant_hive.sock
+
+The encoding is the one :mod:`ant_hive.recording` uses, sent as
+messages instead of file blocks.  On connecting, a viewer receives::
+
+    hello    MAGIC, version (u16), seed (i64), spawn tile (2 x i32),
+             tick length in ms (u32)
+
+and then messages::
+
+    message  kind (u8), tick (i64), size (u32), body
+
+A keyframe body holds the full entity list, counters, map size, the
+terrain chunks edited so far and every warm pheromone chunk as float32
+values.  A delta body holds the varint-coded changes since the previous
+tick.  Pheromones evaporate by ``PHEROMONE_DECAY`` a tick everywhere, so
+the viewer decays its own copy and a delta only carries the tiles
+deposited on during the tick, with their new level.  The server never
+walks the pheromone grids between keyframes.  Bodies over
+``COMPRESS_OVER`` bytes are zlib-compressed and flagged in the kind byte.
+
+Every viewer gets a keyframe when it joins, and again every
+``KEYFRAME_EVERY`` ticks.  The server never blocks on a viewer.  Each one
+has its own send buffer, written without blocking at the end of every
+tick.  If a viewer falls more than ``MAX_BACKLOG`` bytes behind, its
+queued deltas are dropped.  Once it has caught up, it gets a fresh
+keyframe and resumes from there.  A slow viewer therefore skips frames
+but never sees a broken world, and it costs the sim and the other
+viewers nothing.  Nothing is encoded while no one is watching.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import stat
+import struct
+import sys
+import zlib
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING
+
+from .clock import SimClock
+from .constants import PALETTE, PHEROMONE_DECAY, WINDOW_HEIGHT, WINDOW_WIDTH
+from .recording import (
+    Cursor,
+    Tracked,
+    WorldDecoder,
+    WorldEncoder,
+    write_sint,
+    write_text,
+    write_uint,
+)
+from .terrain import TILE_SIZE
+from .world import CHUNK_CELLS, ChunkedGrid, chunk_of
+from .worldgen import TerrainGenerator
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sim import AntSim
+
+MAGIC = b"AHSTRM"
+VERSION = 2
+# Where the server listens unless told otherwise: a unix socket path, or
+# a localhost port on platforms without them.  See parse_address().
+DEFAULT_ADDRESS = "/tmp/ant_hive.sock" if hasattr(socket, "AF_UNIX") else ":7711"
+# Ticks between keyframes sent to every viewer.
+KEYFRAME_EVERY = 200
+# Unsent bytes a viewer may fall behind by before it skips to a keyframe.
+MAX_BACKLOG = 256 * 1024
+# Bodies larger than this are compressed.
+COMPRESS_OVER = 256
+
+KEYFRAME, DELTA = 1, 2
+_COMPRESSED = 0x80
+_BOUNDS, _COUNTERS = 1, 2
+
+_HELLO = struct.Struct("<6sHqiiI")
+_MESSAGE = struct.Struct("<BqI")
+_LEVEL = struct.Struct("<f")
+_SWAP = sys.byteorder != "little"
+
+
+class StreamError(ConnectionError):
+    """Raised when the other end is not a compatible stream, or the
+    address cannot be served on."""
+
+
+def parse_address(text: str):
+    """``HOST:PORT`` or ``:PORT`` for TCP, anything else is a socket path."""
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return text
+
+
+def _family(address) -> int:
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+
+def _claim(path: str) -> None:
+    """Remove a socket left at ``path`` by a server that is gone.
+
+    Anything else at ``path`` (a file, or a server still accepting) is
+    left alone and reported.
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise StreamError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise StreamError(f"a server is already listening on {path}")
+
+
+def _message(kind: int, tick: int, body: bytes) -> bytes:
+    if len(body) > COMPRESS_OVER:
+        body = zlib.compress(body)
+        kind |= _COMPRESSED
+    return _MESSAGE.pack(kind, tick, len(body)) + body
+
+
+# -- encoding -------------------------------------------------------------
+
+
+class _Encoder:
+    """The world as last sent, and the changes since.
+
+    Entities, counters and tiles go through a
+    :class:`~ant_hive.recording.WorldEncoder`; pheromone deposits are
+    added behind them.  Created when the first viewer connects.
+    """
+
+    def __init__(self, sim: "AntSim") -> None:
+        self.sim = sim
+        self.world = WorldEncoder(sim)
+        self.channels = tuple(sim.pheromones)
+        # (channel, x, y) of every tile deposited on since the last message.
+        self.deposited: set[tuple[int, int, int]] = set()
+
+    def stale(self) -> bool:
+        """Whether the world changed in a way deltas cannot carry."""
+        return self.world.stale() or tuple(self.sim.pheromones) != self.channels
+
+    def close(self) -> None:
+        self.world.close()
+
+    def deposit(self, x: int, y: int, ptype: str) -> None:
+        if ptype in self.channels:
+            self.deposited.add((self.channels.index(ptype), x, y))
+
+    def keyframe(self) -> bytes:
+        """The world in full; it becomes the baseline for deltas."""
+        out = bytearray()
+        self.world.keyframe(out)
+        write_uint(out, len(self.channels))
+        for name in self.channels:
+            write_text(out, name)
+            grid = self.sim.pheromones[name]
+            # Also maps saved trails the sim has not read yet.
+            chunks = [(key, grid.chunk(key)) for key, _, _ in list(grid.stored())]
+            write_uint(out, len(chunks))
+            for (cx, cy), chunk in chunks:
+                write_sint(out, cx)
+                write_sint(out, cy)
+                if _SWAP:
+                    chunk = array("f", chunk)
+                    chunk.byteswap()
+                out += chunk.tobytes()
+        self.deposited.clear()
+        return bytes(out)
+
+    def delta(self) -> bytes:
+        """Changes since the last call or keyframe."""
+        out = bytearray()
+        self.world.delta(out)
+        pheromones = self.sim.pheromones
+        write_uint(out, len(self.deposited))
+        for channel, x, y in self.deposited:
+            write_uint(out, channel)
+            write_uint(out, x)
+            write_uint(out, y)
+            # Read after this tick's decay, which the viewer applies first.
+            out += _LEVEL.pack(pheromones[self.channels[channel]].get(x, y))
+        self.deposited.clear()
+        return bytes(out)
+
+
+# -- serving --------------------------------------------------------------
+
+
+class _Viewer:
+    """One connected viewer and the bytes it has yet to receive."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.queue: deque[memoryview] = deque()
+        self.backlog = 0
+        # Set when deltas were dropped; the viewer waits for a keyframe.
+        self.resync = True
+        self.skipped = 0
+
+    def send(self, data: bytes) -> None:
+        self.queue.append(memoryview(data))
+        self.backlog += len(data)
+
+    def flush(self) -> None:
+        """Write as much as the socket takes without blocking."""
+        queue = self.queue
+        while queue:
+            try:
+                sent = self.sock.send(queue[0])
+            except (BlockingIOError, InterruptedError):
+                return
+            self.backlog -= sent
+            if sent == len(queue[0]):
+                queue.popleft()
+            else:
+                queue[0] = queue[0][sent:]
+                return
+
+    def skip(self) -> None:
+        """Drop every queued message not already partly sent."""
+        head = self.queue[0] if self.queue else None
+        partial = head is not None and head.obj is not None and len(head) < len(head.obj)
+        kept = deque([head]) if partial else deque()
+        self.skipped += len(self.queue) - len(kept)
+        self.queue = kept
+        self.backlog = sum(len(m) for m in kept)
+        self.resync = True
+
+
+class StreamServer:
+    """Stream the ticks of ``sim`` to viewers connecting on ``address``.
+
+    ``address`` is a unix socket path or a ``(host, port)`` pair.  The
+    server attaches itself as ``sim.streamer`` and does its work at the
+    end of each tick, on the sim's own thread.  Call :meth:`close` to
+    disconnect everyone.
+    """
+
+    def __init__(
+        self,
+        sim: "AntSim",
+        address=parse_address(DEFAULT_ADDRESS),
+        keyframe_every: int = KEYFRAME_EVERY,
+        max_backlog: int = MAX_BACKLOG,
+    ) -> None:
+        self.sim = sim
+        self.keyframe_every = keyframe_every
+        self.max_backlog = max_backlog
+        self.viewers: list[_Viewer] = []
+        self._encoder: _Encoder | None = None
+        self._since_keyframe = 0
+        if isinstance(address, str):
+            _claim(address)
+        self.listener = socket.socket(_family(address), socket.SOCK_STREAM)
+        if not isinstance(address, str):
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        spawn = sim.worldgen.spawn
+        self._hello = _HELLO.pack(MAGIC, VERSION, sim.seed, spawn[0], spawn[1], sim.clock.tick_ms)
+        sim.streamer = self
+
+    def deposit(self, x, y, amount, ptype, prev=None) -> None:
+        """Note a pheromone deposit for the next delta."""
+        if self._encoder is None:
+            return
+        gx = int(x) // TILE_SIZE
+        gy = int(y) // TILE_SIZE
+        if 0 <= gx < self.sim.grid_width and 0 <= gy < self.sim.grid_height:
+            self._encoder.deposit(gx, gy, ptype)
+
+    def end_tick(self) -> None:
+        """Send the tick that just finished to every viewer."""
+        self._accept()
+        if not self.viewers:
+            return
+        tick = self.sim.clock.ticks
+        encoder = self._encoder
+        if encoder is not None and encoder.stale():
+            encoder.close()
+            encoder = self._encoder = None
+        keyframe = None
+        if encoder is None:
+            encoder = self._encoder = _Encoder(self.sim)
+            for viewer in self.viewers:
+                viewer.resync = True
+        else:
+            delta = _message(DELTA, tick, encoder.delta())
+            for viewer in self.viewers:
+                if not viewer.resync:
+                    viewer.send(delta)
+        self._since_keyframe += 1
+        if self._since_keyframe >= self.keyframe_every:
+            self._since_keyframe = 0
+            for viewer in self.viewers:
+                viewer.resync = True
+        for viewer in self.viewers:
+            if viewer.backlog > self.max_backlog:
+                viewer.skip()
+            if viewer.resync and viewer.backlog <= self.max_backlog // 2:
+                if keyframe is None:
+                    keyframe = _message(KEYFRAME, tick, encoder.keyframe())
+                viewer.send(keyframe)
+                viewer.resync = False
+        for viewer in list(self.viewers):
+            try:
+                viewer.flush()
+            except OSError:
+                self._drop(viewer)
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            viewer = _Viewer(sock)
+            viewer.send(self._hello)
+            self.viewers.append(viewer)
+
+    def _drop(self, viewer: _Viewer) -> None:
+        self.viewers.remove(viewer)
+        viewer.sock.close()
+        if not self.viewers and self._encoder is not None:
+            # Nobody is watching: stop encoding until someone is.
+            self._encoder.close()
+            self._encoder = None
+
+    def close(self) -> None:
+        for viewer in list(self.viewers):
+            self._drop(viewer)
+        self.listener.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        if getattr(self.sim, "streamer", None) is self:
+            self.sim.streamer = None
+
+
+# -- viewing --------------------------------------------------------------
+
+
+class StreamClient(WorldDecoder):
+    """Rebuild a streamed world on ``canvas`` as messages arrive.
+
+    Call :meth:`poll` to take in what has arrived; the world appears with
+    the first keyframe, after the server's next tick.  It is drawn as a
+    :class:`~ant_hive.recording.Player` draws a recording.  Without a
+    canvas nothing is drawn, but ``entities``, ``terrain``,
+    ``pheromones`` and the counters still follow the server.
+    """
+
+    def __init__(
+        self, address=parse_address(DEFAULT_ADDRESS), canvas=None, timeout: float = 5.0
+    ) -> None:
+        super().__init__(canvas)
+        self.address = address
+        self.sock = socket.socket(_family(address), socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self.sock.setblocking(False)
+        self._buffer = bytearray()
+        # Known once the hello has arrived.
+        self.seed: int | None = None
+        self.clock = SimClock()
+        self.pheromones: dict[str, ChunkedGrid] = {}
+        self.tick = -1
+        self.keyframes = 0
+        self.deltas = 0
+        self.closed = False
+        self._channels: list[str] = []
+        # Entities to redraw once the messages at hand are applied.
+        self._moved: set[Tracked] = set()
+
+    def _read_hello(self) -> bool:
+        buffer = self._buffer
+        if len(buffer) < _HELLO.size:
+            return False
+        magic, version, seed, sx, sy, tick_ms = _HELLO.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise StreamError(f"{self.address} is not an ant hive stream")
+        del buffer[: _HELLO.size]
+        self.seed = seed
+        self.clock = SimClock(tick_ms)
+        self.worldgen = TerrainGenerator(seed, spawn=(sx, sy))
+        return True
+
+    def poll(self) -> int:
+        """Apply every complete message received so far; return how many.
+
+        Entities are redrawn once at the end, however many ticks arrived.
+        """
+        while not self.closed:
+            try:
+                data = self.sock.recv(1 << 20)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                self.closed = True
+                break
+            self._buffer += data
+        if self.worldgen is None and not self._read_hello():
+            return 0
+        applied = 0
+        buffer = self._buffer
+        pos = 0
+        while len(buffer) - pos >= _MESSAGE.size:
+            kind, tick, size = _MESSAGE.unpack_from(buffer, pos)
+            end = pos + _MESSAGE.size + size
+            if len(buffer) < end:
+                break
+            body = bytes(buffer[pos + _MESSAGE.size : end])
+            pos = end
+            if kind & _COMPRESSED:
+                body = zlib.decompress(body)
+            if kind & ~_COMPRESSED == KEYFRAME:
+                self._read_keyframe(Cursor(body))
+                self.keyframes += 1
+            elif self.terrain is not None:
+                self._read_delta(Cursor(body))
+                self.deltas += 1
+            self.tick = tick
+            self.clock.ticks = tick
+            applied += 1
+        del buffer[:pos]
+        for tracked in self._moved:
+            self.canvas.coords(tracked.item, *tracked.coords())
+        self._moved.clear()
+        return applied
+
+    def close(self) -> None:
+        self.sock.close()
+        self.closed = True
+
+    def heat(self, ptype: str, x: int, y: int) -> float:
+        """Pheromone level of one tile, as the server last had it."""
+        grid = self.pheromones.get(ptype)
+        return grid.get(x, y) if grid is not None else 0.0
+
+    # -- decoding ---------------------------------------------------------
+
+    def _read_keyframe(self, cursor: Cursor) -> None:
+        width, height, food, fed, entities, chunks = self._read_world(cursor)
+        self.food_collected, self.queen_fed = food, fed
+        self._channels = []
+        self.pheromones = {}
+        for _ in range(cursor.uint()):
+            name = cursor.text()
+            self._channels.append(name)
+            grid = self.pheromones[name] = ChunkedGrid("f", 0.0)
+            for _ in range(cursor.uint()):
+                key = (cursor.sint(), cursor.sint())
+                chunk = array("f", cursor.raw(CHUNK_CELLS * 4))
+                if _SWAP:
+                    chunk.byteswap()
+                grid.put(key, chunk)
+        self._set_terrain(width, height, chunks)
+        self._set_entities(entities)
+
+    def _read_delta(self, cursor: Cursor) -> None:
+        self._read_changes(cursor)
+        # Evaporate as the sim did, then take this tick's deposits.
+        for grid in self.pheromones.values():
+            grid.decay(PHEROMONE_DECAY)
+        channels = self._channels
+        for _ in range(cursor.uint()):
+            grid = self.pheromones[channels[cursor.uint()]]
+            x, y = cursor.uint(), cursor.uint()
+            (level,) = _LEVEL.unpack(cursor.raw(_LEVEL.size))
+            if level > 0 or grid.chunk(chunk_of(x, y)) is not None:
+                grid.set(x, y, level)
+
+    def _place(self, tracked: Tracked) -> None:
+        self._moved.add(tracked)
+
+    def _remove(self, rid: int) -> None:
+        tracked = self.entities.get(rid)
+        self._moved.discard(tracked)
+        super()._remove(rid)
+
+
+# -- command line ---------------------------------------------------------
+
+
+def _serve(args) -> None:
+    import time
+
+    from .sim import AntSim
+
+    sim = AntSim(headless=True, seed=args.seed)
+    server = sim.stream(parse_address(args.address))
+    print(f"streaming seed {sim.seed} on {server.address}", flush=True)
+    interval = 1 / args.rate if args.rate else 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            sim.step()
+            wait = interval - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.close()
+
+
+def _view(args) -> None:
+    import tkinter as tk
+
+    root = tk.Tk()
+    canvas = tk.Canvas(root, width=WINDOW_WIDTH, height=WINDOW_HEIGHT, bg=PALETTE["background"])
+    canvas.pack()
+    client = StreamClient(parse_address(args.address), canvas)
+
+    def frame() -> None:
+        if client.poll() and client.terrain is not None:
+            terrain = client.terrain
+            canvas.configure(
+                scrollregion=(0, 0, terrain.width * TILE_SIZE, terrain.height * TILE_SIZE)
+            )
+            root.title(
+                f"Ant Hive Stream - day {client.clock.day}, tick {client.tick}, "
+                f"food {client.food_collected}"
+            )
+        if not client.closed:
+            root.after(33, frame)
+
+    frame()
+    root.mainloop()
+    client.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m ant_hive.stream",
+        description="Stream a headless colony to viewers, or view a stream.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run a headless colony and stream it")
+    serve.add_argument("--seed", type=int, default=None)
+    serve.add_argument("--address", default=DEFAULT_ADDRESS)
+    serve.add_argument("--rate", type=float, default=10.0, help="ticks per second; 0 for flat out")
+    view = commands.add_parser("view", help="draw a stream in a window")
+    view.add_argument("address", nargs="?", default=DEFAULT_ADDRESS)
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        _serve(args)
+    else:
+        _view(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Monte Carlo parameter sweeps over headless runs.
+
+Every combination of the parameter grid is run once per seed, in parallel
+across a :class:`~concurrent.futures.ProcessPoolExecutor`.  Each run is a
+headless :class:`~ant_hive.sim.AntSim` with the parameters patched into the
+modules that read them.  It returns summary metrics only.  Results
+are written to a columnar file after every finished run, so an interrupted
+sweep resumes where it stopped::
+
+    python -m ant_hive.sweep --param pheromone_decay=0.005,0.01,0.02 \\
+        --param spider_growth=1.1,1.2 --seeds 8 --days 3 --out sweep.cols
+
+The file holds one column per parameter and metric.  Curves sampled during
+a run, such as ``population``, are list columns.  :func:`read_columns`
+loads it back as a dict of lists.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator
+
+MAGIC = b"AHCOLS"
+VERSION = 1
+# Ticks between samples of the population and hunger curves.
+SAMPLE_TICKS = 60
+
+_HEADER = struct.Struct("<6sHI")
+_COLUMN = struct.Struct("<Hc")
+_COUNT = struct.Struct("<I")
+_SWAP = sys.byteorder != "little"
+# Column kinds: float, integer, text, list of floats.
+_FLOAT, _INT, _TEXT, _LIST = b"d", b"q", b"s", b"L"
+
+
+def _tunables() -> dict[str, tuple[object, str]]:
+    """Parameter name -> (module or dict, attribute or key) holding it."""
+    from . import sim
+    from .entities import base_ant, egg, spider
+
+    tunables: dict[str, tuple[object, str]] = {
+        "pheromone_decay": (sim, "PHEROMONE_DECAY"),
+        "move_energy_cost": (base_ant, "MOVE_ENERGY_COST"),
+        "spider_growth": (spider, "GROWTH_RATE"),
+    }
+    for role in egg.HATCH_WEIGHTS:
+        tunables[f"hatch_{role}"] = (egg.HATCH_WEIGHTS, role)
+    return tunables
+
+
+def _swap(target: object, name: str, value):
+    """Set ``name`` on ``target`` and return the value it replaced."""
+    if isinstance(target, dict):
+        old, target[name] = target[name], value
+    else:
+        old = getattr(target, name)
+        setattr(target, name, value)
+    return old
+
+
+def run_key(params: dict[str, float], seed: int) -> str:
+    """Stable name of one run, used to skip it when a sweep resumes."""
+    parts = [f"{name}={params[name]!r}" for name in sorted(params)]
+    return ",".join(parts + [f"seed={seed}"])
+
+
+def runs(grid: dict[str, list[float]], seeds: Iterable[int]) -> Iterator[tuple[dict, int]]:
+    """Yield ``(params, seed)`` for every grid point and seed."""
+    names = sorted(grid)
+    seeds = list(seeds)
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        for seed in seeds:
+            yield params, seed
+
+
+def run_one(params: dict[str, float], seed: int, days: float) -> dict:
+    """Run one headless colony for ``days`` and summarise it.
+
+    Module values are restored afterwards, as pool workers are reused.
+    """
+    from .sim import AntSim
+
+    tunables = _tunables()
+    unknown = set(params) - set(tunables)
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    saved = {name: _swap(*tunables[name], value) for name, value in params.items()}
+    try:
+        sim = AntSim(headless=True, seed=seed)
+        ticks = round(days * sim.clock.ticks_per_day)
+        population = [float(len(sim.ants))]
+        hunger = [float(sim.queen.hunger)]
+        done = 0
+        while done < ticks:
+            step = min(SAMPLE_TICKS, ticks - done)
+            sim.run_ticks(step)
+            done += step
+            population.append(float(len(sim.ants)))
+            hunger.append(float(sim.queen.hunger))
+        sim.close()
+    finally:
+        for name, value in saved.items():
+            _swap(*tunables[name], value)
+    return {
+        "key": run_key(params, seed),
+        **{name: float(value) for name, value in params.items()},
+        "seed": seed,
+        "ticks": ticks,
+        "food_collected": sim.food_collected,
+        "queen_fed": sim.queen_fed,
+        "ants": len(sim.ants),
+        "peak_ants": int(max(population)),
+        "ant_deaths": sim.rng.spawned.get("ant", 0) - len(sim.ants),
+        "spiders": len(sim.predators),
+        "queen_hunger": float(sim.queen.hunger),
+        "mean_queen_hunger": sum(hunger) / len(hunger),
+        "population": population,
+        "queen_hunger_curve": hunger,
+    }
+
+
+# -- columnar files -------------------------------------------------------
+
+
+def _le(values: array) -> bytes:
+    if _SWAP:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _native(values: array) -> array:
+    if _SWAP:
+        values.byteswap()
+    return values
+
+
+def _kind(values: list) -> bytes:
+    sample = next((v for v in values if v is not None), 0.0)
+    if isinstance(sample, str):
+        return _TEXT
+    if isinstance(sample, (list, tuple)):
+        return _LIST
+    if isinstance(sample, int) and not isinstance(sample, bool):
+        return _INT
+    return _FLOAT
+
+
+def write_columns(path: str, columns: dict[str, list]) -> None:
+    """Write equal-length ``columns`` to ``path``, replacing it atomically."""
+    rows = len(next(iter(columns.values()), []))
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, rows))
+    out += _COUNT.pack(len(columns))
+
+    def blob(data: bytes) -> None:
+        out.extend(_COUNT.pack(len(data)))
+        out.extend(data)
+
+    for name, values in columns.items():
+        if len(values) != rows:
+            raise ValueError(f"column {name!r} has {len(values)} rows, not {rows}")
+        kind = _kind(values)
+        encoded = name.encode()
+        out += _COLUMN.pack(len(encoded), kind) + encoded
+        if kind == _TEXT:
+            data = [(v or "").encode() for v in values]
+            blob(_le(array("q", itertools.accumulate((len(d) for d in data), initial=0))))
+            blob(b"".join(data))
+        elif kind == _LIST:
+            lists = [v or () for v in values]
+            blob(_le(array("q", itertools.accumulate((len(v) for v in lists), initial=0))))
+            blob(_le(array("d", itertools.chain.from_iterable(lists))))
+        elif kind == _INT:
+            blob(_le(array("q", (0 if v is None else v for v in values))))
+        else:
+            blob(_le(array("d", (math.nan if v is None else v for v in values))))
+    with open(path + ".tmp", "wb") as fh:
+        fh.write(out)
+    os.replace(path + ".tmp", path)
+
+
+def read_columns(path: str) -> dict[str, list]:
+    """Load a file written by :func:`write_columns`."""
+    with open(path, "rb") as fh:
+        data = memoryview(fh.read())
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is not a column file")
+    magic, version, rows = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a column file")
+    pos = _HEADER.size
+    (count,) = _COUNT.unpack_from(data, pos)
+    pos += _COUNT.size
+
+    def blob() -> bytes:
+        nonlocal pos
+        (size,) = _COUNT.unpack_from(data, pos)
+        pos += _COUNT.size + size
+        return bytes(data[pos - size : pos])
+
+    columns: dict[str, list] = {}
+    for _ in range(count):
+        size, kind = _COLUMN.unpack_from(data, pos)
+        pos += _COLUMN.size
+        name = bytes(data[pos : pos + size]).decode()
+        pos += size
+        if kind in (_TEXT, _LIST):
+            offsets = _native(array("q", blob()))
+            body = blob()
+            if kind == _LIST:
+                body = _native(array("d", body))
+            column = [body[offsets[i] : offsets[i + 1]] for i in range(rows)]
+            columns[name] = (
+                [bytes(v).decode() for v in column]
+                if kind == _TEXT
+                else [list(v) for v in column]
+            )
+        else:
+            columns[name] = list(_native(array(kind.decode(), blob())))
+    return columns
+
+
+def _append(columns: dict[str, list], row: dict) -> None:
+    rows = len(next(iter(columns.values()), []))
+    for name in row:
+        if name not in columns:
+            columns[name] = [None] * rows
+    for name, values in columns.items():
+        values.append(row.get(name))
+
+
+# -- sweeps ---------------------------------------------------------------
+
+
+def sweep(
+    grid: dict[str, list[float]],
+    seeds: Iterable[int],
+    days: float,
+    path: str,
+    workers: int | None = None,
+) -> int:
+    """Run every grid point and seed not already in ``path``.
+
+    Uses ``workers`` processes, one per CPU by default.  Returns the number
+    of runs made.
+    """
+    unknown = set(grid) - set(_tunables())
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    columns = read_columns(path) if os.path.exists(path) else {}
+    done = set(columns.get("key", ()))
+    pending = [(params, seed) for params, seed in runs(grid, seeds) if run_key(params, seed) not in done]
+    if not pending:
+        return 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_one, params, seed, days) for params, seed in pending]
+        for future in as_completed(futures):
+            _append(columns, future.result())
+            write_columns(path, columns)
+    return len(pending)
+
+
+def _parse_param(text: str) -> tuple[str, list[float]]:
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... not {text!r}")
+    return name.strip(), [float(v) for v in values.split(",")]
+
+
+def _parse_seeds(text: str) -> list[int]:
+    if "," in text:
+        return [int(v) for v in text.split(",")]
+    return list(range(int(text)))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m ant_hive.sweep",
+        description="Run headless colonies over a parameter grid in parallel.",
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        type=_parse_param,
+        default=[],
+        metavar="NAME=V1,V2",
+        help="values to sweep; one of " + ", ".join(sorted(_tunables())),
+    )
+    parser.add_argument(
+        "--seeds", type=_parse_seeds, default=[0], help="a count, or a list like 3,7,9"
+    )
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="sweep.cols")
+    args = parser.parse_args(argv)
+    made = sweep(dict(args.param), args.seeds, args.days, args.out, args.workers)
+    print(f"{made} runs written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
-import tkinter as tk
+from __future__ import annotations
 
-from .utils import blend_color
+import os
+from array import array
+from typing import TYPE_CHECKING, Callable
+
+from .atlas import EDGE_SIDES, depth_level, load_atlas
+from .mapped import MappedGrid
+from .utils import is_tk_canvas
+from .world import CHUNK_SHIFT, CHUNK_SIZE, ChunkedGrid, chunks_in
+
+if TYPE_CHECKING:  # pragma: no cover
+    import tkinter as tk
 
 TILE_SIZE = 20
 TILE_SAND = "sand"
@@ -8,6 +18,10 @@ TILE_TUNNEL = "tunnel"
 TILE_ROCK = "rock"
 TILE_COLLAPSED = "collapsed"
 
+# Tile states are stored as one byte per tile; the code is the index here.
+TILE_STATES = (TILE_SAND, TILE_TUNNEL, TILE_ROCK, TILE_COLLAPSED)
+TILE_CODES = {state: code for code, state in enumerate(TILE_STATES)}
+
 SAND_TEXTURE = (
     "iVBORw0KGgoAAAANSUhEUgAAABQAAAAUCAYAAACNiR0NAAAARklEQVR4nO3QMRHAMBADwctjEPRg",
     "MgSjEAenyJiArfLVqdninjneZZs9Sdz8SmKSqCRm+wdTGEAlMeiGCbwbdsOD3w3v8Q8txS8qFa7u",
@@ -24,8 +38,40 @@ ROCK_TEXTURE = (
     "AElFTkSuQmCC",
 )
 
+class _TileView:
+    """Read-only ``view[x][y]`` access kept for code written against lists."""
+
+    def __init__(self, lookup: Callable[[int, int], object]) -> None:
+        self._lookup = lookup
+
+    def __getitem__(self, x: int) -> "_TileColumn":
+        return _TileColumn(self._lookup, x)
+
+
+class _TileColumn:
+    def __init__(self, lookup: Callable[[int, int], object], x: int) -> None:
+        self._lookup = lookup
+        self._x = x
+
+    def __getitem__(self, y: int) -> object:
+        return self._lookup(self._x, y)
+
+
 class Terrain:
-    """Simple 2D grid representing the underground."""
+    """2D grid representing the underground, stored and drawn in chunks.
+
+    Tile states live in a :class:`~ant_hive.world.ChunkedGrid`.  A chunk is
+    generated the first time it is read, by ``generator(x, y)`` if one is
+    given.  A generator with a ``generate_chunk(key)`` method, such as
+    :class:`~ant_hive.worldgen.TerrainGenerator`, fills whole chunk buffers
+    itself instead of being called per tile.  On a Tk canvas, textured
+    tiles are drawn from the shared :mod:`~ant_hive.atlas`, with depth,
+    edge shading and fog already baked in.  Canvas items are only created for chunks passed to
+    :meth:`show_region`.  Growing the map with :meth:`expand` only moves the
+    bounds.  Given a ``path``, both grids are
+    :class:`~ant_hive.mapped.MappedGrid` files in that directory; call
+    :meth:`flush` to checkpoint them.
+    """
 
     colors = {
         TILE_SAND: "#c2b280",
@@ -40,7 +86,14 @@ class Terrain:
         TILE_ROCK: ROCK_TEXTURE,
     }
 
-    def __init__(self, width: int, height: int, canvas: tk.Canvas) -> None:
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        canvas: tk.Canvas,
+        generator: Callable[[int, int], str] | None = None,
+        path: str | None = None,
+    ) -> None:
         self.width = width
         self.height = height
         self.canvas = canvas
@@ -54,73 +107,226 @@ class Terrain:
             }
         else:
             self.zones = {}
-        self.images: dict[str, tk.PhotoImage | None] = {}
-        for key, data in self.texture_data.items():
+        self._tk = is_tk_canvas(canvas)
+        self.atlas = load_atlas(self.texture_data, self.colors)
+        # Tk images of the atlas variants in use, and the tiles drawn with
+        # one; those carry their shading and fog in the image itself.
+        self._photos: dict[tuple, tk.PhotoImage | None] = {}
+        self._imaged: set[tuple[int, int]] = set()
+        self._initial_size = (width, height)
+        self.generator = generator or self._initial_layout
+        fill = getattr(self.generator, "generate_chunk", self._generate_chunk)
+        if path is None:
+            self.cells = ChunkedGrid("B", TILE_CODES[TILE_SAND], fill)
+            self.explored = ChunkedGrid("B", 1)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.cells = MappedGrid(os.path.join(path, "cells.grid"), "B", TILE_CODES[TILE_SAND], fill)
+            self.explored = MappedGrid(os.path.join(path, "explored.grid"), "B", 1)
+        self._rects: dict[tuple[int, int], int] = {}
+        self._shades: dict[tuple[int, int], int] = {}
+        self._fog: dict[tuple[int, int], int] = {}
+        self.rendered: set[tuple[int, int]] = set()
+        self.listeners: list[Callable[[int, int, str, str], None]] = []
+        self.show_region(0, 0, width, height)
+
+    @property
+    def grid(self) -> _TileView:
+        return _TileView(self.get_cell)
+
+    @property
+    def rects(self) -> _TileView:
+        return _TileView(lambda x, y: self._rects.get((x, y), 0))
+
+    # -- generation --------------------------------------------------------
+
+    def _initial_layout(self, x: int, y: int) -> str:
+        """Rock walls around the map the terrain was created with."""
+        w, h = self._initial_size
+        if w >= 10 and h >= 10 and x < w and y < h:
+            if x < 5 or x > w - 5 or y > h - 5:
+                return TILE_ROCK
+        return TILE_SAND
+
+    def _generate_chunk(self, key: tuple[int, int]) -> array | None:
+        generator = self.generator
+        sand = TILE_CODES[TILE_SAND]
+        x0, y0 = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+        chunk = None
+        for dx in range(CHUNK_SIZE):
+            for dy in range(CHUNK_SIZE):
+                code = TILE_CODES[generator(x0 + dx, y0 + dy)]
+                if code != sand:
+                    if chunk is None:
+                        chunk = self.cells.new_chunk()
+                    chunk[(dx << CHUNK_SHIFT) | dy] = code
+        return chunk
+
+    # -- rendering ---------------------------------------------------------
+
+    def _depth_color(self, state: str, y: int) -> str:
+        """Return the fill of ``state`` shaded for row ``y``."""
+        return self.atlas.color(state, depth_level(y, self.height))
+
+    def _edge_mask(self, x: int, y: int) -> int:
+        mask = 0
+        for dx, dy, bit in EDGE_SIDES:
+            if self.get_cell(x + dx, y + dy) != TILE_TUNNEL:
+                mask |= bit
+        return mask
+
+    def _photo(self, x: int, y: int, state: str):
+        """Tk image of the atlas variant for a tile, or ``None``."""
+        if not self._tk or state not in self.atlas.states:
+            return None
+        variant = (
+            state,
+            depth_level(y, self.height),
+            self._edge_mask(x, y) if state == TILE_TUNNEL else 0,
+            not self.explored.get(x, y),
+        )
+        if variant not in self._photos:
+            import tkinter as tk
+
             try:
-                self.images[key] = tk.PhotoImage(data=data)
+                self._photos[variant] = tk.PhotoImage(
+                    data=self.atlas.ppm(variant), format="PPM"
+                )
             except Exception:
-                self.images[key] = None
-        self.grid: list[list[str]] = [
-            [TILE_SAND for _ in range(height)] for _ in range(width)
-        ]
-        if width >= 10 and height >= 10:
-            for x in range(width):
-                for y in range(height):
-                    if x < 5 or x > width - 5 or y > height - 5:
-                        self.grid[x][y] = TILE_ROCK
-        self.rects: list[list[int]] = [[0] * height for _ in range(width)]
-        self.shades: list[list[int]] = [[0] * height for _ in range(width)]
-        self.explored: list[list[bool]] = [
-            [True for _ in range(height)] for _ in range(width)
-        ]
-        self.fog: list[list[int]] = [[0] * height for _ in range(width)]
-        self._render()
-
-    def _depth_color(self, color: str, y: int) -> str:
-        """Return a darker shade of ``color`` based on vertical index ``y``."""
-        if self.height <= 1:
-            return color
-        alpha = (y / (self.height - 1)) * 0.5
-        return blend_color(self.canvas, "black", color, alpha)
-
-    def _render(self) -> None:
-        for x in range(self.width):
-            for y in range(self.height):
-                state = self.grid[x][y]
-                if hasattr(self.canvas, "create_image") and self.images.get(state):
-                    rect = self.canvas.create_image(
-                        x * TILE_SIZE,
-                        y * TILE_SIZE,
-                        anchor="nw",
-                        image=self.images[state],
-                    )
-                else:
-                    color = self.colors[state]
-                    if state in (TILE_SAND, TILE_TUNNEL):
-                        color = self._depth_color(color, y)
-                    rect = self.canvas.create_rectangle(
-                        x * TILE_SIZE,
-                        y * TILE_SIZE,
-                        (x + 1) * TILE_SIZE,
-                        (y + 1) * TILE_SIZE,
-                        fill=color,
-                    )
-                self.rects[x][y] = rect
+                self._photos[variant] = None
+        return self._photos[variant]
+
+    def _create_tile_item(self, x: int, y: int, state: str) -> int:
+        extra = {"tags": "terrain"} if self._tk else {}
+        photo = self._photo(x, y, state)
+        if photo is not None:
+            self._imaged.add((x, y))
+            return self.canvas.create_image(
+                x * TILE_SIZE,
+                y * TILE_SIZE,
+                anchor="nw",
+                image=photo,
+                **extra,
+            )
+        self._imaged.discard((x, y))
+        color = self.colors[state]
+        if state in (TILE_SAND, TILE_TUNNEL):
+            color = self._depth_color(state, y)
+        return self.canvas.create_rectangle(
+            x * TILE_SIZE,
+            y * TILE_SIZE,
+            (x + 1) * TILE_SIZE,
+            (y + 1) * TILE_SIZE,
+            fill=color,
+            **extra,
+        )
+
+    def show_region(self, x0: int, y0: int, x1: int, y1: int) -> int:
+        """Draw every chunk overlapping the tile rectangle; return how many
+        were newly drawn."""
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        # Generate the whole stretch in one pass rather than chunk by chunk.
+        fill = getattr(self.generator, "fill", None)
+        if fill is not None:
+            fill(self.cells, x0, y0, x1, y1)
+        drawn = 0
+        for key in chunks_in(x0, y0, x1, y1):
+            if key not in self.rendered:
+                self._render_chunk(key)
+                drawn += 1
+        if drawn and self._tk:
+            self.canvas.tag_lower("terrain")
+        return drawn
+
+    def _chunk_tiles(self, key: tuple[int, int]):
+        x0, y0 = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+        for x in range(x0, min(x0 + CHUNK_SIZE, self.width)):
+            for y in range(y0, min(y0 + CHUNK_SIZE, self.height)):
+                yield x, y
+
+    def _render_chunk(self, key: tuple[int, int]) -> None:
+        self.rendered.add(key)
+        for x, y in self._chunk_tiles(key):
+            if (x, y) in self._rects:
+                continue
+            self._rects[(x, y)] = self._create_tile_item(x, y, self.get_cell(x, y))
+            if (x, y) not in self._imaged:
                 self._update_shading(x, y)
                 self._update_fog(x, y)
 
+    def hide_chunk(self, key: tuple[int, int]) -> None:
+        """Delete the canvas items of a drawn chunk."""
+        if key not in self.rendered:
+            return
+        self.rendered.discard(key)
+        x0, y0 = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+        for x in range(x0, x0 + CHUNK_SIZE):
+            for y in range(y0, y0 + CHUNK_SIZE):
+                self._imaged.discard((x, y))
+                for items in (self._rects, self._shades, self._fog):
+                    item = items.pop((x, y), 0)
+                    if item and hasattr(self.canvas, "delete"):
+                        self.canvas.delete(item)
+
+    def redraw(self) -> None:
+        """Redraw every drawn chunk, e.g. after the tile grids were replaced."""
+        keys = list(self.rendered)
+        for key in keys:
+            self.hide_chunk(key)
+        for key in keys:
+            self._render_chunk(key)
+        if keys and self._tk:
+            self.canvas.tag_lower("terrain")
+
+    def flush(self) -> None:
+        self.cells.flush()
+        self.explored.flush()
+
+    def close(self) -> None:
+        self.cells.close()
+        self.explored.close()
+
+    def evict_cold(self, keep: set[tuple[int, int]] = frozenset()) -> int:
+        """Hide and compress chunks nobody touched since the last call.
+
+        Chunks in ``keep`` (typically those on screen) stay live.  Returns
+        the number of chunks frozen.
+        """
+        touched = self.cells.touched
+        cold = [
+            key
+            for key in set(self.cells.chunks) | self.rendered
+            if key not in touched and key not in keep
+        ]
+        for key in cold:
+            self.hide_chunk(key)
+        frozen = self.cells.freeze(cold)
+        self.cells.end_sweep()
+        return frozen
+
+    def _is_rendered(self, x: int, y: int) -> bool:
+        return (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT) in self.rendered
+
+    def _restyle(self, x: int, y: int) -> None:
+        """Swap an atlas-drawn tile to the variant matching its surroundings."""
+        photo = self._photo(x, y, self.get_cell(x, y))
+        if photo is not None:
+            self.canvas.itemconfigure(self._rects[(x, y)], image=photo)
+
     def _update_shading(self, x: int, y: int) -> None:
-        if self.shades[x][y]:
-            if hasattr(self.canvas, "delete"):
-                self.canvas.delete(self.shades[x][y])
-            self.shades[x][y] = 0
-        state = self.grid[x][y]
-        if state != TILE_TUNNEL:
+        if (x, y) in self._imaged:
+            self._restyle(x, y)
+            return
+        item = self._shades.pop((x, y), 0)
+        if item and hasattr(self.canvas, "delete"):
+            self.canvas.delete(item)
+        if self.get_cell(x, y) != TILE_TUNNEL:
             return
         for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             nx, ny = x + dx, y + dy
             if self.get_cell(nx, ny) != TILE_TUNNEL:
-                self.shades[x][y] = self.canvas.create_rectangle(
+                self._shades[(x, y)] = self.canvas.create_rectangle(
                     x * TILE_SIZE,
                     y * TILE_SIZE,
                     (x + 1) * TILE_SIZE,
@@ -132,12 +338,14 @@ class Terrain:
                 break
 
     def _update_fog(self, x: int, y: int) -> None:
-        if self.fog[x][y]:
-            if hasattr(self.canvas, "delete"):
-                self.canvas.delete(self.fog[x][y])
-            self.fog[x][y] = 0
-        if not self.explored[x][y]:
-            self.fog[x][y] = self.canvas.create_rectangle(
+        if (x, y) in self._imaged:
+            self._restyle(x, y)
+            return
+        item = self._fog.pop((x, y), 0)
+        if item and hasattr(self.canvas, "delete"):
+            self.canvas.delete(item)
+        if not self.explored.get(x, y):
+            self._fog[(x, y)] = self.canvas.create_rectangle(
                 x * TILE_SIZE,
                 y * TILE_SIZE,
                 (x + 1) * TILE_SIZE,
@@ -149,12 +357,10 @@ class Terrain:
 
     def set_explored(self, x: int, y: int) -> None:
         if 0 <= x < self.width and 0 <= y < self.height:
-            if not self.explored[x][y]:
-                self.explored[x][y] = True
-                if self.fog[x][y]:
-                    if hasattr(self.canvas, "delete"):
-                        self.canvas.delete(self.fog[x][y])
-                    self.fog[x][y] = 0
+            if not self.explored.get(x, y):
+                self.explored.set(x, y, 1)
+                if self._is_rendered(x, y):
+                    self._update_fog(x, y)
 
     def initialize_explored(self, cx: int, cy: int, radius: int = 3) -> None:
         for dx in range(-radius, radius + 1):
@@ -162,99 +368,43 @@ class Terrain:
                 self.set_explored(cx + dx, cy + dy)
 
     def expand(self, new_width: int, new_height: int) -> None:
+        """Grow the map bounds.  New tiles are generated and drawn lazily."""
         if new_width <= self.width and new_height <= self.height:
             return
-        for x in range(self.width, new_width):
-            self.grid.append([TILE_SAND for _ in range(self.height)])
-            self.rects.append([0] * self.height)
-            self.shades.append([0] * self.height)
-            self.explored.append([True] * self.height)
-            self.fog.append([0] * self.height)
-        for x in range(new_width):
-            self.grid[x].extend([TILE_SAND] * (new_height - len(self.grid[x])))
-            self.rects[x].extend([0] * (new_height - len(self.rects[x])))
-            self.shades[x].extend([0] * (new_height - len(self.shades[x])))
-            self.explored[x].extend([True] * (new_height - len(self.explored[x])))
-            self.fog[x].extend([0] * (new_height - len(self.fog[x])))
-        old_width, old_height = self.width, self.height
-        self.width, self.height = new_width, new_height
-        for x in range(old_width, new_width):
-            for y in range(new_height):
-                state = self.grid[x][y]
-                if hasattr(self.canvas, "create_image") and self.images.get(state):
-                    rect = self.canvas.create_image(
-                        x * TILE_SIZE,
-                        y * TILE_SIZE,
-                        anchor="nw",
-                        image=self.images[state],
-                    )
-                else:
-                    rect = self.canvas.create_rectangle(
-                        x * TILE_SIZE,
-                        y * TILE_SIZE,
-                        (x + 1) * TILE_SIZE,
-                        (y + 1) * TILE_SIZE,
-                        fill=self.colors[state],
-                    )
-                self.rects[x][y] = rect
-                self._update_shading(x, y)
-                self._update_fog(x, y)
-        for x in range(0, old_width):
-            for y in range(old_height, new_height):
-                state = self.grid[x][y]
-                if hasattr(self.canvas, "create_image") and self.images.get(state):
-                    rect = self.canvas.create_image(
-                        x * TILE_SIZE,
-                        y * TILE_SIZE,
-                        anchor="nw",
-                        image=self.images[state],
-                    )
-                else:
-                    rect = self.canvas.create_rectangle(
-                        x * TILE_SIZE,
-                        y * TILE_SIZE,
-                        (x + 1) * TILE_SIZE,
-                        (y + 1) * TILE_SIZE,
-                        fill=self.colors[state],
-                    )
-                self.rects[x][y] = rect
-                self._update_shading(x, y)
-                self._update_fog(x, y)
+        self.width = max(self.width, new_width)
+        self.height = max(self.height, new_height)
+        # Drawn chunks on the old edge may now have more tiles inside bounds.
+        for key in list(self.rendered):
+            self._render_chunk(key)
+
+    # -- tile access -------------------------------------------------------
 
     def get_cell(self, x: int, y: int) -> str:
         if x < 0 or y < 0 or x >= self.width or y >= self.height:
             return TILE_ROCK
-        return self.grid[x][y]
+        return TILE_STATES[self.cells.get(x, y)]
+
+    def add_listener(self, callback: Callable[[int, int, str, str], None]) -> None:
+        """Call ``callback(x, y, old, new)`` whenever a tile changes state."""
+        self.listeners.append(callback)
 
     def set_cell(self, x: int, y: int, state: str) -> None:
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.grid[x][y] = state
-            if hasattr(self.canvas, "delete"):
-                self.canvas.delete(self.rects[x][y])
-                if self.shades[x][y]:
-                    self.canvas.delete(self.shades[x][y])
-            if hasattr(self.canvas, "create_image") and self.images.get(state):
-                self.rects[x][y] = self.canvas.create_image(
-                    x * TILE_SIZE,
-                    y * TILE_SIZE,
-                    anchor="nw",
-                    image=self.images[state],
-                )
-            else:
-                color = self.colors[state]
-                if state in (TILE_SAND, TILE_TUNNEL):
-                    color = self._depth_color(color, y)
-                self.rects[x][y] = self.canvas.create_rectangle(
-                    x * TILE_SIZE,
-                    y * TILE_SIZE,
-                    (x + 1) * TILE_SIZE,
-                    (y + 1) * TILE_SIZE,
-                    fill=color,
-                )
-            self._update_shading(x, y)
-            self._update_fog(x, y)
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.width and 0 <= ny < self.height:
-                    self._update_shading(nx, ny)
-                    self._update_fog(nx, ny)
+            old = self.get_cell(x, y)
+            self.cells.set(x, y, TILE_CODES[state])
+            if self._is_rendered(x, y):
+                item = self._rects.get((x, y), 0)
+                if item and hasattr(self.canvas, "delete"):
+                    self.canvas.delete(item)
+                self._rects[(x, y)] = self._create_tile_item(x, y, state)
+                self._update_shading(x, y)
+                self._update_fog(x, y)
+                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < self.width and 0 <= ny < self.height:
+                        if self._is_rendered(nx, ny):
+                            self._update_shading(nx, ny)
+                            self._update_fog(nx, ny)
+            if old != state:
+                for callback in self.listeners:
+                    callback(x, y, old, state)
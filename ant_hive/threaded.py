@@ -0,0 +1,416 @@
+"""Running the simulation on its own thread, apart from the Tk display.
+
+In the classic UI, ticks run on the Tk event loop.  A slow tick, such as a
+big pheromone decay, a burst of hatching or the map growing, holds up
+input and drawing until it finishes.  Here a :class:`SimThread` steps a
+headless :class:`~ant_hive.sim.AntSim` as fast as it can, or at a set rate.
+At most once per ``frame_ms`` it puts an immutable :class:`Frame` into a
+small bounded queue.  A :class:`FrameView` on the Tk thread takes the
+newest frame every ``frame_ms`` and draws it; older frames are dropped.
+
+Frames carry every entity, but only the terrain tiles that changed since
+the previous frame.  When the queue is full the thread folds the queued
+frames into the new one, so no tile change is lost when frames are
+dropped.  The view keeps its own terrain, regrown from the world seed like
+a :class:`~ant_hive.recording.Player`.  It only needs the chunks edited
+before it started, which the first frame carries.
+
+Nothing on the Tk side touches the sim.  Clicks that change the world,
+such as placing food, are queued with :meth:`SimThread.call` and run
+between ticks.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from array import array
+from typing import TYPE_CHECKING, Callable
+
+from .constants import PALETTE, TICK_MS, WINDOW_HEIGHT, WINDOW_WIDTH
+from .headless import HeadlessCanvas
+from .recording import _FILLS, _SHAPES, _entities
+from .terrain import TILE_CODES, TILE_SIZE, TILE_STATES, Terrain
+from .utils import stipple_from_brightness
+from .worldgen import TerrainGenerator
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sim import AntSim
+
+# Wall-clock milliseconds between frames, on both sides of the queue.
+FRAME_MS = 33
+# Frames the queue holds before the oldest are folded into the newest.
+QUEUE_SIZE = 2
+
+
+class Frame:
+    """The world as one finished tick left it.  Never changed once made.
+
+    ``entities`` holds ``(key, kind, fill, x1, y1, x2, y2)`` for everything
+    drawn; ``key`` stays the same for an entity's whole life.  ``tiles``
+    lists ``(x, y, code)`` for tiles changed since the previous frame and
+    ``chunks`` maps chunk keys to raw tile codes for a full resend.  It is
+    ``None`` unless the view must rebuild its terrain.
+    """
+
+    def __init__(
+        self,
+        sim: "AntSim",
+        entities: tuple,
+        tiles: tuple,
+        chunks: dict | None,
+    ) -> None:
+        clock = sim.clock
+        self.tick = clock.ticks
+        self.day = clock.day
+        self.brightness = clock.brightness
+        self.is_night = clock.is_night
+        self.seed = sim.seed
+        self.spawn = sim.worldgen.spawn
+        self.width = sim.grid_width
+        self.height = sim.grid_height
+        self.food_collected = sim.food_collected
+        self.queen_fed = sim.queen_fed
+        self.queen_hunger = sim.queen.hunger
+        self.ants = len(sim.ants)
+        self.eggs = len(sim.eggs)
+        self.predators = len(sim.predators)
+        self.entities = entities
+        self.tiles = tiles
+        self.chunks = chunks
+        # Frames folded into this one because the view fell behind.
+        self.dropped = 0
+
+    def merged(self, older: "Frame") -> "Frame":
+        """This frame, also carrying the terrain changes of ``older``."""
+        frame = object.__new__(Frame)
+        frame.__dict__.update(self.__dict__)
+        if self.chunks is None:
+            frame.tiles = older.tiles + self.tiles
+            frame.chunks = older.chunks
+        frame.dropped = self.dropped + older.dropped + 1
+        return frame
+
+
+class SimThread:
+    """Step ``sim`` on a background thread and queue frames of it.
+
+    ``rate`` caps the ticks per second; ``None`` runs flat out.  The sim
+    must be headless, and after :meth:`start` only this thread may touch
+    it; use :meth:`call` to change it from elsewhere.
+    """
+
+    def __init__(
+        self,
+        sim: "AntSim",
+        rate: float | None = None,
+        frame_ms: int = FRAME_MS,
+        queue_size: int = QUEUE_SIZE,
+    ) -> None:
+        if not sim.headless:
+            raise ValueError("SimThread needs a headless sim")
+        self.sim = sim
+        self.rate = rate
+        self.frame_ms = frame_ms
+        self.frames: queue.Queue[Frame] = queue.Queue(queue_size)
+        self.error: BaseException | None = None
+        self._calls: queue.SimpleQueue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ant-hive-sim", daemon=True)
+        self._terrain: Terrain | None = None
+        self._tiles: list[tuple[int, int, int]] = []
+        self._last_frame = 0.0
+
+    # -- control ----------------------------------------------------------
+
+    def start(self) -> "SimThread":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop after the current tick and wait for the thread to end."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def call(self, func: Callable, *args) -> None:
+        """Run ``func(*args)`` on the sim thread before the next tick."""
+        self._calls.put((func, args))
+
+    def latest(self) -> Frame | None:
+        """Take every queued frame and return the newest, or ``None``.
+
+        The frames skipped are folded into the one returned, so its
+        ``tiles`` cover everything since the last frame taken.
+        """
+        if self.error is not None:
+            raise RuntimeError("the simulation thread failed") from self.error
+        frame = None
+        while True:
+            try:
+                newer = self.frames.get_nowait()
+            except queue.Empty:
+                return frame
+            frame = newer if frame is None else newer.merged(frame)
+
+    # -- the sim thread ---------------------------------------------------
+
+    def _run(self) -> None:
+        sim = self.sim
+        try:
+            self._publish()
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                while True:
+                    try:
+                        func, args = self._calls.get_nowait()
+                    except queue.Empty:
+                        break
+                    func(*args)
+                sim.step()
+                self._publish()
+                if self.rate:
+                    wait = 1 / self.rate - (time.perf_counter() - start)
+                    if wait > 0:
+                        self._stop.wait(wait)
+        except BaseException as exc:  # handed to the Tk thread by latest()
+            self.error = exc
+
+    def _watch(self) -> dict:
+        """Follow tile changes of the current terrain; return its edits."""
+        if self._terrain is not None and self._tile in self._terrain.listeners:
+            self._terrain.listeners.remove(self._tile)
+        terrain = self._terrain = self.sim.terrain
+        terrain.add_listener(self._tile)
+        self._tiles = []
+        # The view regrows the rest from the seed.
+        return {key: bytes(terrain.cells.chunk(key)) for key, _, _ in terrain.cells.stored()}
+
+    def _tile(self, x: int, y: int, old: str, new: str) -> None:
+        self._tiles.append((x, y, TILE_CODES[new]))
+
+    def _publish(self) -> None:
+        now = time.perf_counter()
+        sim = self.sim
+        reset = sim.terrain is not self._terrain
+        if not reset and (now - self._last_frame) * 1000 < self.frame_ms:
+            return
+        self._last_frame = now
+        chunks = self._watch() if reset else None
+        coords = sim.canvas.coords
+        entities = tuple(
+            (
+                entity.item,
+                kind,
+                getattr(entity, "color", None) or _FILLS.get(kind, "black"),
+                *coords(entity.item)[:4],
+            )
+            for entity, kind in _entities(sim)
+        )
+        frame = Frame(sim, entities, tuple(self._tiles), chunks)
+        self._tiles = []
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                pass
+            # The view is behind: fold what it has not taken into this one,
+            # newest first so older tile changes end up in front.
+            stale = []
+            while True:
+                try:
+                    stale.append(self.frames.get_nowait())
+                except queue.Empty:
+                    break
+            for older in reversed(stale):
+                frame = frame.merged(older)
+
+
+class FrameView:
+    """Draw the frames of a :class:`SimThread` on ``canvas``.
+
+    :meth:`play` polls the thread on ``master.after``; :meth:`poll` draws
+    the newest frame once.  Entities are drawn as plain shapes, as in a
+    :class:`~ant_hive.recording.Player`.  Clicking the canvas drops food
+    there and the arrow keys scroll.  Without a canvas nothing is drawn,
+    but ``frame``, ``terrain`` and ``items`` still follow the sim.
+    """
+
+    def __init__(self, source: SimThread, canvas=None) -> None:
+        self.source = source
+        self.canvas = canvas or HeadlessCanvas()
+        self.frame: Frame | None = None
+        self.frames = 0
+        self.dropped = 0
+        self.terrain: Terrain | None = None
+        # Sim canvas item -> our canvas item.
+        self.items: dict[int, int] = {}
+        self.overlay = self.canvas.create_rectangle(
+            0, 0, WINDOW_WIDTH, WINDOW_HEIGHT, fill="#112244", outline="", state="hidden"
+        )
+        self.canvas.bind("<Button-1>", self.place_food)
+        for key, dx, dy in (("<Left>", -1, 0), ("<Right>", 1, 0), ("<Up>", 0, -1), ("<Down>", 0, 1)):
+            self.canvas.bind(key, lambda _e, dx=dx, dy=dy: self.scroll_view(dx * 20, dy * 20))
+        self.canvas.focus_set()
+
+    def poll(self) -> bool:
+        """Draw the newest frame, if there is one; return whether there was."""
+        frame = self.source.latest()
+        if frame is None:
+            return False
+        self.show(frame)
+        return True
+
+    def play(
+        self,
+        master,
+        frame_ms: int = FRAME_MS,
+        on_frame: Callable[["FrameView"], None] | None = None,
+    ) -> None:
+        """Draw the newest frame every ``frame_ms`` on ``master.after``."""
+
+        def tick() -> None:
+            if self.poll() and on_frame is not None:
+                on_frame(self)
+            master.after(frame_ms, tick)
+
+        tick()
+
+    def show(self, frame: Frame) -> None:
+        """Bring the canvas up to date with ``frame``."""
+        canvas = self.canvas
+        self._show_terrain(frame)
+        seen = set()
+        items = self.items
+        for key, kind, fill, *box in frame.entities:
+            seen.add(key)
+            item = items.get(key)
+            if item is None:
+                create = getattr(canvas, f"create_{_SHAPES.get(kind, 'oval')}")
+                items[key] = create(*box, fill=fill)
+            else:
+                canvas.coords(item, *box)
+        for key in [key for key in items if key not in seen]:
+            canvas.delete(items.pop(key))
+        if frame.brightness >= 0.999:
+            canvas.itemconfigure(self.overlay, state="hidden")
+        else:
+            canvas.itemconfigure(
+                self.overlay, state="normal", stipple=stipple_from_brightness(frame.brightness)
+            )
+        canvas.tag_raise(self.overlay)
+        self.frame = frame
+        self.frames += 1
+        self.dropped += frame.dropped
+
+    def _show_terrain(self, frame: Frame) -> None:
+        terrain = self.terrain
+        if frame.chunks is not None:
+            if terrain is not None:
+                for key in list(terrain.rendered):
+                    terrain.hide_chunk(key)
+            terrain = self.terrain = Terrain(
+                frame.width,
+                frame.height,
+                self.canvas,
+                TerrainGenerator(frame.seed, spawn=frame.spawn),
+            )
+            chunks = {key: array("B", data) for key, data in frame.chunks.items()}
+            terrain.cells.replace(chunks, {}, set())
+            terrain.redraw()
+        elif (frame.width, frame.height) != (terrain.width, terrain.height):
+            terrain.expand(frame.width, frame.height)
+            self.canvas.configure(
+                scrollregion=(0, 0, frame.width * TILE_SIZE, frame.height * TILE_SIZE)
+            )
+        for x, y, code in frame.tiles:
+            terrain.set_cell(x, y, TILE_STATES[code])
+        self.reveal_view()
+
+    def reveal_view(self) -> None:
+        """Draw any terrain chunk that has scrolled into view."""
+        canvas = self.canvas
+        x0 = int(canvas.canvasx(0)) // TILE_SIZE
+        y0 = int(canvas.canvasy(0)) // TILE_SIZE
+        self.terrain.show_region(
+            x0, y0, x0 + WINDOW_WIDTH // TILE_SIZE + 1, y0 + WINDOW_HEIGHT // TILE_SIZE + 1
+        )
+
+    def scroll_view(self, dx: int, dy: int) -> None:
+        if dx:
+            self.canvas.xview_scroll(dx, "units")
+        if dy:
+            self.canvas.yview_scroll(dy, "units")
+        if self.terrain is not None:
+            self.reveal_view()
+
+    def place_food(self, event) -> None:
+        x = int(self.canvas.canvasx(event.x))
+        y = int(self.canvas.canvasy(event.y))
+        self.source.call(self.source.sim.add_food_drop, x, y)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the simulation on its own thread and draw it from Tk."""
+    import argparse
+    import tkinter as tk
+
+    from .sim import AntSim
+
+    parser = argparse.ArgumentParser(prog="python -m ant_hive.threaded", description=main.__doc__)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1000 / TICK_MS,
+        help="ticks per second; 0 runs as fast as the machine allows",
+    )
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    root.title("Ant Hive Simulation v0.1")
+    canvas = tk.Canvas(
+        root,
+        width=WINDOW_WIDTH,
+        height=WINDOW_HEIGHT,
+        bg=PALETTE["background"],
+        highlightthickness=0,
+    )
+    canvas.pack(side="left")
+    stats = tk.Label(root, bg=PALETTE["frame"], justify="left", font=("Arial", 10))
+    stats.pack(side="right", fill="y")
+    runner = SimThread(AntSim(headless=True, seed=args.seed), rate=args.rate or None)
+    view = FrameView(runner, canvas)
+
+    def show(v: FrameView) -> None:
+        frame = v.frame
+        stats.configure(
+            text=(
+                f"Day {frame.day}, tick {frame.tick}\n"
+                f"Food Collected: {frame.food_collected}\n"
+                f"Fed to Queen: {frame.queen_fed}\n"
+                f"Queen Hunger: {int(frame.queen_hunger)}\n"
+                f"Ants Active: {frame.ants}\n"
+                f"Eggs: {frame.eggs}\n"
+                f"Predators: {frame.predators}\n"
+                f"Frames dropped: {v.dropped}"
+            )
+        )
+
+    runner.start()
+    view.play(root, on_frame=show)
+    try:
+        root.mainloop()
+    finally:
+        runner.stop()
+        runner.sim.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
+import sys
+
+
+def is_tk_canvas(canvas) -> bool:
+    """Return True if ``canvas`` is a real Tk canvas.
+
+    Checks ``sys.modules`` instead of importing tkinter so headless callers
+    never load it.
+    """
+    tk = sys.modules.get("tkinter")
+    return tk is not None and isinstance(canvas, tk.Canvas)
+
+
 def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * max(0.0, min(1.0, t))
 
@@ -0,0 +1,181 @@
+"""Chunked storage for per-tile world data.
+
+The world is kept as ``CHUNK_SIZE`` x ``CHUNK_SIZE`` chunks in a dict keyed by
+chunk coordinate, so memory follows the area that has actually been touched
+rather than the bounding box of the map.  Each chunk is a flat
+:class:`array.array` indexed ``(x << CHUNK_SHIFT) | y``.
+"""
+
+from __future__ import annotations
+
+import zlib
+from array import array
+from typing import Callable, Iterable, Iterator
+
+CHUNK_SHIFT = 5
+CHUNK_SIZE = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK_SIZE - 1
+CHUNK_CELLS = CHUNK_SIZE * CHUNK_SIZE
+
+Chunk = tuple[int, int]
+
+
+def chunk_of(x: int, y: int) -> Chunk:
+    return x >> CHUNK_SHIFT, y >> CHUNK_SHIFT
+
+
+def chunks_in(x0: int, y0: int, x1: int, y1: int) -> Iterator[Chunk]:
+    """Yield the chunks overlapping the tile rectangle ``[x0, x1) x [y0, y1)``."""
+    if x1 <= x0 or y1 <= y0:
+        return
+    for cx in range(x0 >> CHUNK_SHIFT, ((x1 - 1) >> CHUNK_SHIFT) + 1):
+        for cy in range(y0 >> CHUNK_SHIFT, ((y1 - 1) >> CHUNK_SHIFT) + 1):
+            yield cx, cy
+
+
+class ChunkedGrid:
+    """Sparse 2D grid of numbers allocated one chunk at a time.
+
+    Reading an untouched chunk returns ``default`` without allocating,
+    unless ``generate`` is given: it is then called once with the chunk
+    coordinate and returns the filled chunk, or ``None`` if the chunk holds
+    only the default.  :meth:`freeze` compresses chunks into ``frozen``;
+    they are thawed again on their next access.
+    """
+
+    def __init__(
+        self,
+        typecode: str = "B",
+        default: float = 0,
+        generate: Callable[[Chunk], array | None] | None = None,
+    ) -> None:
+        self.typecode = typecode
+        self.default = default
+        self.generate = generate
+        self.chunks: dict[Chunk, array] = {}
+        self.frozen: dict[Chunk, bytes] = {}
+        # Generated chunks that turned out to hold only the default value.
+        self.blank: set[Chunk] = set()
+        # Chunks read or written since the last call to end_sweep().
+        self.touched: set[Chunk] = set()
+        self.thaws = 0
+
+    def new_chunk(self) -> array:
+        return array(self.typecode, [self.default]) * CHUNK_CELLS
+
+    def get(self, x: int, y: int) -> float:
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        self.touched.add(key)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self._load(key, False)
+            if chunk is None:
+                return self.default
+        return chunk[((x & CHUNK_MASK) << CHUNK_SHIFT) | (y & CHUNK_MASK)]
+
+    def set(self, x: int, y: int, value: float) -> None:
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self._load(key, True)
+        self.touched.add(key)
+        chunk[((x & CHUNK_MASK) << CHUNK_SHIFT) | (y & CHUNK_MASK)] = value
+
+    def chunk(self, key: Chunk, create: bool = False) -> array | None:
+        """Return the live chunk at ``key``, loading or allocating it."""
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self._load(key, create)
+        return chunk
+
+    def put(self, key: Chunk, chunk: array) -> None:
+        """Store a whole filled chunk at ``key``."""
+        self.chunks[key] = chunk
+
+    def drop(self, key: Chunk) -> None:
+        """Forget a chunk entirely; it reads as the default afterwards."""
+        self.chunks.pop(key, None)
+        self.frozen.pop(key, None)
+        self.touched.discard(key)
+
+    def freeze(self, keys: Iterable[Chunk]) -> int:
+        """Compress the given live chunks; return how many were frozen."""
+        count = 0
+        for key in list(keys):
+            chunk = self.chunks.pop(key, None)
+            if chunk is not None:
+                self.frozen[key] = zlib.compress(chunk.tobytes())
+                count += 1
+        return count
+
+    def holds(self, key: Chunk) -> bool:
+        """Whether chunk ``key`` is held or known blank, so reading it
+        would not generate it."""
+        return key in self.chunks or key in self.frozen or key in self.blank
+
+    def stored(self) -> Iterator[tuple[Chunk, array | bytes, bool]]:
+        """Yield ``(key, data, frozen)`` for every chunk held.
+
+        ``data`` is the chunk itself, or its compressed bytes when frozen.
+        """
+        for key, chunk in self.chunks.items():
+            yield key, chunk, False
+        for key, data in self.frozen.items():
+            yield key, data, True
+
+    def replace(
+        self, chunks: dict[Chunk, array], frozen: dict[Chunk, bytes], blank: set[Chunk]
+    ) -> None:
+        """Swap in a whole new set of chunks, e.g. read from a snapshot."""
+        self.chunks = dict(chunks)
+        self.frozen = dict(frozen)
+        self.blank = set(blank)
+        self.touched = set()
+
+    def flush(self) -> None:
+        """Write held data to its backing store; in-memory grids have none."""
+
+    def close(self) -> None:
+        """Release the backing store, if any."""
+
+    def end_sweep(self) -> None:
+        self.touched.clear()
+
+    def decay(self, amount: float) -> None:
+        """Lower every positive value by ``amount``, stopping at zero.
+
+        Chunks left with nothing above zero give their memory back.
+        """
+        for key, chunk in list(self.chunks.items()):
+            live = False
+            for i, value in enumerate(chunk):
+                if value > 0:
+                    value = max(0.0, value - amount)
+                    chunk[i] = value
+                    live = live or value > 0
+            if not live:
+                self.drop(key)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by live and frozen chunk data."""
+        itemsize = array(self.typecode).itemsize
+        live = len(self.chunks) * CHUNK_CELLS * itemsize
+        return live + sum(len(data) for data in self.frozen.values())
+
+    def _load(self, key: Chunk, create: bool) -> array | None:
+        data = self.frozen.pop(key, None)
+        chunk = None
+        if data is not None:
+            chunk = array(self.typecode)
+            chunk.frombytes(zlib.decompress(data))
+            self.thaws += 1
+        elif self.generate is not None and key not in self.blank:
+            chunk = self.generate(key)
+            if chunk is None:
+                self.blank.add(key)
+        if chunk is None:
+            if not create:
+                return None
+            chunk = self.new_chunk()
+        self.chunks[key] = chunk
+        return chunk
@@ -1,4 +1,5 @@
 from ant_hive import *
+from ant_hive.sim import AntSim
 
 if __name__ == "__main__":
     import tkinter as tk
@@ -1,7 +1,8 @@
+import sys
 import tkinter as tk
 
 class AntHiveUI(tk.Tk):
-    def __init__(self):
+    def __init__(self, address=None):
         super().__init__()
         self.title("Ant Hive Simulation v0.1")
         width = 800
@@ -12,12 +13,34 @@ class AntHiveUI(tk.Tk):
         # Left canvas
         self.canvas = tk.Canvas(self, width=left_w, height=height, bg="#d9c38a")
         self.canvas.pack(side="left", fill="both")
-        self.draw_static_elements()
+        # With an address this is a thin client of `python -m ant_hive.stream serve`.
+        self.client = None
+        if address is None:
+            self.draw_static_elements()
         # Sidebar
         sidebar = tk.Frame(self, width=right_w, height=height, bg="#f7e6cb")
         sidebar.pack(side="right", fill="y")
         sidebar.pack_propagate(False)
         self.build_sidebar(sidebar)
+        if address is not None:
+            from ant_hive.stream import StreamClient, parse_address
+
+            self.client = StreamClient(parse_address(address), self.canvas)
+            self.follow_stream()
+
+    def follow_stream(self):
+        client = self.client
+        if client.poll():
+            kinds = [tracked.kind for tracked in client.entities.values()]
+            self.stats_label["text"] = (
+                f"Food Collected: {client.food_collected}\n"
+                f"Fed to Queen: {client.queen_fed}\n"
+                f"Ants Active: {kinds.count('ant')}\n"
+                f"Eggs: {kinds.count('egg')}\n"
+                f"Predators: {kinds.count('spider')}"
+            )
+        if not client.closed:
+            self.after(33, self.follow_stream)
 
     def draw_static_elements(self):
         c = self.canvas
@@ -68,7 +91,8 @@ class AntHiveUI(tk.Tk):
             "Eggs: 0\n"
             "Predators: 1"
         )
-        tk.Label(top, text=stats_text, bg="#f7e6cb", anchor="w", justify="left").pack(fill="x")
+        self.stats_label = tk.Label(top, text=stats_text, bg="#f7e6cb", anchor="w", justify="left")
+        self.stats_label.pack(fill="x")
         # Middle section
         mid = tk.Frame(parent, bg="#f7e6cb")
         mid.pack(side="top", fill="x", pady=10)
@@ -98,5 +122,5 @@ class AntHiveUI(tk.Tk):
         tk.Label(bottom, text="Queen Thought: This colony better prosper.", bg="#f7e6cb", anchor="w", justify="left").pack(fill="x", pady=(5,0))
 
 if __name__ == "__main__":
-    app = AntHiveUI()
+    app = AntHiveUI(sys.argv[1] if len(sys.argv) > 1 else None)
     app.mainloop()
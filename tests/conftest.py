@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def atlas_cache(tmp_path_factory):
+    """Bake terrain atlases into a temporary directory, not ~/.cache."""
+    old = os.environ.get("ANT_HIVE_CACHE_DIR")
+    os.environ["ANT_HIVE_CACHE_DIR"] = str(tmp_path_factory.mktemp("cache"))
+    yield os.environ["ANT_HIVE_CACHE_DIR"]
+    if old is None:
+        del os.environ["ANT_HIVE_CACHE_DIR"]
+    else:
+        os.environ["ANT_HIVE_CACHE_DIR"] = old
@@ -0,0 +1,179 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import json
+
+from ant_hive import ai_interface
+from ant_hive.ai_http import AsyncChatClient
+from ant_hive.ai_standin import StandInServer
+
+
+def test_client_reuses_pooled_connections():
+    with StandInServer(lambda payload: "pong") as server:
+
+        async def scenario():
+            client = AsyncChatClient(server.base_url)
+            replies = []
+            for _ in range(5):
+                replies.append(await client.chat([{"role": "user", "content": "ping"}], "m", 5))
+            await client.aclose()
+            return replies, client.connections_opened
+
+        replies, opened = asyncio.run(scenario())
+    assert replies == ["pong"] * 5
+    assert opened == 1
+    assert server.connections == 1
+    assert server.requests[0]["max_tokens"] == 5
+
+
+def test_semaphore_limits_in_flight_requests():
+    with StandInServer(lambda payload: "ok", delay=0.05) as server:
+
+        async def scenario():
+            client = AsyncChatClient(server.base_url, max_concurrency=3)
+            messages = [{"role": "user", "content": "hi"}]
+            replies = await asyncio.gather(
+                *(client.chat(messages, "m", 1) for _ in range(9))
+            )
+            await client.aclose()
+            return replies, client.connections_opened
+
+        replies, opened = asyncio.run(scenario())
+    assert replies == ["ok"] * 9
+    assert server.max_in_flight <= 3
+    assert opened == 3
+
+
+def test_client_returns_none_when_server_is_down():
+    server = StandInServer().start()
+    url = server.base_url
+    server.stop()
+
+    async def scenario():
+        client = AsyncChatClient(url, timeout=1.0)
+        return await client.chat([{"role": "user", "content": "hi"}], "m", 1)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_chat_completion_shim_uses_http_backend():
+    reply = json.dumps({"dx": 5, "dy": 0})
+    with StandInServer(lambda payload: reply) as server:
+        ai_interface.configure_backend("http", base_url=server.base_url)
+        try:
+            future = ai_interface.chat_completion(
+                [{"role": "user", "content": "move"}], "test-model", 10
+            )
+            assert future.result(timeout=5) == reply
+        finally:
+            ai_interface.configure_backend("sdk")
+    assert server.requests[0]["model"] == "test-model"
+
+
+def test_timed_out_request_closes_its_connection():
+    with StandInServer(lambda payload: "late", delay=0.5) as server:
+
+        async def scenario():
+            client = AsyncChatClient(server.base_url, timeout=0.1)
+            writers = []
+            connect = client._connect
+
+            async def tracked_connect():
+                conn = await connect()
+                writers.append(conn[1])
+                return conn
+
+            client._connect = tracked_connect
+            messages = [{"role": "user", "content": "hi"}]
+            first = await client.chat(messages, "m", 1)
+            closed = writers[0].is_closing()
+            server.delay = 0.0
+            second = await client.chat(messages, "m", 1)
+            await client.aclose()
+            return first, closed, second, client.connections_opened
+
+        first, closed, second, opened = asyncio.run(scenario())
+    assert first is None
+    assert closed
+    assert second == "late"
+    assert opened == 2
+
+
+def reply(text, extra=""):
+    body = json.dumps({"choices": [{"message": {"content": text}}]}).encode()
+    head = f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n{extra}\r\n"
+    return head.encode() + body
+
+
+async def raw_server(answers):
+    """Serve requests in order; each answer is bytes, or a callable that
+    gets the writer and misbehaves with it.  Returns (server, url, seen)."""
+    seen = []
+
+    async def handle(reader, writer):
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            seen.append(writer)
+            answer = answers[len(seen) - 1]
+            if callable(answer):
+                await answer(writer)
+                return
+            writer.write(answer)
+            await writer.drain()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/v1", seen
+
+
+async def hang_up(writer):
+    writer.close()
+
+
+def test_request_is_resent_only_when_never_answered():
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def truncated(writer):
+        data = reply("cut short")
+        writer.write(data[:-5])
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        # The server drops the pooled connection without answering: resent.
+        server, url, seen = await raw_server([reply("one"), hang_up, reply("two")])
+        client = AsyncChatClient(url, timeout=2.0)
+        first = [await client.chat(messages, "m", 1) for _ in range(2)]
+        await client.aclose()
+        server.close()
+        resent = len(seen)
+        # The answer breaks off mid-body: the server acted, so no resend.
+        server, url, seen = await raw_server([reply("one"), truncated, reply("two")])
+        client = AsyncChatClient(url, timeout=2.0)
+        second = [await client.chat(messages, "m", 1) for _ in range(2)]
+        await client.aclose()
+        server.close()
+        return first, resent, second, len(seen)
+
+    first, resent, second, sent = asyncio.run(scenario())
+    assert first == ["one", "two"] and resent == 3
+    assert second == ["one", None] and sent == 2
+
+
+def test_malformed_chunk_size_fails_the_request():
+    bad = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n{}\r\n0\r\n\r\n"
+
+    async def scenario():
+        server, url, _ = await raw_server([bad])
+        client = AsyncChatClient(url, timeout=2.0)
+        result = await client.chat([{"role": "user", "content": "hi"}], "m", 1)
+        await client.aclose()
+        server.close()
+        return result
+
+    assert asyncio.run(scenario()) is None
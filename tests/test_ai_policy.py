@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import concurrent.futures
+
+from ant_hive.ai_policy import BudgetedDecision, DecisionTable
+
+
+def _parse(text):
+    return text.upper() if text else None
+
+
+def test_remote_answer_within_budget_is_used():
+    future = concurrent.futures.Future()
+    decision = BudgetedDecision(budget=2)
+    assert decision.poll("k", lambda: future, _parse, lambda: "local") is None
+    future.set_result("yes")
+    assert decision.poll("k", lambda: future, _parse, lambda: "local") == "YES"
+    assert decision.remote_answers == 1
+
+
+def test_fallback_answers_after_budget_and_late_answer_trains_table():
+    table = DecisionTable()
+    futures = []
+
+    def request():
+        futures.append(concurrent.futures.Future())
+        return futures[-1]
+
+    decision = BudgetedDecision(budget=1, table=table)
+    assert decision.poll("k", request, _parse, lambda: "local") is None
+    assert decision.poll("k", request, _parse, lambda: "local") == "local"
+    # Still waiting on the slow request: no new request, local answers.
+    assert decision.poll("k", request, _parse, lambda: "local") == "local"
+    assert len(futures) == 1
+
+    futures[0].set_result("late")
+    # The late answer is recorded and a fresh request goes out.
+    assert decision.poll("k", request, _parse, lambda: "local") is None
+    assert len(futures) == 2
+    assert decision.late_answers == 1
+    assert table.lookup("k") == "LATE"
+    # The learned table now answers before the heuristic.
+    assert decision.poll("k", request, _parse, lambda: "local") == "LATE"
+
+
+def test_failed_request_uses_fallback_without_waiting_for_budget():
+    future = concurrent.futures.Future()
+    decision = BudgetedDecision(budget=5)
+    assert decision.poll("k", lambda: future, _parse, lambda: "local") is None
+    future.set_result(None)
+    assert decision.poll("k", lambda: future, _parse, lambda: "local") == "local"
+
+
+def test_decision_table_round_trip(tmp_path):
+    table = DecisionTable()
+    table.record((1, -1, 0, 2), (5, 0))
+    table.record((1, -1, 0, 2), (5, 0))
+    table.record((1, -1, 0, 2), (0, 5))
+    table.record((3, 0, 2), True)
+    path = tmp_path / "table.json"
+    table.save(str(path))
+    loaded = DecisionTable.load(str(path))
+    assert loaded.lookup((1, -1, 0, 2)) == (5, 0)
+    assert loaded.lookup((3, 0, 2)) is True
+    assert loaded.lookup((9, 9)) is None
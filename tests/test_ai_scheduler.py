@@ -0,0 +1,151 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import concurrent.futures
+import threading
+
+from ant_hive.ai_interface import (
+    RequestScheduler,
+    TokenBucket,
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.delay() == 0.5
+    clock.now = 0.5
+    assert bucket.try_acquire()
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_critical_requests_jump_ahead_of_queued_thoughts():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        sched = RequestScheduler(
+            loop,
+            limits={PRIORITY_CRITICAL: 1, PRIORITY_NORMAL: 1, PRIORITY_LOW: 1},
+            queue_limits={PRIORITY_CRITICAL: None, PRIORITY_NORMAL: 8, PRIORITY_LOW: 8},
+        )
+        gate = asyncio.Event()
+        order = []
+
+        def job(name):
+            async def run():
+                order.append(name)
+                await gate.wait()
+                return name
+
+            return run
+
+        low = [sched.submit(PRIORITY_LOW, job(f"low{i}")) for i in range(3)]
+        await _settle()
+        crit = sched.submit(PRIORITY_CRITICAL, job("spawn"))
+        await _settle()
+        # Only one thought may run at a time; the spawn decision is not stuck
+        # behind the remaining queued thoughts.
+        assert order == ["low0", "spawn"]
+        assert sched.queued(PRIORITY_LOW) == 2
+        gate.set()
+        results = [await asyncio.wrap_future(f) for f in low + [crit]]
+        return results
+
+    assert _run(scenario()) == ["low0", "low1", "low2", "spawn"]
+
+
+def test_saturated_low_priority_queue_is_shed():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        sched = RequestScheduler(
+            loop,
+            limits={PRIORITY_CRITICAL: 1, PRIORITY_NORMAL: 1, PRIORITY_LOW: 1},
+            queue_limits={PRIORITY_CRITICAL: None, PRIORITY_NORMAL: 8, PRIORITY_LOW: 1},
+        )
+        gate = asyncio.Event()
+
+        async def slow():
+            await gate.wait()
+            return "thought"
+
+        running = sched.submit(PRIORITY_LOW, slow)
+        queued = sched.submit(PRIORITY_LOW, slow)
+        dropped = sched.submit(PRIORITY_LOW, slow)
+        await _settle()
+        assert dropped.done() and dropped.result() is None
+        assert sched.shed[PRIORITY_LOW] == 1
+        gate.set()
+        return await asyncio.wrap_future(running), await asyncio.wrap_future(queued)
+
+    assert _run(scenario()) == ("thought", "thought")
+
+
+def test_rate_limit_delays_dispatch():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        sched = RequestScheduler(
+            loop,
+            limits={PRIORITY_CRITICAL: 4, PRIORITY_NORMAL: 4, PRIORITY_LOW: 4},
+            bucket=TokenBucket(rate=50.0, capacity=1.0),
+        )
+
+        async def answer():
+            return "ok"
+
+        first = sched.submit(PRIORITY_NORMAL, answer)
+        second = sched.submit(PRIORITY_NORMAL, answer)
+        await asyncio.sleep(0.001)
+        assert first.done() and not second.done()
+        return await asyncio.wrap_future(second)
+
+    assert _run(scenario()) == "ok"
+
+
+def test_in_flight_is_safe_while_the_loop_resolves_requests():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    priorities = (PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_LOW)
+    sched = RequestScheduler(
+        loop,
+        limits={p: 64 for p in priorities},
+        queue_limits={p: None for p in priorities},
+    )
+
+    async def job():
+        return "ok"
+
+    futures = []
+    for _ in range(2000):
+        futures.append(sched.submit(PRIORITY_NORMAL, job))
+        sched.in_flight()
+    concurrent.futures.wait(futures, timeout=10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    assert [f.result() for f in futures] == ["ok"] * 2000
+    assert sched.in_flight() == []
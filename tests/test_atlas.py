@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_sim import Terrain, TILE_ROCK, TILE_SAND, TILE_TUNNEL
+from ant_hive import atlas
+from ant_hive.atlas import DEPTH_LEVELS, EDGE_LEFT, TextureAtlas, load_atlas
+
+
+def test_atlas_bakes_every_variant():
+    built = TextureAtlas.build(Terrain.texture_data, Terrain.colors)
+    assert built.tile == 20
+    assert len(built.offsets) == DEPTH_LEVELS * 2 * (1 + 1 + 16)
+    clear = built.rgb((TILE_SAND, 0, 0, False))
+    assert len(clear) == 20 * 20 * 3
+    assert sum(built.rgb((TILE_SAND, 0, 0, True))) < sum(clear)
+    assert sum(built.rgb((TILE_ROCK, DEPTH_LEVELS - 1, 0, False))) < sum(
+        built.rgb((TILE_ROCK, 0, 0, False))
+    )
+    plain = built.rgb((TILE_TUNNEL, 0, 0, False))
+    edged = built.rgb((TILE_TUNNEL, 0, EDGE_LEFT, False))
+    assert edged[:3] != plain[:3]
+    assert edged[-3:] == plain[-3:]
+    assert built.ppm((TILE_SAND, 0, 0, False)).startswith(b"P6\n20 20\n255\n")
+
+
+def test_atlas_is_written_once_and_mapped_afterwards(tmp_path, monkeypatch):
+    monkeypatch.setattr(atlas, "_loaded", {})
+    first = load_atlas(Terrain.texture_data, Terrain.colors, str(tmp_path))
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].startswith("terrain-atlas-v")
+    assert load_atlas(Terrain.texture_data, Terrain.colors, str(tmp_path)) is first
+
+    def fail(*args):
+        raise AssertionError("atlas rebuilt despite cache file")
+
+    monkeypatch.setattr(atlas, "_loaded", {})
+    monkeypatch.setattr(TextureAtlas, "build", classmethod(fail))
+    again = load_atlas(Terrain.texture_data, Terrain.colors, str(tmp_path))
+    variant = (TILE_TUNNEL, 3, 5, True)
+    assert again.rgb(variant) == first.rgb(variant)
+    assert again.colors == first.colors
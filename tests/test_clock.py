@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.clock import SimClock
+from ant_hive.headless import HeadlessMaster
+from ant_hive.sim import AntSim
+
+
+def test_clock_counts_days_and_phase_in_ticks():
+    clock = SimClock(tick_ms=100)
+    assert clock.ticks_per_day == 600
+    assert clock.day == 1 and not clock.is_night
+    clock.advance(330)
+    assert clock.is_night
+    assert clock.phase == 0.55
+    assert clock.brightness < 1.0
+    clock.advance(270)
+    assert clock.day == 2 and not clock.is_night
+
+
+def test_headless_master_runs_callbacks_as_time_advances():
+    master = HeadlessMaster()
+    calls = []
+    master.after(200, calls.append, "late")
+    job = master.after(50, calls.append, "cancelled")
+    master.after(100, calls.append, "early")
+    master.after_cancel(job)
+    master.advance(100)
+    assert calls == ["early"]
+    master.advance(100)
+    assert calls == ["early", "late"]
+    assert master.pending() == 0
+
+
+def test_headless_sim_fast_forwards_whole_days():
+    sim = AntSim(headless=True, seed=7)
+    sim.run_days(1.5)
+    assert sim.clock.day == 2
+    assert sim.current_day == 2
+    assert sim.is_night
+    assert sim.master.now_ms == sim.clock.ticks * sim.clock.tick_ms
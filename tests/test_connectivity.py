@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_sim import Terrain, TILE_ROCK, TILE_SAND, TILE_TUNNEL, TILE_COLLAPSED
+from ant_hive.connectivity import TileComponents
+from ant_hive.pathfinding import PathFinder, ground_passable
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.next_id = 1
+
+    def create_rectangle(self, *args, **kwargs):
+        self.next_id += 1
+        return self.next_id
+
+    def delete(self, item_id):
+        pass
+
+
+def _dig(terrain, tiles):
+    for x, y in tiles:
+        terrain.set_cell(x, y, TILE_TUNNEL)
+
+
+def test_digging_merges_tunnel_components():
+    terrain = Terrain(9, 9, FakeCanvas())
+    tunnels = TileComponents(terrain)
+    _dig(terrain, [(1, 1), (2, 1), (6, 6), (7, 6)])
+    assert len(tunnels) == 2
+    assert not tunnels.same_component((1, 1), (7, 6))
+    assert tunnels.component_size((1, 1)) == 2
+    _dig(terrain, [(3, 2), (4, 3), (5, 4), (6, 5)])
+    assert len(tunnels) == 1
+    assert tunnels.same_component((1, 1), (7, 6))
+    assert tunnels.component_size((6, 6)) == 8
+    assert tunnels.component_of((0, 0)) is None
+
+
+def test_collapse_splits_only_its_component():
+    terrain = Terrain(9, 9, FakeCanvas())
+    _dig(terrain, [(x, 1) for x in range(1, 8)] + [(1, 7), (2, 7)])
+    tunnels = TileComponents(terrain)
+    assert len(tunnels) == 2
+    terrain.set_cell(4, 1, TILE_COLLAPSED)
+    assert len(tunnels) == 3
+    assert tunnels.same_component((1, 1), (3, 1))
+    assert not tunnels.same_component((3, 1), (5, 1))
+    assert tunnels.component_size((7, 1)) == 3
+    assert tunnels.relabels == 1
+    terrain.set_cell(4, 1, TILE_TUNNEL)
+    assert tunnels.component_size((1, 1)) == 7
+
+
+def test_path_finder_prunes_goals_in_other_components():
+    terrain = Terrain(9, 9, FakeCanvas())
+    for y in range(9):
+        terrain.set_cell(4, y, TILE_ROCK)
+    ground = TileComponents(terrain, ground_passable)
+    paths = PathFinder(terrain, components=ground)
+    assert paths.path((1, 1), (7, 7)) is None
+    assert paths.pruned == 1 and paths.nodes_expanded == 0
+    terrain.set_cell(4, 4, TILE_SAND)
+    assert ground.same_component((1, 1), (7, 7))
+    assert paths.path((1, 1), (7, 7)) is not None
@@ -0,0 +1,131 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.export import ExportError, StateReader
+from ant_hive.sim import AntSim
+from ant_hive.terrain import TILE_TUNNEL
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def name(tag):
+    return f"ahtest-{tag}-{os.getpid()}"
+
+
+def test_reader_sees_the_world_of_the_last_tick():
+    sim = AntSim(headless=True, seed=4)
+    exporter = sim.export_state(name("world"))
+    reader = StateReader(exporter.name)
+    try:
+        sim.run_ticks(40)
+        sim.terrain.set_cell(6, 7, TILE_TUNNEL)
+        sim.deposit_pheromone(100, 120, 3.0, "food")
+        sim.step()
+        frame = reader.latest()
+        assert frame.tick == sim.clock.ticks
+        assert (frame.width, frame.height) == (sim.grid_width, sim.grid_height)
+        assert frame.tile(6, 7) == TILE_TUNNEL
+        assert all(
+            frame.tile(x, y) == sim.terrain.get_cell(x, y)
+            for x in range(sim.grid_width)
+            for y in range(sim.grid_height)
+        )
+        assert frame.heat("food", 5, 6) == pytest.approx(sim.pheromones["food"].get(5, 6))
+        assert frame.count == 1 + len(sim.ants) + len(sim.predators) + len(sim.eggs) + len(
+            sim.food_drops
+        ) + len(sim.dens)
+        queen = frame.entity(0)
+        assert queen["kind"] == "queen"
+        assert queen["value"] == pytest.approx(sim.queen.hunger)
+        ant = frame.entity(1)
+        assert ant["kind"] == "ant" and ant["id"] == sim.ants[0].ant_id
+        assert frame.consistent()
+        sim.step()
+        assert frame.consistent()
+        sim.step()
+        assert not frame.consistent()
+    finally:
+        reader.close()
+        sim.close()
+
+
+def test_growing_map_starts_a_new_generation():
+    sim = AntSim(headless=True, seed=4)
+    exporter = sim.export_state(name("grow"))
+    reader = StateReader(exporter.name)
+    try:
+        before = reader.latest()
+        width = before.width
+        del before
+        sim.ants.extend(sim.ants[0] for _ in range(20))
+        sim.step()
+        frame = reader.latest()
+        assert frame.width > width
+        assert frame.width == sim.grid_width
+        assert reader.generation == exporter.generation == 2
+    finally:
+        reader.close()
+        sim.ants = sim.ants[:5]
+        sim.close()
+
+
+def test_reader_in_another_process_leaves_the_segments_alone():
+    sim = AntSim(headless=True, seed=4)
+    exporter = sim.export_state(name("proc"))
+    try:
+        sim.run_ticks(3)
+        script = (
+            "from ant_hive.export import StateReader\n"
+            f"r = StateReader({exporter.name!r})\n"
+            "f = r.latest()\n"
+            "print(f.tick, f.consistent())\n"
+            "del f\n"
+            "r.close()\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True
+        )
+        assert out.stdout.split() == ["3", "True"]
+        sim.step()
+        reader = StateReader(exporter.name)
+        assert reader.latest().tick == 4
+        reader.close()
+    finally:
+        sim.close()
+
+
+def test_missing_state_is_reported():
+    with pytest.raises(ExportError):
+        StateReader(name("nobody"))
+
+
+def test_exporter_keeps_publishing_after_a_snapshot_load(tmp_path):
+    saved = str(tmp_path / "world.snap")
+    sim = AntSim(headless=True, seed=4)
+    sim.save_snapshot(saved)
+    exporter = sim.export_state(name("load"))
+    reader = StateReader(exporter.name)
+    try:
+        sim.run_ticks(5)
+        sim.terrain.set_cell(6, 7, TILE_TUNNEL)
+        sim.step()
+        old = sim.terrain
+        sim.load_snapshot(saved)
+        assert sim.exporter is exporter
+        sim.step()
+        assert exporter._tile not in old.listeners
+        frame = reader.latest()
+        assert frame.tick == sim.clock.ticks == 1
+        assert frame.tile(6, 7) == sim.terrain.get_cell(6, 7) != TILE_TUNNEL
+        sim.terrain.set_cell(2, 3, TILE_TUNNEL)
+        sim.step()
+        sim.step()
+        assert reader.latest().tile(2, 3) == TILE_TUNNEL
+    finally:
+        reader.close()
+        sim.close()
@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import subprocess
+import threading
+
+from ant_hive import ai_interface
+from ant_hive.ai_standin import StandInServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seconds `import ant_hive` may take; about 30 ms on a laptop, so this only
+# trips when something heavy starts loading at import time.
+IMPORT_BUDGET = 0.5
+
+
+def test_import_does_not_start_threads_or_load_heavy_modules():
+    code = (
+        "import sys, threading, time\n"
+        "start = time.perf_counter()\n"
+        "import ant_hive\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(threading.active_count())\n"
+        "print(','.join(m for m in ('tkinter', 'openai', 'asyncio') if m in sys.modules))\n"
+        "print(elapsed)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+    assert out[0] == "1"
+    assert out[1] == ""
+    assert float(out[2]) < IMPORT_BUDGET
+
+
+def test_shutdown_drains_in_flight_requests_and_runtime_restarts():
+    with StandInServer(lambda payload: "done", delay=0.2) as server:
+        ai_interface.configure_backend("http", base_url=server.base_url)
+        try:
+            future = ai_interface.chat_completion(
+                [{"role": "user", "content": "hi"}], "m", 5
+            )
+            thread = ai_interface.get_runtime().thread
+            ai_interface.shutdown(timeout=5)
+            assert future.done() and future.result() == "done"
+            assert not ai_interface.is_running()
+            assert not thread.is_alive()
+
+            again = ai_interface.chat_completion(
+                [{"role": "user", "content": "hi"}], "m", 5
+            )
+            assert again.result(timeout=5) == "done"
+            assert ai_interface.is_running()
+        finally:
+            ai_interface.configure_backend("sdk")
+            ai_interface.shutdown(timeout=5)
+    assert all(t.name != "ant-hive-ai" for t in threading.enumerate())
@@ -0,0 +1,105 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.constants import PHEROMONE_DECAY, TILE_SIZE
+from ant_hive.mapped import MappedGrid
+from ant_hive.sim import AntSim
+from ant_hive.terrain import TILE_CODES, TILE_TUNNEL
+from ant_hive.world import CHUNK_SIZE, ChunkedGrid, chunk_of
+
+
+def test_mapped_grid_reopens_from_its_index(tmp_path):
+    path = str(tmp_path / "scent.grid")
+    grid = MappedGrid(path, "f", 0.0)
+    grid.set(3, 4, 1.5)
+    grid.set(CHUNK_SIZE * 40, -2, 2.5)
+    assert grid.get(1000, 1000) == 0.0
+    assert len(grid.slots) == 2
+    grid.close()
+
+    grid = MappedGrid(path, "f", 0.0)
+    assert not grid.chunks
+    assert grid.get(3, 4) == 1.5
+    assert len(grid.chunks) == 1
+    assert grid.get(CHUNK_SIZE * 40, -2) == 2.5
+    grid.close()
+
+
+def test_mapped_grid_reuses_dropped_slots_and_evicts_views(tmp_path):
+    grid = MappedGrid(str(tmp_path / "cells.grid"), "B", 0)
+    grid.set(0, 0, 7)
+    grid.drop((0, 0))
+    assert grid.get(0, 0) == 0
+    grid.set(CHUNK_SIZE, 0, 9)
+    assert grid.slots == {(1, 0): 0}
+    assert grid.freeze([(1, 0)]) == 1
+    assert not grid.chunks
+    assert grid.get(CHUNK_SIZE, 0) == 9
+    assert grid.thaws == 1
+    grid.close()
+
+
+def test_mapped_grid_rejects_another_typecode(tmp_path):
+    path = str(tmp_path / "cells.grid")
+    MappedGrid(path, "B", 0).close()
+    with pytest.raises(ValueError):
+        MappedGrid(path, "f", 0.0)
+
+
+def test_sim_world_dir_persists_terrain_and_pheromones(tmp_path):
+    world = str(tmp_path / "world")
+    sim = AntSim(headless=True, world_dir=world)
+    sim.terrain.set_cell(3, 3, TILE_TUNNEL)
+    sim.deposit_pheromone(60, 60, 2.0, "food")
+    seed = sim.seed
+    sim.close()
+
+    reopened = AntSim(headless=True, world_dir=world)
+    assert reopened.seed == seed
+    assert reopened.terrain.get_cell(3, 3) == TILE_TUNNEL
+    assert reopened.get_pheromone(60, 60, "food") == 2.0
+    reopened.close()
+    with pytest.raises(ValueError):
+        AntSim(headless=True, seed=seed + 1, world_dir=world)
+
+
+def decayed(level, steps):
+    grid = ChunkedGrid("f", 0.0)
+    grid.set(0, 0, level)
+    for _ in range(steps):
+        grid.decay(PHEROMONE_DECAY)
+    return grid.get(0, 0)
+
+
+def test_reopened_world_maps_saved_trails_on_first_read(tmp_path):
+    world = str(tmp_path / "world")
+    sim = AntSim(headless=True, world_dir=world)
+    far = (sim.grid_width - 1, sim.grid_height - 1)
+    # A slot past the map's bounds, as left by a run that had grown it.
+    sim.terrain.cells.set(CHUNK_SIZE * 20, CHUNK_SIZE * 20, TILE_CODES[TILE_TUNNEL])
+    sim.deposit_pheromone(60, 60, 2.0, "food")
+    sim.deposit_pheromone(far[0] * TILE_SIZE, far[1] * TILE_SIZE, 1.0, "food")
+    sim.decay_pheromones()
+    sim.close()
+
+    reopened = AntSim(headless=True, world_dir=world)
+    food = reopened.pheromones["food"]
+    assert not food.chunks
+    # Startup reads only the terrain it draws; the indexes read none.
+    assert set(reopened.terrain.cells.chunks) <= reopened.visible_chunks()
+    assert (20, 20) in reopened.terrain.cells.slots
+    for _ in range(3):
+        reopened.decay_pheromones()
+    assert not food.chunks
+    assert reopened.get_pheromone(60, 60, "food") == decayed(2.0, 4)
+    assert list(food.chunks) == [chunk_of(60 // TILE_SIZE, 60 // TILE_SIZE)]
+    reopened.close()
+
+    # Steps still owed at close are kept in the index.
+    again = AntSim(headless=True, world_dir=world)
+    assert again.pheromones["food"].get(*far) == decayed(1.0, 4)
+    again.close()
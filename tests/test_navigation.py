@@ -0,0 +1,221 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_sim import (
+    BaseAnt,
+    WorkerAnt,
+    FoodDrop,
+    ANT_SIZE,
+    Terrain,
+    TILE_SIZE,
+    TILE_ROCK,
+    TILE_TUNNEL,
+)
+from ant_hive.navigation import DistanceField
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.objects = {}
+        self.next_id = 1
+        self.coords_calls = 0
+
+    def _create_item(self, coords):
+        item_id = self.next_id
+        self.next_id += 1
+        self.objects[item_id] = coords[:]
+        return item_id
+
+    def create_oval(self, x1, y1, x2, y2, fill=None, **kwargs):
+        return self._create_item([x1, y1, x2, y2])
+
+    def create_rectangle(self, x1, y1, x2, y2, fill=None, **kwargs):
+        return self._create_item([x1, y1, x2, y2])
+
+    def create_image(self, x, y, image=None, anchor="nw"):
+        return self._create_item([x, y, x + ANT_SIZE, y + ANT_SIZE])
+
+    def delete(self, item_id):
+        self.objects.pop(item_id, None)
+
+    def create_line(self, *args, **kwargs):
+        return self._create_item([0, 0, 0, 0])
+
+    def after(self, delay, func=None):
+        pass
+
+    def move(self, item_id, dx, dy):
+        x1, y1, x2, y2 = self.objects[item_id]
+        self.objects[item_id] = [x1 + dx, y1 + dy, x2 + dx, y2 + dy]
+
+    def coords(self, item_id):
+        self.coords_calls += 1
+        return self.objects[item_id]
+
+    def itemconfigure(self, item_id, **kwargs):
+        pass
+
+
+class FakeQueen:
+    def __init__(self, sim, tx, ty):
+        x, y = tx * TILE_SIZE, ty * TILE_SIZE
+        self.item = sim.canvas.create_oval(x, y, x + TILE_SIZE, y + TILE_SIZE)
+
+
+class FakeSim:
+    """9x9 map with a rock wall at x=4 that is open only at the bottom."""
+
+    def __init__(self, with_field=True):
+        self.canvas = FakeCanvas()
+        self.terrain = Terrain(9, 9, self.canvas)
+        for y in range(8):
+            self.terrain.set_cell(4, y, TILE_ROCK)
+        self.map_width = self.map_height = 9 * TILE_SIZE
+        self.is_night = True
+        self.queen = FakeQueen(self, 7, 1)
+        if with_field:
+            self.home_field = DistanceField(self.terrain)
+            self.home_field.add_source("queen", (7, 1))
+
+
+def test_field_routes_around_rock():
+    sim = FakeSim()
+    field = sim.home_field
+    assert field.distance(7, 1) == 0
+    assert field.distance(4, 0) is None
+    # Down to the gap at (4, 8) and back up; no cutting the wall corners.
+    assert field.distance(1, 1) == 16
+    assert field.step(3, 1)[1] == 1
+    assert field.nearest(1, 1) == "queen"
+
+
+def test_ant_walks_home_around_wall_where_greedy_gets_stuck():
+    greedy = FakeSim(with_field=False)
+    ant = BaseAnt(greedy, TILE_SIZE + 5, TILE_SIZE + 5)
+    for _ in range(200):
+        ant.energy = 100
+        ant.update()
+    assert ant.current_tile()[0] < 4
+
+    sim = FakeSim()
+    ant = BaseAnt(sim, TILE_SIZE + 5, TILE_SIZE + 5)
+    for _ in range(200):
+        ant.energy = 100
+        ant.update()
+    assert ant.current_tile() == (7, 1)
+
+
+def test_opening_tile_updates_incrementally_and_blocking_rebuilds():
+    sim = FakeSim()
+    field = sim.home_field
+    assert field.distance(1, 1) == 16
+    assert field.rebuilds == 1
+    sim.terrain.set_cell(4, 1, TILE_TUNNEL)
+    assert field.distance(1, 1) == 6
+    assert field.rebuilds == 1
+    sim.terrain.set_cell(4, 1, TILE_ROCK)
+    assert field.distance(1, 1) == 16
+    assert field.rebuilds == 2
+
+
+def test_multiple_sources_track_nearest_owner():
+    sim = FakeSim()
+    field = DistanceField(sim.terrain)
+    field.add_source("a", (1, 1))
+    field.add_source("b", (7, 7))
+    assert field.nearest(2, 2) == "a"
+    assert field.nearest(6, 6) == "b"
+    rebuilds = field.rebuilds
+    field.add_source("c", (7, 1))
+    assert field.nearest(7, 2) == "c"
+    field.remove_source("a")
+    assert field.nearest(2, 2) == "b"
+    assert field.distance(1, 1) == 11
+    field.move_source("c", (6, 0))
+    assert field.distance(6, 0) == 0
+    assert field.nearest(7, 2) == "c"
+    assert field.rebuilds == rebuilds
+
+
+class FoodSim(FakeSim):
+    def __init__(self):
+        super().__init__()
+        self.is_night = False
+        self.food_drops = []
+        self.food_field = DistanceField(self.terrain)
+        self.food_collected = 0
+
+    def place(self, tx, ty):
+        drop = FoodDrop(self, tx * TILE_SIZE + 5, ty * TILE_SIZE + 5, charges=1)
+        self.food_drops.append(drop)
+        self.food_field.add_source(drop, drop.tile())
+        return drop
+
+    def check_collision(self, a, b):
+        ax1, ay1, ax2, ay2 = self.canvas.coords(a)
+        bx1, by1, bx2, by2 = self.canvas.coords(b)
+        return ax1 < bx2 and ax2 > bx1 and ay1 < by2 and ay2 > by1
+
+    def get_pheromone(self, x, y, ptype="scout"):
+        return 0.0
+
+
+def test_worker_follows_food_field_to_nearest_drop():
+    sim = FoodSim()
+    far = sim.place(1, 8)
+    near = sim.place(7, 7)
+    for tx in range(5, 8):
+        sim.place(tx, 0)
+    ant = WorkerAnt(sim, TILE_SIZE + 5, TILE_SIZE + 5)
+    assert sim.food_field.nearest(*ant.current_tile()) is far
+    # Drops beyond the wall are never looked at by the worker.
+    calls = sim.canvas.coords_calls
+    ant.update()
+    assert sim.canvas.coords_calls - calls < 12
+    for _ in range(100):
+        ant.energy = 100
+        ant.update()
+        if ant.carrying_food:
+            break
+    assert ant.carrying_food
+    assert far.charges == 0 and far not in sim.food_drops
+    assert far not in sim.food_field.sources
+    assert sim.food_field.nearest(1, 1) is near
+
+
+def test_worker_off_the_field_still_finds_food():
+    sim = FoodSim()
+    # Standing on rock, where the field has no answer, touching a drop
+    # across the tile border.
+    touching = FoodDrop(sim, 3 * TILE_SIZE + 14, 3 * TILE_SIZE + 5, charges=1)
+    sim.food_drops.append(touching)
+    sim.food_field.add_source(touching, touching.tile())
+    ant = WorkerAnt(sim, 4 * TILE_SIZE, 3 * TILE_SIZE + 5)
+    assert sim.food_field.nearest(*ant.current_tile()) is None
+    ant.update()
+    assert ant.carrying_food and touching.charges == 0
+
+    # At the edge of the rock and touching nothing: head for the closest
+    # drop as before.
+    target = sim.place(6, 2)
+    ant = WorkerAnt(sim, 4 * TILE_SIZE + 10, 2 * TILE_SIZE + 5)
+    assert sim.food_field.nearest(*ant.current_tile()) is None
+    before = sim.canvas.coords(ant.item)[0]
+    ant.update()
+    assert sim.canvas.coords(ant.item)[0] > before
+    assert not ant.carrying_food and target.charges == 1
+
+
+def test_sources_near_finds_keys_around_a_tile():
+    sim = FakeSim()
+    field = DistanceField(sim.terrain)
+    field.add_source("a", (4, 3))
+    field.add_source("b", (5, 4))
+    field.add_source("c", (7, 7))
+    assert sorted(field.sources_near(4, 4)) == ["a", "b"]
+    field.move_source("b", (7, 6))
+    field.remove_source("a")
+    assert field.sources_near(4, 4) == []
+    assert sorted(field.sources_near(7, 7)) == ["b", "c"]
@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.partition import EntityTable, PartitionedSim, owner_of
+from ant_hive.sim import AntSim
+
+
+def summary(sim):
+    return len(sim.ants), len(sim.eggs), len(sim.predators), sim.food_collected, sim.queen_fed
+
+
+def positions(sim):
+    return sorted(sim.canvas.coords(ant.item)[:2] for ant in sim.ants)
+
+
+def test_one_worker_matches_the_single_process_engine():
+    single = AntSim(headless=True, seed=7)
+    single.run_ticks(300)
+    sim = AntSim(headless=True, seed=7)
+    with PartitionedSim(sim, workers=1) as engine:
+        engine.run_ticks(300)
+        engine.gather()
+    assert summary(sim) == summary(single)
+    assert positions(sim) == positions(single)
+
+
+def test_strips_stay_within_tolerance_and_migrate_ants():
+    single = AntSim(headless=True, seed=7)
+    day = single.clock.ticks_per_day
+    single.run_ticks(day)
+    sim = AntSim(headless=True, seed=7)
+    with PartitionedSim(sim, workers=2, rebalance_ticks=5) as engine:
+        engine.run_ticks(day)
+        assert engine.migrations > 0
+        assert set(engine.owner) == {ant.uid for ant in sim.ants}
+        assert set(engine.owner.values()) == {0, 1}
+        engine.gather()
+        assert all(ant.alive for ant in sim.ants)
+    assert sim.clock.ticks == day
+    for ours, theirs in zip(summary(sim), summary(single)):
+        assert abs(ours - theirs) <= max(1, 0.1 * theirs)
+
+
+def test_entity_table_is_shared_by_name():
+    table = EntityTable(8)
+    try:
+        other = EntityTable(8, table.name)
+        other.write(3, 1.5, 2.5, 40.0, 1)
+        assert table.read(3) == (1.5, 2.5, 40.0, 1)
+        other.close()
+    finally:
+        table.close(unlink=True)
+
+
+def test_owner_of_splits_at_boundaries():
+    assert [owner_of([100.0, 200.0], x) for x in (0, 100, 150, 250)] == [0, 1, 1, 2]
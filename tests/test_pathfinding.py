@@ -0,0 +1,220 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_sim import BaseAnt, ANT_SIZE, Terrain, TILE_SIZE, TILE_ROCK, TILE_TUNNEL
+from ant_hive.entities.spider import Spider
+from ant_hive.sim import AntSim
+from ant_hive.terrain import TILE_SAND
+from ant_hive.pathfinding import (
+    PathFinder,
+    HierarchicalPathFinder,
+    surface_passable,
+)
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.objects = {}
+        self.next_id = 1
+
+    def _create_item(self, coords):
+        item_id = self.next_id
+        self.next_id += 1
+        self.objects[item_id] = coords[:]
+        return item_id
+
+    def create_oval(self, x1, y1, x2, y2, fill=None, **kwargs):
+        return self._create_item([x1, y1, x2, y2])
+
+    def create_rectangle(self, x1, y1, x2, y2, fill=None, **kwargs):
+        return self._create_item([x1, y1, x2, y2])
+
+    def create_image(self, x, y, image=None, anchor="nw"):
+        return self._create_item([x, y, x + ANT_SIZE, y + ANT_SIZE])
+
+    def delete(self, item_id):
+        self.objects.pop(item_id, None)
+
+    def move(self, item_id, dx, dy):
+        x1, y1, x2, y2 = self.objects[item_id]
+        self.objects[item_id] = [x1 + dx, y1 + dy, x2 + dx, y2 + dy]
+
+    def coords(self, item_id, *args):
+        if args:
+            self.objects[item_id] = list(args)
+        return self.objects[item_id]
+
+    def itemconfigure(self, item_id, **kwargs):
+        pass
+
+
+class FakeSim:
+    """9x9 map with a rock wall at x=4 that is open only at the bottom."""
+
+    def __init__(self):
+        self.canvas = FakeCanvas()
+        self.terrain = Terrain(9, 9, self.canvas)
+        for y in range(8):
+            self.terrain.set_cell(4, y, TILE_ROCK)
+        self.map_width = self.map_height = 9 * TILE_SIZE
+        self.paths = PathFinder(self.terrain)
+
+
+def test_astar_routes_around_rock():
+    sim = FakeSim()
+    route = sim.paths.path((1, 1), (7, 1))
+    assert route[0] == (1, 1) and route[-1] == (7, 1)
+    assert (4, 8) in route
+    assert len(route) == 17
+    assert all(sim.terrain.get_cell(x, y) != TILE_ROCK for x, y in route)
+    assert sim.paths.path((1, 1), (4, 0)) is None
+
+
+def test_cache_hits_and_shared_suffixes():
+    sim = FakeSim()
+    paths = sim.paths
+    route = paths.path((1, 1), (7, 1))
+    expanded = paths.nodes_expanded
+    assert paths.misses == 1 and expanded > 0
+    assert paths.path((1, 1), (7, 1)) is route
+    assert paths.hits == 1
+    # An ant further along the same route reuses its tail without searching.
+    tail = paths.path(route[5], (7, 1))
+    assert tail == route[5:]
+    assert paths.shared == 1
+    assert paths.nodes_expanded == expanded
+
+
+def test_blocking_tile_drops_only_paths_through_it():
+    sim = FakeSim()
+    paths = sim.paths
+    long_route = paths.path((1, 1), (7, 1))
+    paths.path((5, 5), (7, 7))
+    sim.terrain.set_cell(*long_route[8], TILE_ROCK)
+    assert ((1, 1), (7, 1)) not in paths.cache
+    assert ((5, 5), (7, 7)) in paths.cache
+    assert paths.invalidated == 1
+    # The wall is now sealed; opening a tile in it lets the failed query retry.
+    assert paths.path((1, 1), (7, 1)) is None
+    sim.terrain.set_cell(4, 2, TILE_TUNNEL)
+    assert len(paths.path((1, 1), (7, 1))) == 7
+
+
+def test_cache_is_bounded_lru():
+    sim = FakeSim()
+    paths = PathFinder(sim.terrain, capacity=2)
+    paths.path((0, 0), (1, 0))
+    paths.path((0, 0), (2, 0))
+    paths.path((0, 0), (1, 0))
+    paths.path((0, 0), (3, 0))
+    assert list(paths.cache) == [((0, 0), (1, 0)), ((0, 0), (3, 0))]
+
+
+def test_ant_move_towards_follows_cached_path():
+    sim = FakeSim()
+    target = sim.canvas.create_rectangle(
+        7 * TILE_SIZE, TILE_SIZE, 8 * TILE_SIZE, 2 * TILE_SIZE
+    )
+    ant = BaseAnt(sim, TILE_SIZE + 5, TILE_SIZE + 5)
+    for _ in range(200):
+        ant.energy = 100
+        ant.move_towards(target)
+    assert ant.current_tile() == (7, 1)
+    assert sim.paths.hits + sim.paths.shared > 10 * sim.paths.misses
+
+
+def test_spider_retreats_to_lair_around_tunnels():
+    sim = FakeSim()
+    sim.spider_paths = PathFinder(sim.terrain, surface_passable)
+    for y in range(1, 9):
+        sim.terrain.set_cell(2, y, TILE_TUNNEL)
+    spider = Spider(sim, 0, 8 * TILE_SIZE)
+    sim.canvas.coords(spider.item, 60, 165, 60 + ANT_SIZE, 165 + ANT_SIZE)
+    for _ in range(100):
+        spider.retreat_to_lair()
+    x1, y1, x2, y2 = sim.canvas.coords(spider.item)
+    assert int(((x1 + x2) / 2) // TILE_SIZE) < 2
+
+
+def _walled_map(canvas, size=64):
+    terrain = Terrain(size, size, canvas)
+    # Horizontal rock walls with alternating gaps force a zig-zag route.
+    for y in range(12, 56, 10):
+        gap = 8 if (y // 10) % 2 else 52
+        for x in range(5, 60):
+            if abs(x - gap) > 1:
+                terrain.set_cell(x, y, TILE_ROCK)
+    return terrain
+
+
+def _assert_valid(finder, route):
+    for (x1, y1), (x2, y2) in zip(route, route[1:]):
+        assert max(abs(x2 - x1), abs(y2 - y1)) == 1
+        assert finder.walkable(x2, y2)
+        if x1 != x2 and y1 != y2:
+            assert finder.walkable(x2, y1) and finder.walkable(x1, y2)
+
+
+def test_hierarchical_route_is_valid_and_searches_less():
+    canvas = FakeCanvas()
+    terrain = _walled_map(canvas)
+    flat = PathFinder(terrain)
+    hpa = HierarchicalPathFinder(terrain, chunk_size=8)
+    best = flat.path((30, 6), (30, 58))
+    route = hpa.path((30, 6), (30, 58))
+    _assert_valid(hpa, route)
+    assert route[0] == (30, 6) and route[-1] == (30, 58)
+    assert len(route) <= len(best) * 1.2
+    assert hpa.abstract_expanded > 0
+    assert hpa.nodes_expanded < flat.nodes_expanded
+
+
+def test_hierarchical_edit_rebuilds_only_nearby_chunks():
+    canvas = FakeCanvas()
+    terrain = _walled_map(canvas)
+    hpa = HierarchicalPathFinder(terrain, chunk_size=8)
+    hpa.path((30, 6), (30, 58))
+    built = hpa.chunk_rebuilds
+    terrain.set_cell(20, 30, TILE_ROCK)
+    route = hpa.path((30, 6), (30, 58))
+    _assert_valid(hpa, route)
+    assert hpa.chunk_rebuilds - built <= 5
+    # Closing the gap at x=8 on the last wall leaves no way through.
+    for x in range(7, 10):
+        terrain.set_cell(x, 52, TILE_ROCK)
+    assert hpa.path((30, 6), (30, 58)) is None
+    assert PathFinder(terrain).path((30, 6), (30, 58)) is None
+
+
+def test_hierarchical_graph_grows_with_terrain():
+    canvas = FakeCanvas()
+    terrain = Terrain(9, 9, canvas)
+    hpa = HierarchicalPathFinder(terrain, chunk_size=4)
+    assert hpa.path((0, 0), (8, 8)) is not None
+    terrain.expand(40, 9)
+    route = hpa.path((0, 0), (39, 8))
+    _assert_valid(hpa, route)
+    assert hpa.chunks_x == 10
+
+
+def test_walled_in_goals_are_pruned_on_the_chunk_graph():
+    sim = AntSim(headless=True, seed=7)
+    assert not hasattr(sim, "ground")
+    terrain = sim.terrain
+    terrain.expand(3080, 2310)
+    cells = terrain.cells
+    sx, sy = sim.worldgen.spawn
+    for gx, gy in [(sx + 12, sy - 3), (sx + 60, sy - 20)]:
+        for x in range(gx - 2, gx + 3):
+            for y in range(gy - 2, gy + 3):
+                ring = max(abs(x - gx), abs(y - gy)) == 2
+                terrain.set_cell(x, y, TILE_ROCK if ring else TILE_SAND)
+        generated = len(cells.chunks) + len(cells.blank)
+        pruned = sim.paths.pruned
+        assert sim.paths.path((sx, sy), (gx, gy)) is None
+        assert sim.paths.pruned == pruned + 1
+        assert len(cells.chunks) + len(cells.blank) - generated <= 2
+    assert sim.paths.nodes_expanded < 5000
+    sim.close()
@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import random
+
+from ant_hive import prompt_encoding as pe
+from ant_hive.ai_http import AsyncChatClient
+from ant_hive.ai_standin import StandInServer
+
+
+MOVE_STATE = {
+    "ant": [412.0, 305.0, 422.0, 315.0],
+    "food": [100.0, 520.0, 108.0, 528.0],
+    "queen": [800.0, 600.0, 840.0, 620.0],
+}
+
+
+def test_compact_move_prompt_is_relative_and_quantized():
+    text = pe.ENCODINGS["compact"].encode(pe.MOVE, MOVE_STATE)
+    assert text == "f:-16,10 q:19,14"
+    assert pe.decode_move(text) == (-16, 10, 19, 14)
+    verbose = pe.ENCODINGS["json"].encode(pe.MOVE, MOVE_STATE)
+    assert pe.decode_move(verbose) == (-16, 10, 19, 14)
+
+
+def test_compact_encodings_use_fewer_tokens():
+    spawn = {
+        "hunger": 87.3,
+        "ants": 12,
+        "food": 5,
+        "population": {"WorkerAnt": 6, "ScoutAnt": 2, "SoldierAnt": 3, "NurseAnt": 1},
+    }
+    thought = {
+        "hunger": 87, "fed": 3, "food": 5, "ants": 12, "eggs": 2,
+        "predators": 1, "mood": "threatened",
+    }
+    assert pe.ENCODINGS["compact"].encode(pe.SPAWN, spawn) == "87,12,5,6,2,3,1,0"
+    for decision, state in ((pe.MOVE, MOVE_STATE), (pe.SPAWN, spawn), (pe.THOUGHT, thought)):
+        compact = pe.ENCODINGS["compact"].encode(decision, state)
+        verbose = pe.ENCODINGS["json"].encode(decision, state)
+        assert pe.estimate_tokens(compact) < pe.estimate_tokens(verbose)
+
+
+def test_build_messages_reports_tokens_per_request():
+    stats = pe.PromptStats()
+    pe.stats, saved = stats, pe.stats
+    try:
+        pe.build_messages(pe.MOVE, MOVE_STATE, "compact")
+        pe.build_messages(pe.MOVE, MOVE_STATE, "compact")
+    finally:
+        pe.stats = saved
+    assert stats.requests[("compact", pe.MOVE)] == 2
+    assert stats.tokens_per_request("compact", pe.MOVE) > 0
+
+
+def test_ab_comparison_against_stand_in_server():
+    rng = random.Random(3)
+    samples = []
+    for _ in range(10):
+        ax, ay = rng.randrange(0, 1500), rng.randrange(0, 1100)
+        fx, fy = rng.randrange(0, 1500), rng.randrange(0, 1100)
+        samples.append(
+            {
+                "ant": [ax, ay, ax + 10, ay + 10],
+                "food": [fx, fy, fx + 8, fy + 8],
+                "queen": [800, 600, 840, 620],
+            }
+        )
+    with StandInServer(pe.greedy_move_responder) as server:
+        client = AsyncChatClient(server.base_url)
+        loop = asyncio.new_event_loop()
+        try:
+            results = pe.compare_encodings(
+                pe.MOVE,
+                samples,
+                lambda messages: loop.run_until_complete(client.chat(messages, "m", 10)),
+                pe.score_move,
+            )
+            loop.run_until_complete(client.aclose())
+        finally:
+            loop.close()
+    assert set(results) == {"json", "compact"}
+    assert results["compact"]["tokens"] < results["json"]["tokens"]
+    assert results["compact"]["quality"] >= 0.8
+    assert results["json"]["quality"] >= 0.8
@@ -174,3 +174,18 @@ def test_mood_changes_with_predators():
     sim.queen.hunger = 80
     sim.queen.update()
     assert sim.queen.mood == "threatened"
+
+
+@patch("ant_hive.entities.queen.chat_completion")
+def test_slow_spawn_decision_falls_back_to_heuristic(mock_chat):
+    import concurrent.futures
+
+    os.environ["OPENAI_API_KEY"] = "test"
+    mock_chat.return_value = concurrent.futures.Future()
+    sim = FakeSim()
+    sim.food_collected = 3
+    budget = sim.queen._spawn_decision.budget
+    for _ in range(budget):
+        assert sim.queen.decide_spawn() is None
+    assert sim.queen.decide_spawn() is True
+    mock_chat.assert_called_once()
@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.recording import Player, RecordingError
+from ant_hive.sim import AntSim
+from ant_hive.terrain import TILE_SAND, TILE_TUNNEL
+
+
+def positions(sim):
+    entities = [*sim.ants, *sim.predators, *sim.eggs, sim.queen, *sim.food_drops, *sim.dens]
+    return sorted(sim.canvas.coords(e.item)[:2] for e in entities)
+
+
+def played_positions(player):
+    return sorted(list(t.coords()[:2]) for t in player.entities.values())
+
+
+def test_playback_rebuilds_the_run_without_simulating(tmp_path):
+    path = str(tmp_path / "run.rec")
+    sim = AntSim(headless=True, seed=5)
+    recorder = sim.record(path, keyframe_every=50)
+    sim.run_ticks(120)
+    sim.terrain.set_cell(4, 4, TILE_TUNNEL)
+    sim.deposit_pheromone(60, 60, 2.0, "food", prev=(40, 60))
+    sim.run_ticks(80)
+    middle = positions(sim)
+    sim.run_ticks(100)
+    recorder.close()
+
+    player = Player(path)
+    assert (player.first_tick, player.last_tick) == (0, 300)
+    while player.step():
+        pass
+    assert player.tick == 300
+    assert played_positions(player) == positions(sim)
+    assert player.food_collected == sim.food_collected
+    assert player.terrain.get_cell(4, 4) == TILE_TUNNEL
+
+    player.seek(200)
+    assert played_positions(player) == middle
+    player.seek(100)
+    assert player.terrain.get_cell(4, 4) == TILE_SAND
+
+
+def test_unclosed_recording_still_plays(tmp_path):
+    path = str(tmp_path / "crash.rec")
+    sim = AntSim(headless=True, seed=2)
+    recorder = sim.record(path, keyframe_every=20)
+    sim.run_ticks(70)
+    recorder._flush()
+    recorder._file.flush()
+
+    player = Player(path)
+    player.seek(60)
+    assert player.tick == 60
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "junk.rec"
+    path.write_bytes(b"not a recording at all, clearly")
+    with pytest.raises(RecordingError):
+        Player(str(path))
+
+
+def test_recording_continues_across_a_snapshot_load(tmp_path):
+    path = str(tmp_path / "load.rec")
+    saved = str(tmp_path / "world.snap")
+    sim = AntSim(headless=True, seed=5)
+    sim.run_ticks(30)
+    sim.save_snapshot(saved)
+    recorder = sim.record(path, keyframe_every=50)
+    sim.run_ticks(40)
+    sim.load_snapshot(saved)
+    sim.terrain.set_cell(4, 4, TILE_TUNNEL)
+    sim.run_ticks(20)
+    assert sim.recorder is recorder
+    recorder.close()
+
+    player = Player(path)
+    assert (player.first_tick, player.last_tick) == (30, 90)
+    player.seek(90)
+    assert played_positions(player) == positions(sim)
+    assert player.terrain.get_cell(4, 4) == TILE_TUNNEL
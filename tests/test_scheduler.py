@@ -0,0 +1,143 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_sim import ANT_SIZE, REST_ENERGY_GAIN
+from ant_hive.entities.nurse import NurseAnt
+from ant_hive.entities.soldier import SoldierAnt
+from ant_hive.scheduler import FramePacer, UpdateScheduler
+from ant_hive.sim import AntSim
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.objects = {}
+        self.next_id = 1
+
+    def _create_item(self, coords):
+        item_id = self.next_id
+        self.next_id += 1
+        self.objects[item_id] = coords[:]
+        return item_id
+
+    def create_oval(self, x1, y1, x2, y2, fill=None, **kwargs):
+        return self._create_item([x1, y1, x2, y2])
+
+    def create_rectangle(self, x1, y1, x2, y2, fill=None, **kwargs):
+        return self._create_item([x1, y1, x2, y2])
+
+    def create_image(self, x, y, image=None, anchor="nw"):
+        return self._create_item([x, y, x + ANT_SIZE, y + ANT_SIZE])
+
+    def delete(self, item_id):
+        self.objects.pop(item_id, None)
+
+    def move(self, item_id, dx, dy):
+        x1, y1, x2, y2 = self.objects[item_id]
+        self.objects[item_id] = [x1 + dx, y1 + dy, x2 + dx, y2 + dy]
+
+    def coords(self, item_id):
+        return self.objects[item_id]
+
+    def itemconfigure(self, item_id, **kwargs):
+        pass
+
+
+class FakeQueen:
+    def __init__(self, canvas):
+        self.item = canvas.create_oval(100, 100, 120, 120)
+
+
+class FakeSim:
+    def __init__(self):
+        self.canvas = FakeCanvas()
+        self.ants = []
+        self.queen = FakeQueen(self.canvas)
+        self.is_night = False
+
+
+class Entity:
+    def __init__(self, state, role="Thing"):
+        self.state = state
+        self.role = role
+        self.spans = []
+
+    def activity(self):
+        return self.state
+
+    def update(self):
+        self.spans.append(self.tick_span)
+
+
+def test_idle_entities_are_spread_evenly_across_ticks():
+    scheduler = UpdateScheduler({"active": 1, "idle": 4})
+    idle = [Entity("idle") for _ in range(40)]
+    busy = Entity("active", "Worker")
+    per_tick = []
+    for _ in range(20):
+        scheduler.begin_tick()
+        scheduler.run(busy)
+        per_tick.append(sum(scheduler.run(entity) for entity in idle))
+    assert len(busy.spans) == 20
+    assert max(per_tick[4:]) - min(per_tick[4:]) <= 1
+    assert all(span == 4 for entity in idle for span in entity.spans[1:])
+    report = scheduler.report()
+    assert report["Worker"]["calls"] == 20 and report["Worker"]["skips"] == 0
+    assert report["Thing"]["skips"] == 40 * 20 - report["Thing"]["calls"]
+
+
+def test_resting_nurse_and_idle_soldier_run_less_often_but_keep_pace():
+    sim = FakeSim()
+    nurse = NurseAnt(sim, 0, 0)
+    nurse.energy = 0
+    soldier = SoldierAnt(sim, 105, 105)
+    assert nurse.activity() == "resting"
+    assert soldier.activity() == "idle"
+    scheduler = UpdateScheduler({"active": 1, "idle": 3, "resting": 5})
+    ran = 0
+    for _ in range(10):
+        scheduler.begin_tick()
+        ran += scheduler.run(nurse)
+        if nurse.energy > 0:
+            break
+    assert ran == 1
+    # One update after several skipped ticks recovers as much as every tick would.
+    assert nurse.energy == REST_ENERGY_GAIN * nurse.tick_span
+    sim.is_night = True
+    assert soldier.activity() == "active"
+
+
+class FakeMaster:
+    def __init__(self):
+        self.idle = []
+
+    def after_idle(self, func):
+        self.idle.append(func)
+
+
+def test_slow_ticks_are_split_into_resumable_slices():
+    sim = FakeSim()
+    sim._run_slice = lambda: AntSim._run_slice(sim)
+    sim.master = FakeMaster()
+    sim.scheduler = UpdateScheduler()
+    sim.pacer = FramePacer(interval_ms=100, slice_ms=0)
+    finished = []
+    sim._finish_tick = lambda: finished.append(True)
+    work = [Entity("active") for _ in range(3)]
+    sim._tick_work = work
+    sim._tick_cursor = 0
+    sim.pacer.begin_tick()
+    sim.scheduler.begin_tick()
+    AntSim._run_slice(sim)
+    # A zero budget yields after every entity and resumes where it stopped.
+    while sim.master.idle:
+        sim.master.idle.pop(0)()
+    assert [len(entity.spans) for entity in work] == [1, 1, 1]
+    assert finished == [True]
+    assert sim.pacer.slices == 3
+    delay = sim.pacer.end_tick()
+    assert 1 <= delay <= 100
+    assert sim.pacer.split_ticks == 1
+    report = sim.pacer.report()
+    assert report["target_tps"] == 10
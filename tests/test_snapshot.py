@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.entities import AIBaseAnt
+from ant_hive.sim import AntSim
+from ant_hive.snapshot import SnapshotError
+from ant_hive.terrain import TILE_TUNNEL
+
+
+def world_state(sim):
+    terrain = sim.terrain
+    tiles = [
+        terrain.get_cell(x, y)
+        for x in range(terrain.width)
+        for y in range(terrain.height)
+    ]
+    entities = [
+        (type(e).__name__, sim.canvas.coords(e.item)[:2], float(getattr(e, "energy", 0)))
+        for e in [*sim.ants, *sim.predators, *sim.eggs, sim.queen]
+    ]
+    return tiles, entities, sim.clock.ticks, sim.food_collected, sim.queen.hunger
+
+
+def test_snapshot_round_trips_and_resumes_in_step(tmp_path):
+    sim = AntSim(headless=True, seed=3)
+    sim.run_ticks(150)
+    sim.terrain.set_cell(3, 3, TILE_TUNNEL)
+    sim.deposit_pheromone(60, 60, 2.5, "food")
+    path = tmp_path / "colony.snap"
+    sim.save_snapshot(str(path))
+
+    restored = AntSim(headless=True, seed=99)
+    restored.load_snapshot(str(path))
+    assert restored.seed == 3
+    assert world_state(restored) == world_state(sim)
+    assert restored.terrain.get_cell(3, 3) == TILE_TUNNEL
+    assert restored.get_pheromone(60, 60, "food") == sim.get_pheromone(60, 60, "food")
+
+    sim.run_ticks(100)
+    restored.run_ticks(100)
+    assert world_state(restored) == world_state(sim)
+
+
+def test_snapshot_keeps_ai_ants_and_ants_without_step_buffers(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    sim = AntSim(headless=True, seed=3)
+    sim.ants.append(AIBaseAnt(sim, 120, 140, model="test-model"))
+    sim.ants[0].steps = None
+    sim.run_ticks(20)
+    path = str(tmp_path / "ai.snap")
+    sim.save_snapshot(path)
+
+    restored = AntSim(headless=True, seed=99)
+    restored.load_snapshot(path)
+    assert world_state(restored) == world_state(sim)
+    ai = restored.ants[-1]
+    assert isinstance(ai, AIBaseAnt) and ai.model == "test-model"
+    sim.run_ticks(30)
+    restored.run_ticks(30)
+    assert world_state(restored) == world_state(sim)
+    assert restored.ants[0].steps is None
+
+
+def test_snapshot_compression_is_optional(tmp_path):
+    sim = AntSim(headless=True, seed=1)
+    packed = sim.save_snapshot(str(tmp_path / "packed.snap"))
+    raw = sim.save_snapshot(str(tmp_path / "raw.snap"), compress=False)
+    assert packed < raw
+    restored = AntSim(headless=True, seed=2)
+    restored.load_snapshot(str(tmp_path / "raw.snap"))
+    assert world_state(restored) == world_state(sim)
+
+
+def test_loading_a_foreign_file_raises(tmp_path):
+    path = tmp_path / "junk.snap"
+    path.write_bytes(b"not a colony")
+    sim = AntSim(headless=True, seed=1)
+    with pytest.raises(SnapshotError):
+        sim.load_snapshot(str(path))
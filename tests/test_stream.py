@@ -0,0 +1,197 @@
+import os
+import socket
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.sim import AntSim
+from ant_hive.stream import StreamClient, StreamError, StreamServer
+from ant_hive.terrain import TILE_TUNNEL
+
+
+@pytest.fixture
+def address():
+    with tempfile.TemporaryDirectory() as folder:
+        yield os.path.join(folder, "hive.sock")
+
+
+def boxes(client):
+    return sorted(tuple(tracked.coords()) for tracked in client.entities.values())
+
+
+def sim_boxes(sim):
+    entities = [*sim.ants, *sim.predators, *sim.eggs, sim.queen, *sim.food_drops, *sim.dens]
+    return sorted(tuple(sim.canvas.coords(e.item)[:4]) for e in entities)
+
+
+def test_client_follows_the_server(address):
+    sim = AntSim(headless=True, seed=5)
+    sim.stream(address)
+    client = StreamClient(address)
+    try:
+        sim.run_ticks(20)
+        sim.terrain.set_cell(4, 4, TILE_TUNNEL)
+        sim.deposit_pheromone(100, 120, 3.0, "food")
+        sim.add_food_drop(300, 200)
+        for _ in range(60):
+            sim.step()
+            client.poll()
+
+        assert client.seed == sim.seed
+        assert client.tick == sim.clock.ticks
+        assert client.keyframes == 1 and client.deltas == 79
+        assert boxes(client) == sim_boxes(sim)
+        assert client.terrain.get_cell(4, 4) == TILE_TUNNEL
+        assert (client.food_collected, client.queen_fed) == (sim.food_collected, sim.queen_fed)
+        assert client.heat("food", 5, 6) == sim.pheromones["food"].get(5, 6) > 0
+    finally:
+        client.close()
+        sim.close()
+    assert not os.path.exists(address)
+
+
+def test_viewer_decays_pheromones_in_step_with_the_sim(address):
+    sim = AntSim(headless=True, seed=5)
+    sim.stream(address)
+    client = StreamClient(address)
+    try:
+        for i in range(40):
+            sim.deposit_pheromone(40 + 37 * i, 60 + 23 * i, 0.25 + i / 80, "food")
+        for tick in range(150):
+            if tick % 30 == 0:
+                sim.deposit_pheromone(200, 200, 0.5, "scout")
+            sim.step()
+            client.poll()
+            for name, grid in sim.pheromones.items():
+                mirror = client.pheromones[name].chunks
+                assert {k: list(c) for k, c in mirror.items()} == {
+                    k: list(c) for k, c in grid.chunks.items()
+                }
+        assert client.keyframes == 1
+        assert client.heat("food", 1, 2) == 0.0 and client.heat("none", 1, 2) == 0.0
+    finally:
+        client.close()
+        sim.close()
+
+
+def test_periodic_keyframes_and_late_joiners(address):
+    sim = AntSim(headless=True, seed=5)
+    StreamServer(sim, address, keyframe_every=25)
+    first = StreamClient(address)
+    try:
+        sim.run_ticks(30)
+        first.poll()
+        late = StreamClient(address)
+        sim.run_ticks(30)
+        first.poll()
+        late.poll()
+        assert first.keyframes == 3
+        assert late.keyframes == 2
+        assert boxes(first) == boxes(late) == sim_boxes(sim)
+        late.close()
+    finally:
+        first.close()
+        sim.close()
+
+
+def test_slow_client_skips_to_a_keyframe(address):
+    sim = AntSim(headless=True, seed=5)
+    server = StreamServer(sim, address, keyframe_every=10_000, max_backlog=4096)
+    client = StreamClient(address)
+    client.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    try:
+        sim.step()
+        server.viewers[0].sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        sim.run_ticks(300)
+        viewer = server.viewers[0]
+        assert viewer.skipped > 0
+        assert viewer.backlog <= 4096 + 4096
+        for _ in range(50):
+            client.poll()
+            sim.step()
+        client.poll()
+        assert client.keyframes >= 2
+        assert client.tick == sim.clock.ticks
+        assert boxes(client) == sim_boxes(sim)
+    finally:
+        client.close()
+        sim.close()
+
+
+def test_server_drops_viewers_that_leave(address):
+    sim = AntSim(headless=True, seed=5)
+    server = sim.stream(address)
+    client = StreamClient(address)
+    sim.run_ticks(2)
+    assert server._encoder is not None
+    client.close()
+    sim.run_ticks(40)
+    assert server.viewers == [] and server._encoder is None
+    sim.close()
+
+
+def test_other_servers_are_refused(address):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(address)
+    listener.listen()
+    client = StreamClient(address)
+    sock, _ = listener.accept()
+    sock.sendall(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+    try:
+        with pytest.raises(StreamError):
+            while True:
+                client.poll()
+    finally:
+        sock.close()
+        client.close()
+        listener.close()
+
+
+def test_viewers_stay_connected_across_a_snapshot_load(address, tmp_path):
+    saved = str(tmp_path / "world.snap")
+    sim = AntSim(headless=True, seed=5)
+    sim.save_snapshot(saved)
+    server = sim.stream(address)
+    client = StreamClient(address)
+    try:
+        sim.run_ticks(30)
+        client.poll()
+        sim.load_snapshot(saved)
+        assert sim.streamer is server and os.path.exists(address)
+        sim.terrain.set_cell(4, 4, TILE_TUNNEL)
+        sim.run_ticks(10)
+        client.poll()
+        assert client.keyframes == 2
+        assert client.tick == sim.clock.ticks == 10
+        assert boxes(client) == sim_boxes(sim)
+        assert client.terrain.get_cell(4, 4) == TILE_TUNNEL
+    finally:
+        client.close()
+        sim.close()
+
+
+def test_server_leaves_other_files_and_live_servers_alone(address):
+    with open(address, "w") as fh:
+        fh.write("keep me")
+    sim = AntSim(headless=True, seed=5)
+    with pytest.raises(StreamError):
+        sim.stream(address)
+    assert open(address).read() == "keep me"
+    os.unlink(address)
+
+    server = sim.stream(address)
+    with pytest.raises(StreamError):
+        StreamServer(AntSim(headless=True, seed=6), address)
+    assert sim.streamer is server and os.path.exists(address)
+    sim.close()
+
+    # A socket left behind by a server that is gone is taken over.
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(address)
+    stale.close()
+    server = sim.stream(address)
+    assert os.path.exists(address)
+    server.close()
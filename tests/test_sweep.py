@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive import sim as sim_module
+from ant_hive.entities import egg
+from ant_hive.sweep import read_columns, run_one, sweep, write_columns
+
+
+def test_run_one_patches_and_restores_parameters():
+    decay = sim_module.PHEROMONE_DECAY
+    weights = dict(egg.HATCH_WEIGHTS)
+    result = run_one({"pheromone_decay": 0.5, "hatch_drone": 1.0}, seed=4, days=0.1)
+    assert sim_module.PHEROMONE_DECAY == decay
+    assert egg.HATCH_WEIGHTS == weights
+    assert result["seed"] == 4
+    assert result["pheromone_decay"] == 0.5
+    assert result["ticks"] == 60
+    assert len(result["population"]) == 2
+    assert run_one({"pheromone_decay": 0.5, "hatch_drone": 1.0}, seed=4, days=0.1) == result
+
+
+def test_unknown_parameter_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        sweep({"gravity": [9.8]}, [0], 0.1, str(tmp_path / "s.cols"))
+
+
+def test_columns_round_trip(tmp_path):
+    path = str(tmp_path / "c.cols")
+    columns = {
+        "key": ["a", "bé"],
+        "seed": [1, 2],
+        "decay": [0.5, None],
+        "curve": [[1.0, 2.0], []],
+    }
+    write_columns(path, columns)
+    loaded = read_columns(path)
+    assert loaded["key"] == ["a", "bé"]
+    assert loaded["seed"] == [1, 2]
+    assert loaded["decay"][0] == 0.5 and loaded["decay"][1] != loaded["decay"][1]
+    assert loaded["curve"] == [[1.0, 2.0], []]
+
+
+def test_resumed_sweep_skips_finished_runs(tmp_path):
+    path = str(tmp_path / "s.cols")
+    assert sweep({"spider_growth": [1.1]}, [0, 1], 0.05, path, workers=1) == 2
+    assert sweep({"spider_growth": [1.1, 1.3]}, [0, 1], 0.05, path, workers=1) == 2
+    columns = read_columns(path)
+    assert sorted(columns["spider_growth"]) == [1.1, 1.1, 1.3, 1.3]
+    assert len(set(columns["key"])) == 4
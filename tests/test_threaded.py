@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_hive.sim import AntSim
+from ant_hive.terrain import TILE_TUNNEL
+from ant_hive.threaded import FrameView, SimThread
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_view_follows_the_sim_thread():
+    sim = AntSim(headless=True, seed=6)
+    runner = SimThread(sim, frame_ms=0)
+    view = FrameView(runner)
+    runner.start()
+    runner.call(sim.terrain.set_cell, 5, 6, TILE_TUNNEL)
+    runner.call(sim.add_food_drop, 300, 200)
+    wait_for(lambda: view.poll() and view.frame.tick >= 60)
+    runner.stop()
+    view.poll()
+
+    assert view.frame.tick == sim.clock.ticks
+    assert view.terrain.get_cell(5, 6) == TILE_TUNNEL
+    drawn = sorted(view.canvas.coords(item) for item in view.items.values())
+    entities = [*sim.ants, *sim.predators, *sim.eggs, sim.queen, *sim.food_drops, *sim.dens]
+    assert drawn == sorted(sim.canvas.coords(e.item) for e in entities)
+    assert [300, 200] in [sim.canvas.coords(d.item)[:2] for d in sim.food_drops]
+
+
+def test_frames_the_view_missed_keep_their_tiles():
+    sim = AntSim(headless=True, seed=6)
+    runner = SimThread(sim, frame_ms=0, queue_size=1)
+    runner.call(sim.terrain.set_cell, 3, 4, TILE_TUNNEL)
+    runner.start()
+    wait_for(lambda: sim.clock.ticks >= 30)
+    runner.stop()
+
+    frame = runner.latest()
+    assert frame.dropped >= 25
+    assert (3, 4, 1) in frame.tiles
+    view = FrameView(runner)
+    view.show(frame)
+    assert view.terrain.get_cell(3, 4) == TILE_TUNNEL
+
+
+def test_failure_on_the_sim_thread_reaches_the_view():
+    sim = AntSim(headless=True, seed=6)
+    runner = SimThread(sim)
+
+    def boom():
+        raise KeyError("lost ant")
+
+    runner.call(boom)
+    runner.start()
+    wait_for(lambda: not runner.running)
+    with pytest.raises(RuntimeError) as info:
+        runner.latest()
+    assert isinstance(info.value.__cause__, KeyError)
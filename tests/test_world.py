@@ -0,0 +1,109 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_sim import Terrain, TILE_ROCK, TILE_SAND, TILE_TUNNEL
+from ant_hive.connectivity import TileComponents
+from ant_hive.navigation import DistanceField
+from ant_hive.pathfinding import HierarchicalPathFinder
+from ant_hive.world import CHUNK_SIZE, ChunkedGrid
+from ant_hive.worldgen import TerrainGenerator
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.objects = {}
+        self.next_id = 1
+
+    def create_rectangle(self, x1, y1, x2, y2, fill=None, **kwargs):
+        item_id = self.next_id
+        self.next_id += 1
+        self.objects[item_id] = [x1, y1, x2, y2]
+        return item_id
+
+    def delete(self, item_id):
+        self.objects.pop(item_id, None)
+
+
+def test_chunked_grid_allocates_on_write_and_round_trips_frozen_chunks():
+    grid = ChunkedGrid("f", 0.0)
+    assert grid.get(1000, -5) == 0.0
+    assert not grid.chunks
+    grid.set(40, 3, 2.5)
+    assert list(grid.chunks) == [(1, 0)]
+    grid.end_sweep()
+    assert grid.freeze([(1, 0)]) == 1
+    assert not grid.chunks and grid.nbytes() < CHUNK_SIZE * CHUNK_SIZE
+    assert grid.get(40, 3) == 2.5
+    assert grid.thaws == 1
+
+
+def test_expanding_terrain_allocates_and_draws_nothing_new():
+    canvas = FakeCanvas()
+    terrain = Terrain(40, 30, canvas)
+    drawn = len(canvas.objects)
+    assert drawn == 40 * 30
+    terrain.expand(4000, 3000)
+    # Only the two chunks already on screen are completed.
+    drawn = len(canvas.objects)
+    assert drawn == 2 * CHUNK_SIZE * CHUNK_SIZE
+    assert len(terrain.cells.chunks) <= 4
+    # The old border rock stays; the new area is plain sand.
+    assert terrain.get_cell(36, 10) == TILE_ROCK
+    assert terrain.get_cell(3000, 2000) == TILE_SAND
+    terrain.set_cell(3000, 2000, TILE_TUNNEL)
+    assert terrain.get_cell(3000, 2000) == TILE_TUNNEL
+    assert len(canvas.objects) == drawn
+    assert terrain.show_region(2990, 1990, 3010, 2010) == 2
+    assert len(canvas.objects) == drawn + 2 * CHUNK_SIZE * CHUNK_SIZE + 1
+
+
+def test_cold_chunks_are_hidden_and_frozen_until_touched():
+    canvas = FakeCanvas()
+    terrain = Terrain(64, 32, canvas, generator=lambda x, y: TILE_ROCK if x == y else TILE_SAND)
+    terrain.set_cell(40, 5, TILE_TUNNEL)
+    terrain.cells.end_sweep()
+    terrain.get_cell(3, 3)
+    assert terrain.evict_cold() == 1
+    assert (1, 0) not in terrain.rendered and (0, 0) in terrain.rendered
+    assert len(canvas.objects) < 64 * 32
+    assert terrain.get_cell(40, 5) == TILE_TUNNEL
+    assert terrain.get_cell(31, 31) == TILE_ROCK
+    assert terrain.get_cell(40, 30) == TILE_SAND
+
+
+def test_components_pick_up_grown_area():
+    terrain = Terrain(9, 9, FakeCanvas())
+    tunnels = TileComponents(terrain)
+    terrain.expand(100, 9)
+    for x in range(8, 60):
+        terrain.set_cell(x, 2, TILE_TUNNEL)
+    assert tunnels.same_component((8, 2), (59, 2))
+    assert tunnels.component_size((30, 2)) == 52
+
+
+def test_queries_on_a_large_expanded_map_read_only_nearby_chunks():
+    terrain = Terrain(80, 60, FakeCanvas(), TerrainGenerator(7, spawn=(40, 30)))
+    tunnels = TileComponents(terrain)
+    field = DistanceField(terrain)
+    field.add_source("queen", (40, 30))
+    paths = HierarchicalPathFinder(terrain)
+    assert field.distance(45, 32) == 5
+    terrain.expand(3080, 2310)
+
+    def generated():
+        return len(terrain.cells.chunks) + len(terrain.cells.blank)
+
+    before = generated()
+    assert len(paths.path((40, 30), (75, 10))) > 30
+    assert field.distance(75, 10) > 30
+    assert tunnels.component_size((60, 12)) > 100
+    assert generated() - before <= 2
+    assert len(tunnels.indexed) <= 2 and len(field.dist) <= generated()
+
+    before = generated()
+    route = paths.path((40, 30), (300, 12))
+    assert route[-1] == (300, 12)
+    assert generated() - before <= 24
+    assert len(paths._intra) <= 60
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ant_sim import Terrain, TILE_ROCK, TILE_SAND, TILE_TUNNEL
+from ant_hive.terrain import TILE_CODES
+from ant_hive.world import CHUNK_SIZE, ChunkedGrid, chunks_in
+from ant_hive.worldgen import TerrainGenerator
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.objects = {}
+        self.next_id = 1
+
+    def create_rectangle(self, x1, y1, x2, y2, fill=None, **kwargs):
+        item_id = self.next_id
+        self.next_id += 1
+        self.objects[item_id] = [x1, y1, x2, y2]
+        return item_id
+
+    def delete(self, item_id):
+        self.objects.pop(item_id, None)
+
+
+def test_same_seed_grows_the_same_world():
+    keys = [(cx, cy) for cx in range(4) for cy in range(4)]
+    first = [TerrainGenerator(11).generate_chunk(key) for key in keys]
+    again = [TerrainGenerator(11).generate_chunk(key) for key in reversed(keys)]
+    assert first == list(reversed(again))
+    other = [TerrainGenerator(12).generate_chunk(key) for key in keys]
+    assert first != other
+
+
+def test_chunks_match_single_tiles_and_hold_every_feature():
+    gen = TerrainGenerator(3, spawn=(40, 40))
+    seen = set()
+    for key in [(0, 0), (1, 1), (2, 3)]:
+        chunk = gen.generate_chunk(key)
+        for dx in range(CHUNK_SIZE):
+            for dy in range(CHUNK_SIZE):
+                state = gen.tile(key[0] * CHUNK_SIZE + dx, key[1] * CHUNK_SIZE + dy)
+                code = chunk[dx * CHUNK_SIZE + dy] if chunk else TILE_CODES[TILE_SAND]
+                assert code == TILE_CODES[state]
+                seen.add(state)
+    assert seen == {TILE_SAND, TILE_ROCK, TILE_TUNNEL}
+    assert all(gen.tile(x, y) == TILE_SAND for x in range(34, 47) for y in range(34, 47))
+
+
+def test_terrain_fills_chunks_from_the_generator():
+    gen = TerrainGenerator(5, spawn=(20, 15))
+    terrain = Terrain(40, 30, FakeCanvas(), gen)
+    terrain.expand(200, 200)
+    assert all(
+        terrain.get_cell(x, y) == gen.tile(x, y) for x in range(0, 200, 7) for y in range(0, 200, 7)
+    )
+
+
+def test_fill_generates_only_missing_chunks_of_a_region():
+    gen = TerrainGenerator(5, spawn=(20, 15))
+    grid = ChunkedGrid("B", TILE_CODES[TILE_SAND])
+    grid.set(40, 40, TILE_CODES[TILE_TUNNEL])
+    assert gen.fill(grid, 40, 40, 100, 70) == 3 * 2 - 1
+    assert gen.fill(grid, 0, 0, 100, 70) == 4 * 3 - 3 * 2
+    assert grid.get(40, 40) == TILE_CODES[TILE_TUNNEL]
+    assert grid.get(90, 60) == TILE_CODES[gen.tile(90, 60)]
+
+
+def test_shown_region_is_generated_before_it_is_drawn():
+    gen = TerrainGenerator(5, spawn=(20, 15))
+    calls = []
+    fill = gen.fill
+    gen.fill = lambda *args: calls.append(args[1:]) or fill(*args)
+    terrain = Terrain(80, 60, FakeCanvas(), gen)
+    assert calls == [(0, 0, 80, 60)]
+    assert terrain.cells.holds((2, 1)) and not terrain.cells.holds((3, 0))
+
+
+def test_vectorized_fill_matches_generate_chunk_and_is_fast():
+    np = pytest.importorskip("numpy")
+    gen = TerrainGenerator(5, spawn=(100, 80))
+    grid = ChunkedGrid("B", TILE_CODES[TILE_SAND])
+    # An offset region that crosses the spawn clearing and the topsoil.
+    assert gen.fill(grid, 40, 20, 360, 300) == 11 * 10
+    for key in chunks_in(40, 20, 360, 300):
+        chunk = gen.generate_chunk(key)
+        assert grid.holds(key)
+        if chunk is None:
+            assert key in grid.blank
+        else:
+            assert grid.chunks[key] == chunk
+    gen.fill(ChunkedGrid("B", 0), 0, 0, 64, 64)
+    start = time.perf_counter()
+    big = ChunkedGrid("B", TILE_CODES[TILE_SAND])
+    gen.fill(big, 0, 0, 2000, 2000)
+    assert time.perf_counter() - start < 1.0
+    assert len(big.chunks) + len(big.blank) == 63 * 63
+    assert np.frombuffer(big.chunks[(30, 30)], np.uint8).tolist() == list(
+        gen.generate_chunk((30, 30))
+    )
+
+
+def test_deposits_are_reproducible_and_off_rock():
+    gen = TerrainGenerator(9)
+    found = gen.deposits(0, 0, 320, 320)
+    assert found and found == TerrainGenerator(9).deposits(0, 0, 320, 320)
+    assert all(gen.tile(x, y) != TILE_ROCK for x, y in found)
+    assert all(0 <= x < 320 and 0 <= y < 320 for x, y in found)